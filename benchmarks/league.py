@@ -0,0 +1,171 @@
+from sqlmodel import SQLModel
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import TypedDict
+import datetime as datetime_module
+import random
+
+from uirpsoftball import custom_types, scheduler
+from uirpsoftball.models import tables
+
+"""
+Developer's Note:
+Generates a synthetic league straight into the database, sized by LeagueSize.
+
+Every division plays a round robin (scheduler.round_robin, home and away alternating every round) spread over `ROUNDS`
+weekly rounds, the first `SCORED_FRACTION` of the rounds are in the past and have scores. A playoff tournament with unassigned games is added after the regular season.
+"""
+
+
+class LeagueSize(TypedDict):
+    DIVISIONS: int
+    TEAMS_PER_DIVISION: int
+    ROUNDS: int
+    SCORED_FRACTION: float
+    VISITS: int
+    LOCATIONS: int
+
+
+DEFAULT_LEAGUE_SIZE: LeagueSize = {
+    'DIVISIONS': 4,
+    'TEAMS_PER_DIVISION': 8,
+    'ROUNDS': 12,
+    'SCORED_FRACTION': 0.5,
+    'VISITS': 10000,
+    'LOCATIONS': 4,
+}
+
+SEEDING_PARAMETERS = ['win_percentage', 'head_to_head', 'run_differential']
+TIME_ZONE = 'America/Chicago'
+
+
+def league_rows(size: LeagueSize, seed: int = 0) -> dict[type[SQLModel], list[dict]]:
+    """rows to insert, by table"""
+
+    rng = random.Random(seed)
+    now = datetime_module.datetime.now(tz=datetime_module.timezone.utc)
+    scored_rounds = round(size['ROUNDS'] * size['SCORED_FRACTION'])
+    season_start = (now - datetime_module.timedelta(weeks=scored_rounds)
+                    ).replace(hour=23, minute=0, second=0, microsecond=0)
+
+    rows: dict[type[SQLModel], list[dict]] = {
+        tables.Division: [],
+        tables.Location: [],
+        tables.Team: [],
+        tables.Game: [],
+        tables.SeedingParameter: [],
+        tables.Tournament: [],
+        tables.TournamentGame: [],
+        tables.Visit: [],
+    }
+
+    for i, parameter in enumerate(SEEDING_PARAMETERS):
+        rows[tables.SeedingParameter].append(
+            {'id': i + 1, 'parameter': parameter, 'name': parameter.replace('_', ' ').title(), 'rank': i + 1})
+
+    for location_id in range(1, size['LOCATIONS'] + 1):
+        rows[tables.Location].append({'id': location_id, 'name': 'Field ' + str(location_id), 'link': 'https://example.com/' + str(location_id),
+                                      'short_name': 'F' + str(location_id), 'time_zone': TIME_ZONE})
+
+    matchups_by_round: list[list[tuple[custom_types.Team.id, custom_types.Team.id]]] = [
+        [] for _ in range(size['ROUNDS'])]
+    team_id = 1
+    for division_id in range(1, size['DIVISIONS'] + 1):
+        rows[tables.Division].append(
+            {'id': division_id, 'name': 'Division ' + str(division_id)})
+
+        division_team_ids = []
+        for _ in range(size['TEAMS_PER_DIVISION']):
+            rows[tables.Team].append({'id': team_id, 'name': 'Team ' + str(team_id), 'division_id': division_id,
+                                      'slug': 'team-' + str(team_id), 'seed': 1, 'color': '%06x' % rng.randrange(16**6)})
+            division_team_ids.append(team_id)
+            team_id += 1
+
+        for round_index, (matchups, _) in enumerate(scheduler.round_robin(division_team_ids, size['ROUNDS'])):
+            # alternate home and away every round
+            matchups_by_round[round_index].extend(
+                matchups if round_index % 2 == 0 else [(away_team_id, home_team_id) for home_team_id, away_team_id in matchups])
+
+    game_id = 1
+    for round_index, matchups in enumerate(matchups_by_round):
+        rng.shuffle(matchups)
+        round_team_ids = [team_id for matchup in matchups for team_id in matchup]
+        for i, (home_team_id, away_team_id) in enumerate(matchups):
+            scored = round_index < scored_rounds
+            rows[tables.Game].append({
+                'id': game_id,
+                'round_id': round_index + 1,
+                'home_team_id': home_team_id,
+                'away_team_id': away_team_id,
+                'officiating_team_id': round_team_ids[(2 * i + 2) % len(round_team_ids)],
+                'datetime': season_start + datetime_module.timedelta(weeks=round_index, hours=i // size['LOCATIONS']),
+                'location_id': i % size['LOCATIONS'] + 1,
+                'is_accepting_scores': not scored,
+                'home_team_score': rng.randint(0, 20) if scored else None,
+                'away_team_score': rng.randint(0, 20) if scored else None,
+            })
+            game_id += 1
+
+    rows[tables.Tournament].append({'id': 1, 'name': 'Playoffs'})
+    playoff_start = season_start + \
+        datetime_module.timedelta(weeks=size['ROUNDS'])
+    bracket_round = 1
+    games_in_round = max(size['DIVISIONS'] * size['TEAMS_PER_DIVISION'] // 4, 1)
+    while games_in_round >= 1:
+        for i in range(games_in_round):
+            rows[tables.Game].append({
+                'id': game_id,
+                'round_id': size['ROUNDS'] + bracket_round,
+                'home_team_id': None,
+                'away_team_id': None,
+                'officiating_team_id': None,
+                'datetime': playoff_start + datetime_module.timedelta(weeks=bracket_round - 1, hours=i // size['LOCATIONS']),
+                'location_id': i % size['LOCATIONS'] + 1,
+                'is_accepting_scores': False,
+                'home_team_score': None,
+                'away_team_score': None,
+            })
+            rows[tables.TournamentGame].append({
+                'game_id': game_id,
+                'tournament_id': 1,
+                'bracket_id': 1,
+                'round': bracket_round,
+                'home_team_filler': 'Winner ' + str(2 * i + 1) if bracket_round > 1 else 'Seed ' + str(i + 1),
+                'away_team_filler': 'Winner ' + str(2 * i + 2) if bracket_round > 1 else 'Seed ' + str(2 * games_in_round - i),
+                'officiating_team_filler': None,
+            })
+            game_id += 1
+        games_in_round //= 2
+        bracket_round += 1
+
+    paths = ['/', '/schedule', '/standings'] + \
+        ['/teams/team-' + str(team_id) for team_id in range(1, team_id)]
+    for visit_id in range(1, size['VISITS'] + 1):
+        rows[tables.Visit].append({
+            'id': visit_id,
+            'datetime': season_start + datetime_module.timedelta(seconds=rng.randrange(max(int((now - season_start).total_seconds()), 1))),
+            'path': rng.choice(paths),
+        })
+
+    return rows
+
+
+async def generate(engine: AsyncEngine, size: LeagueSize, seed: int = 0) -> None:
+    """create the tables and fill them with a synthetic league"""
+
+    rows = league_rows(size, seed)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+        for table, table_rows in rows.items():
+            if len(table_rows) > 0:
+                await conn.execute(insert(table), table_rows)
+
+        # the ids were given explicitly, move the sequences past them so later inserts do not collide
+        if conn.dialect.name == 'postgresql':
+            for table, table_rows in rows.items():
+                if 'id' in table.__table__.c and len(table_rows) > 0:
+                    await conn.execute(text("SELECT setval(pg_get_serial_sequence('{0}', 'id'), (SELECT max(id) FROM {0}))".format(
+                        table.__table__.name)))
@@ -0,0 +1,59 @@
+from pathlib import Path
+from contextlib import contextmanager
+import subprocess
+import tempfile
+import shutil
+
+from benchmarks import run
+
+"""
+Developer's Note:
+A throwaway PostgreSQL cluster for the benchmark suites, so they run against the same league on PostgreSQL as on SQLite:
+
+    python -m benchmarks.run --postgres
+    python -m benchmarks.workers --postgres --pg-bin /usr/lib/postgresql/16/bin
+
+The cluster is created with initdb in a temporary directory, listens on a free port on localhost only, and is deleted on
+exit. It needs the server binaries (initdb and pg_ctl, found on PATH, through pg_config, or in --pg-bin) and the postgres
+extra (pip install uirpsoftball[postgres], for asyncpg). initdb refuses to run as root.
+"""
+
+
+def find_bin_dir(bin_dir: Path | None = None) -> Path:
+    """returns the directory of initdb and pg_ctl"""
+
+    if bin_dir is not None:
+        return bin_dir
+
+    initdb = shutil.which('initdb')
+    if initdb is not None:
+        return Path(initdb).parent
+
+    pg_config = shutil.which('pg_config')
+    if pg_config is not None:
+        return Path(subprocess.run([pg_config, '--bindir'], capture_output=True, text=True, check=True).stdout.strip())
+
+    raise RuntimeError(
+        'PostgreSQL server binaries not found, put initdb and pg_ctl on PATH or pass their directory with --pg-bin')
+
+
+@contextmanager
+def throwaway_postgres(bin_dir: Path | None = None):
+    """yields the URL of a fresh PostgreSQL cluster, which is stopped and deleted on exit"""
+
+    bin_dir = find_bin_dir(bin_dir)
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_dir = Path(directory) / 'data'
+        subprocess.run([str(bin_dir / 'initdb'), '-D', str(data_dir), '-U', 'postgres', '--auth=trust', '-E', 'UTF8', '--no-sync'],
+                       check=True, stdout=subprocess.DEVNULL)
+
+        port = run.free_port()
+        subprocess.run([str(bin_dir / 'pg_ctl'), '-D', str(data_dir), '-l', str(Path(directory) / 'postgres.log'), '-w',
+                        '-o', '-p {} -k {} -c listen_addresses=127.0.0.1'.format(port, directory), 'start'],
+                       check=True, stdout=subprocess.DEVNULL)
+        try:
+            yield 'postgresql+asyncpg://postgres@127.0.0.1:{}/postgres?prepared_statement_cache_size=500'.format(port)
+        finally:
+            subprocess.run([str(bin_dir / 'pg_ctl'), '-D', str(data_dir), '-m', 'immediate', '-w', 'stop'],
+                           stdout=subprocess.DEVNULL)
@@ -0,0 +1,321 @@
+from pathlib import Path
+from typing import TypedDict
+from collections.abc import Callable, Awaitable
+import datetime as datetime_module
+import contextlib
+import subprocess
+import statistics
+import tempfile
+import platform
+import socket
+import asyncio
+import sys
+import typer
+import json
+import yaml
+import time
+import os
+
+from benchmarks import league
+
+"""
+Developer's Note:
+Times the hot paths of the API against a synthetic league in a temporary SQLite database, or a throwaway PostgreSQL cluster
+with --postgres (see benchmarks/postgres.py), everything runs in-process.
+
+    python -m benchmarks.run --teams-per-division 10 --output bench_output.json --compare previous.json
+
+The overhead of the metrics instrumentation is the difference between a run with --no-metrics and one with --metrics.
+The response cache is off unless --response-cache is given, otherwise the page cases would only time cache hits.
+With --query-budget fail a page over its query budget returns 500 and fails the run, tests/test_query_budgets.py checks
+every page the same way.
+
+The configuration environment variables are set before uirpsoftball.config is first imported, so the app only ever sees the
+temporary database.
+"""
+
+REPO_DIR = Path(__file__).parent.parent
+
+
+class Timing(TypedDict):
+    iterations: int
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+Case = Callable[[], Awaitable[None]]
+
+# cold starts, each run in a fresh interpreter
+STARTUP_COMMANDS: dict[str, list[str]] = {
+    'startup.cli_help': ['-m', 'uirpsoftball.cli', '--help'],
+    'startup.worker_boot': ['-c', 'import uvicorn; from uirpsoftball.app import app'],
+}
+
+cli = typer.Typer()
+
+
+def configure(directory: Path, database_url: str | None = None, metrics_enabled: bool = True, response_cache_enabled: bool = False, query_budget_mode: str = 'off', odds_simulations: int | None = None) -> str:
+    """point the app at a fresh config in `directory`, returns the database url"""
+
+    if database_url is None:
+        database_url = 'sqlite+aiosqlite:///' + \
+            str(directory / 'league.db')
+
+    backend_config_path = directory / 'backend.yaml'
+    shared_config_path = directory / 'shared.yaml'
+    backend_config_path.write_text(yaml.safe_dump({
+        'DB': {'URL': database_url},
+        'UVICORN': {},
+        'OPENAPI_SCHEMA_PATH': str(directory / 'openapi_schema.json'),
+        'METRICS': {'ENABLED': metrics_enabled},
+        'RESPONSE_CACHE': {'ENABLED': response_cache_enabled},
+        'QUERY_BUDGET': {'MODE': query_budget_mode},
+        **({} if odds_simulations is None else {'ODDS': {'SIMULATIONS': odds_simulations}}),
+    }))
+    shared_config_path.write_text(yaml.safe_dump({
+        'BACKEND_URL': 'http://localhost:8080',
+        'FRONTEND_URL': 'http://localhost:3000',
+    }))
+
+    os.environ['BACKEND_CONFIG_PATH'] = str(backend_config_path)
+    os.environ['SHARED_CONFIG_PATH'] = str(shared_config_path)
+    return database_url
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def timing(durations: list[float]) -> Timing:
+
+    durations = sorted(durations)
+    return {
+        'iterations': len(durations),
+        'min_ms': durations[0],
+        'median_ms': statistics.median(durations),
+        'mean_ms': statistics.fmean(durations),
+        'p95_ms': durations[min(int(len(durations) * 0.95), len(durations) - 1)],
+        'max_ms': durations[-1],
+    }
+
+
+async def time_case(case: Case, iterations: int, warmup: int) -> Timing:
+
+    for _ in range(warmup):
+        await case()
+
+    durations: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await case()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return timing(durations)
+
+
+def time_startup(iterations: int, only: list[str]) -> dict[str, Timing]:
+    """time the startup commands, the config environment variables must already be set"""
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(REPO_DIR / 'src')] + ([env['PYTHONPATH']] if 'PYTHONPATH' in env else []))
+
+    results: dict[str, Timing] = {}
+    for name, arguments in STARTUP_COMMANDS.items():
+        if len(only) > 0 and not any(name.startswith(prefix) for prefix in only):
+            continue
+
+        durations: list[float] = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            subprocess.run([sys.executable] + arguments, env=env,
+                           stdout=subprocess.DEVNULL, check=True)
+            durations.append((time.perf_counter() - start) * 1000)
+
+        results[name] = timing(durations)
+        print('{:<32} median {:>9.2f} ms   p95 {:>9.2f} ms'.format(
+            name, results[name]['median_ms'], results[name]['p95_ms']))
+
+    return results
+
+
+def build_cases() -> dict[str, Case]:
+    """every benchmarked hot path, keyed by a stable name so runs can be compared"""
+
+    from sqlmodel import select, col
+    from uirpsoftball import config, asgi_client
+    from uirpsoftball.app import app
+    from uirpsoftball.models import tables
+    from uirpsoftball.services import team as team_service, game as game_service
+
+    team_id = 1
+    division_id = 1
+
+    def page(path: str) -> Case:
+        async def case():
+            response = await asgi_client.get(app, path)
+            if response['status_code'] != 200:
+                raise RuntimeError(path + ' returned ' +
+                                   str(response['status_code']))
+        return case
+
+    async def calculate_statistics():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            team_ids = (await session.exec(select(col(tables.Team.id)))).all()
+            await team_service.Team.calculate_statistics(session, team_ids)
+
+    async def update_seeds():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            await team_service.Team.update_seeds(session, division_id)
+
+    async def fetch_team_unknown_games():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            await game_service.Game.fetch_team_unknown_games(session, team_id)
+
+    score_updates = 0
+
+    async def update_score():
+        nonlocal score_updates
+        score_updates += 1
+        response = await asgi_client.send_json(app, 'PATCH', '/games/1/score/', {
+            'home_team_score': score_updates % 7,
+            'away_team_score': score_updates % 5,
+        })
+        if response['status_code'] != 200:
+            raise RuntimeError('update_score returned ' +
+                               str(response['status_code']))
+
+    cases: dict[str, Case] = {
+        'pages.home': page('/pages/'),
+        'pages.team': page('/pages/team/team-' + str(team_id) + '/'),
+        'pages.schedule': page('/pages/schedule/'),
+        'pages.game': page('/pages/game/1/'),
+        'pages.standings': page('/pages/standings/'),
+        'pages.admin': page('/pages/admin/'),
+        'team.calculate_statistics': calculate_statistics,
+        'team.update_seeds': update_seeds,
+        'game.fetch_team_unknown_games': fetch_team_unknown_games,
+        'game.update_score': update_score,
+    }
+    if config.METRICS_ENABLED:
+        cases['metrics.render'] = page('/admin/metrics/')
+    return cases
+
+
+async def run_cases(size: league.LeagueSize, seed: int, iterations: int, warmup: int, only: list[str]) -> dict[str, Timing]:
+
+    from uirpsoftball import config
+
+    await league.generate(config.DB_ASYNC_ENGINE, size, seed)
+
+    results: dict[str, Timing] = {}
+    for name, case in build_cases().items():
+        if len(only) > 0 and not any(name.startswith(prefix) for prefix in only):
+            continue
+        results[name] = await time_case(case, iterations, warmup)
+        print('{:<32} median {:>9.2f} ms   p95 {:>9.2f} ms'.format(
+            name, results[name]['median_ms'], results[name]['p95_ms']))
+
+    await config.DB_READ_ASYNC_ENGINE.dispose()
+    await config.DB_ASYNC_ENGINE.dispose()
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(previous: dict, current: dict) -> None:
+    print()
+    print('{:<32} {:>12} {:>12} {:>8}'.format(
+        'case', 'before (ms)', 'after (ms)', 'ratio'))
+    for name, timing in current['results'].items():
+        if name in previous.get('results', {}):
+            before = previous['results'][name]['median_ms']
+            after = timing['median_ms']
+            print('{:<32} {:>12.2f} {:>12.2f} {:>7.2f}x'.format(
+                name, before, after, after / before if before > 0 else float('nan')))
+
+
+@cli.command()
+def main(
+    divisions: int = league.DEFAULT_LEAGUE_SIZE['DIVISIONS'],
+    teams_per_division: int = league.DEFAULT_LEAGUE_SIZE['TEAMS_PER_DIVISION'],
+    rounds: int = league.DEFAULT_LEAGUE_SIZE['ROUNDS'],
+    scored_fraction: float = league.DEFAULT_LEAGUE_SIZE['SCORED_FRACTION'],
+    visits: int = league.DEFAULT_LEAGUE_SIZE['VISITS'],
+    locations: int = league.DEFAULT_LEAGUE_SIZE['LOCATIONS'],
+    seed: int = 0,
+    iterations: int = 20,
+    warmup: int = 2,
+    only: list[str] = typer.Option(
+        [], help='Only run cases whose name starts with one of these prefixes'),
+    metrics: bool = typer.Option(
+        True, help='Run with the metrics middleware and engine instrumentation, compare both to measure their overhead'),
+    startup_iterations: int = typer.Option(
+        5, help='Cold starts of the CLI and of a worker to time, 0 to skip them'),
+    output: Path = Path('bench_output.json'),
+    compare: Path | None = typer.Option(
+        None, help='Previous output to compare the medians against'),
+    response_cache: bool = typer.Option(
+        False, help='Serve the pages from the response cache'),
+    postgres: bool = typer.Option(
+        False, help='Run against a throwaway PostgreSQL cluster instead of SQLite'),
+    pg_bin: Path | None = typer.Option(
+        None, help='Directory of initdb and pg_ctl, defaults to PATH'),
+    query_budget: str = typer.Option(
+        'off', help='Query budget mode, with fail a page over its budget fails the run'),
+):
+    """Run the benchmark suite and write the timings as JSON."""
+
+    size: league.LeagueSize = {
+        'DIVISIONS': divisions,
+        'TEAMS_PER_DIVISION': teams_per_division,
+        'ROUNDS': rounds,
+        'SCORED_FRACTION': scored_fraction,
+        'VISITS': visits,
+        'LOCATIONS': locations,
+    }
+
+    from benchmarks import postgres as postgres_harness
+
+    with contextlib.ExitStack() as stack:
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        database_url = stack.enter_context(
+            postgres_harness.throwaway_postgres(pg_bin)) if postgres else None
+        database_url = configure(
+            Path(directory), database_url, metrics_enabled=metrics, response_cache_enabled=response_cache, query_budget_mode=query_budget)
+        results = asyncio.run(run_cases(size, seed, iterations, warmup, only))
+        if startup_iterations > 0:
+            results.update(time_startup(startup_iterations, only))
+
+    report = {
+        'created': datetime_module.datetime.now(tz=datetime_module.timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': database_url.split(':')[0],
+        'metrics': metrics,
+        'response_cache': response_cache,
+        'query_budget': query_budget,
+        'league_size': size,
+        'seed': seed,
+        'results': results,
+    }
+    output.write_text(json.dumps(report, indent=2))
+    print('Wrote ' + str(output))
+
+    if compare is not None:
+        print_comparison(json.loads(compare.read_text()), report)
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,238 @@
+from pathlib import Path
+from typing import TypedDict
+from concurrent.futures import ProcessPoolExecutor
+import datetime as datetime_module
+import subprocess
+import statistics
+import contextlib
+import tempfile
+import platform
+import asyncio
+import random
+import sys
+import typer
+import json
+import time
+import os
+
+from benchmarks import league, run, postgres as postgres_harness
+
+"""
+Developer's Note:
+Measures how the throughput of the API scales with the number of uvicorn workers. For each worker count, a server is
+started on the same synthetic league, warmed up, and driven by closed-loop clients (every client sends its next request as
+soon as the previous one returns) for a fixed duration.
+
+    python -m benchmarks.workers --workers 1 --workers 2 --workers 4 --duration 20
+
+A small fraction of the requests are score updates, so every worker keeps seeing its caches go stale through the shared
+data version, like on a game night. The clients run in their own processes, keep --client-processes plus the largest
+worker count at or below the number of cores to measure the server rather than the machine.
+"""
+
+READ_PATHS = ['/pages/', '/pages/team/{team_slug}/', '/pages/schedule/',
+              '/pages/standings/', '/pages/game/{game_id}/']
+
+
+class WorkersResult(TypedDict):
+    workers: int
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float | None
+    p95_ms: float | None
+    speedup: float
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(run.REPO_DIR / 'src')] + ([env['PYTHONPATH']] if 'PYTHONPATH' in env else []))
+    return subprocess.Popen([sys.executable, '-m', 'uvicorn', 'uirpsoftball.app:app', '--host', '127.0.0.1',
+                             '--port', str(port), '--workers', str(workers), '--log-level', 'warning'], env=env)
+
+
+async def wait_until_ready(base_url: str, timeout: float) -> None:
+
+    from uirpsoftball import loadtest
+
+    send = loadtest.url_sender(base_url)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = await send({'method': 'GET', 'path': '/pages/'})
+            if response['status_code'] == 200:
+                return
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(
+                'Server at {} did not start within {}s'.format(base_url, timeout))
+        await asyncio.sleep(0.2)
+
+
+async def _drive(base_url: str, size: league.LeagueSize, concurrency: int, duration: float, write_fraction: float, seed: int) -> tuple[list[float], int]:
+
+    from uirpsoftball import loadtest
+
+    send = loadtest.url_sender(base_url)
+    rng = random.Random(seed)
+    teams = size['DIVISIONS'] * size['TEAMS_PER_DIVISION']
+    games = size['DIVISIONS'] * size['ROUNDS'] * \
+        (size['TEAMS_PER_DIVISION'] // 2)
+    deadline = time.perf_counter() + duration
+
+    latencies: list[float] = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            game_id = rng.randint(1, games)
+            if rng.random() < write_fraction:
+                params = {
+                    'method': 'PATCH',
+                    'path': '/games/{}/score/'.format(game_id),
+                    'headers': {'content-type': 'application/json'},
+                    'body': json.dumps({'home_team_score': rng.randint(0, 20), 'away_team_score': rng.randint(0, 20)}).encode(),
+                }
+            else:
+                params = {
+                    'method': 'GET',
+                    'path': rng.choice(READ_PATHS).format(team_slug='team-{}'.format(rng.randint(1, teams)), game_id=game_id),
+                }
+
+            start = time.perf_counter()
+            try:
+                response = await send(params)
+                if response['status_code'] >= 400:
+                    errors += 1
+            except OSError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return latencies, errors
+
+
+def drive(base_url: str, size: league.LeagueSize, concurrency: int, duration: float, write_fraction: float, seed: int) -> tuple[list[float], int]:
+    """one client process, returns the latencies in ms and the number of errors"""
+    return asyncio.run(_drive(base_url, size, concurrency, duration, write_fraction, seed))
+
+
+def measure(workers: int, size: league.LeagueSize, concurrency: int, client_processes: int, duration: float, warmup: float, write_fraction: float, seed: int) -> tuple[list[float], int]:
+
+    port = run.free_port()
+    base_url = 'http://127.0.0.1:{}'.format(port)
+    server = start_server(workers, port)
+    try:
+        asyncio.run(wait_until_ready(base_url, 60))
+        drive(base_url, size, concurrency, warmup, write_fraction, seed)
+
+        latencies: list[float] = []
+        errors = 0
+        with ProcessPoolExecutor(client_processes) as executor:
+            futures = [executor.submit(drive, base_url, size, concurrency, duration, write_fraction, seed + i)
+                       for i in range(client_processes)]
+            for future in futures:
+                client_latencies, client_errors = future.result()
+                latencies.extend(client_latencies)
+                errors += client_errors
+        return latencies, errors
+
+    finally:
+        server.terminate()
+        server.wait(30)
+
+
+cli = typer.Typer()
+
+
+@cli.command()
+def main(
+    workers: list[int] = typer.Option(
+        [1, 2, 4], help='Worker counts to measure, the first is the baseline'),
+    divisions: int = league.DEFAULT_LEAGUE_SIZE['DIVISIONS'],
+    teams_per_division: int = league.DEFAULT_LEAGUE_SIZE['TEAMS_PER_DIVISION'],
+    rounds: int = league.DEFAULT_LEAGUE_SIZE['ROUNDS'],
+    seed: int = 0,
+    concurrency: int = typer.Option(
+        16, help='Concurrent clients in each client process'),
+    client_processes: int = 2,
+    duration: float = 20.0,
+    warmup: float = 3.0,
+    write_fraction: float = typer.Option(
+        0.02, help='Fraction of the requests that update a score'),
+    output: Path = Path('bench_workers.json'),
+    response_cache: bool = typer.Option(
+        True, help='Serve the pages from the response cache, as in production'),
+    postgres: bool = typer.Option(
+        False, help='Run against a throwaway PostgreSQL cluster instead of SQLite'),
+    pg_bin: Path | None = typer.Option(
+        None, help='Directory of initdb and pg_ctl, defaults to PATH'),
+):
+    """Measure the throughput of the API with each number of workers and write it as JSON."""
+
+    size: league.LeagueSize = dict(league.DEFAULT_LEAGUE_SIZE)
+    size.update({
+        'DIVISIONS': divisions,
+        'TEAMS_PER_DIVISION': teams_per_division,
+        'ROUNDS': rounds,
+    })
+
+    results: list[WorkersResult] = []
+    with contextlib.ExitStack() as stack:
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        database_url = stack.enter_context(
+            postgres_harness.throwaway_postgres(pg_bin)) if postgres else None
+        database_url = run.configure(
+            Path(directory), database_url, metrics_enabled=False, response_cache_enabled=response_cache)
+
+        from uirpsoftball import config
+
+        async def generate():
+            await league.generate(config.DB_ASYNC_ENGINE, size, seed)
+            await config.DB_ASYNC_ENGINE.dispose()
+
+        asyncio.run(generate())
+
+        for worker_count in workers:
+            latencies, errors = measure(worker_count, size, concurrency, client_processes,
+                                        duration, warmup, write_fraction, seed)
+            latencies.sort()
+            throughput = len(latencies) / duration
+            result: WorkersResult = {
+                'workers': worker_count,
+                'requests': len(latencies),
+                'errors': errors,
+                'throughput': throughput,
+                'p50_ms': statistics.median(latencies) if len(latencies) > 0 else None,
+                'p95_ms': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] if len(latencies) > 0 else None,
+                'speedup': throughput / results[0]['throughput'] if len(results) > 0 and results[0]['throughput'] > 0 else 1.0,
+            }
+            results.append(result)
+            print('{:>2} workers  {:>8.1f} req/s  {:>5.2f}x  p50 {:>8.2f} ms  p95 {:>8.2f} ms  errors {}'.format(
+                worker_count, throughput, result['speedup'], result['p50_ms'] or 0.0, result['p95_ms'] or 0.0, errors))
+
+    report = {
+        'created': datetime_module.datetime.now(tz=datetime_module.timezone.utc).isoformat(),
+        'commit': run.git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'database': database_url.split(':')[0],
+        'league_size': size,
+        'concurrency': concurrency,
+        'client_processes': client_processes,
+        'duration': duration,
+        'write_fraction': write_fraction,
+        'response_cache': response_cache,
+        'results': results,
+    }
+    output.write_text(json.dumps(report, indent=2))
+    print('Wrote ' + str(output))
+
+
+if __name__ == '__main__':
+    cli()
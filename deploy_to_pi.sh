@@ -1 +1,7 @@
-scp -r data/ pi:/home/pi/Repos/uirpsoftball/uirpsoftball_api/
+# ships the local database as snapshots (see src/uirpsoftball/snapshot.py): a snapshot is taken here, the snapshots the
+# Pi does not have yet are copied, and the latest is verified and swapped in there in one transaction, while the server
+# keeps running
+set -e
+./cli.sh snapshot
+rsync -a --ignore-existing data/snapshots/ pi:/home/pi/Repos/uirpsoftball/uirpsoftball_api/data/snapshots_deployed/
+ssh pi 'cd /home/pi/Repos/uirpsoftball/uirpsoftball_api && APP_ENV=prod .venv/bin/python -m src.uirpsoftball.cli restore --directory data/snapshots_deployed'
@@ -1 +1,7 @@
-scp -r pi_public:/home/pi/Repos/uirpsoftball/uirpsoftball_api/data/* data_staging/
+# pulls the Pi's database as snapshots (see src/uirpsoftball/snapshot.py): a snapshot is taken on the Pi while the server
+# keeps running, the snapshots not pulled yet are copied, and the latest is verified and restored into data_staging/
+set -e
+ssh pi_public 'cd /home/pi/Repos/uirpsoftball/uirpsoftball_api && APP_ENV=prod .venv/bin/python -m src.uirpsoftball.cli snapshot'
+mkdir -p data_staging/snapshots
+rsync -a --ignore-existing pi_public:/home/pi/Repos/uirpsoftball/uirpsoftball_api/data/snapshots/ data_staging/snapshots/
+./cli.sh restore --directory data_staging/snapshots --to data_staging/uirpsoftball.db
@@ -2,8 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from uirpsoftball import config
-from uirpsoftball.routers import division, game, location, pages, seeding_parameter, team, tournament_game, tournament, visit
+from uirpsoftball import config, metrics, request_context, query_budget, server_timing, profiler, response_cache
+from uirpsoftball.services import standings as standings_service
+from uirpsoftball.routers import batch, calendar, division, game, location, pages, seeding_parameter, team, tournament_game, tournament, visit, metrics as metrics_router
 
 
 @asynccontextmanager
@@ -11,8 +12,20 @@ async def lifespan(app: FastAPI):
     print('startingup')
     yield
     print('closingdown')
+    standings_service.Standings.shutdown()
+    await config.DB_READ_ASYNC_ENGINE.dispose()
+    await config.DB_ASYNC_ENGINE.dispose()
 
 app = FastAPI(lifespan=lifespan)
+# innermost, CORSMiddleware adds its headers to the cached responses per request
+if config.RESPONSE_CACHE_ENABLED:
+    app.add_middleware(response_cache.ResponseCacheMiddleware,
+                       paths=config.RESPONSE_CACHE_PATHS,
+                       max_age=config.RESPONSE_CACHE_MAX_AGE,
+                       max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+                       minimum_size=config.RESPONSE_CACHE_MINIMUM_SIZE,
+                       gzip_level=config.RESPONSE_CACHE_GZIP_LEVEL,
+                       brotli_quality=config.RESPONSE_CACHE_BROTLI_QUALITY)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[config.FRONTEND_URL],
@@ -21,13 +34,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+request_context.instrument_engine(config.DB_ASYNC_ENGINE, 'write')
+if config.DB_READ_ASYNC_ENGINE is not config.DB_ASYNC_ENGINE:
+    request_context.instrument_engine(config.DB_READ_ASYNC_ENGINE, 'read')
+if config.SERVER_TIMING_ENABLED:
+    app.add_middleware(server_timing.ServerTimingMiddleware,
+                       allow_origin=config.FRONTEND_URL)
+app.add_middleware(query_budget.QueryBudgetMiddleware,
+                   mode=config.QUERY_BUDGET_MODE,
+                   repeat_threshold=config.QUERY_BUDGET_REPEAT_THRESHOLD)
+
+if config.METRICS_ENABLED:
+    metrics.instrument_engine(config.DB_ASYNC_ENGINE, 'write')
+    if config.DB_READ_ASYNC_ENGINE is not config.DB_ASYNC_ENGINE:
+        metrics.instrument_engine(config.DB_READ_ASYNC_ENGINE, 'read')
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.include_router(metrics_router.MetricsRouter().router)
+
+# outermost, the middlewares above read the context it sets
+app.add_middleware(request_context.RequestContextMiddleware,
+                   track_statements=config.QUERY_BUDGET_MODE != 'off',
+                   track_timing=config.SERVER_TIMING_ENABLED)
+
+if config.PROFILER_TOKEN is not None or config.PROFILER_ROUTE is not None:
+    app.add_middleware(profiler.ProfilerMiddleware,
+                       routes=app.router.routes,
+                       directory=config.PROFILER_DIRECTORY,
+                       token=config.PROFILER_TOKEN,
+                       mode=config.PROFILER_MODE,
+                       sampling_interval=config.PROFILER_SAMPLING_INTERVAL,
+                       route=config.PROFILER_ROUTE,
+                       requests=config.PROFILER_REQUESTS)
+
 
 app.include_router(division.DivisionRouter().router)
+app.include_router(division.DivisionAdminRouter().router)
 app.include_router(team.TeamRouter().router)
+app.include_router(team.TeamAdminRouter().router)
 app.include_router(game.GameRouter().router)
+app.include_router(game.GameAdminRouter().router)
 app.include_router(location.LocationRouter().router)
+app.include_router(location.LocationAdminRouter().router)
 app.include_router(seeding_parameter.SeedingParameterRouter().router)
+app.include_router(seeding_parameter.SeedingParameterAdminRouter().router)
 app.include_router(tournament.TournamentRouter().router)
+app.include_router(tournament.TournamentAdminRouter().router)
 app.include_router(tournament_game.TournamentGameRouter().router)
+app.include_router(tournament_game.TournamentGameAdminRouter().router)
 app.include_router(visit.VisitRouter().router)
+app.include_router(visit.VisitAdminRouter().router)
 app.include_router(pages.PagesRouter().router)
+app.include_router(calendar.CalendarRouter().router)
+app.include_router(batch.BatchRouter().router)
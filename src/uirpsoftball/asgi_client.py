@@ -0,0 +1,90 @@
+from typing import TypedDict, NotRequired
+from collections.abc import Callable, Awaitable, MutableMapping
+from urllib.parse import urlsplit
+import json
+
+"""
+Developer's Note:
+A minimal client that calls an ASGI app directly, without a socket or an HTTP library in between.
+Used to drive the FastAPI app in-process (benchmarks, load tests).
+"""
+
+ASGIApp = Callable[[MutableMapping, Callable[[], Awaitable[dict]],
+                    Callable[[dict], Awaitable[None]]], Awaitable[None]]
+
+
+class Response(TypedDict):
+    status_code: int
+    headers: list[tuple[str, str]]
+    body: bytes
+
+
+class RequestParams(TypedDict):
+    method: str
+    path: str
+    headers: NotRequired[dict[str, str]]
+    body: NotRequired[bytes]
+
+
+async def request(app: ASGIApp, params: RequestParams) -> Response:
+    """send one HTTP request to the app, `path` may include a query string"""
+
+    url = urlsplit(params['path'])
+    body = params.get('body', b'')
+    headers = [(key.lower().encode('latin-1'), value.encode('latin-1'))
+               for key, value in params.get('headers', {}).items()]
+    if len(body) > 0:
+        headers.append((b'content-length', str(len(body)).encode('latin-1')))
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0', 'spec_version': '2.3'},
+        'http_version': '1.1',
+        'method': params['method'].upper(),
+        'scheme': 'http',
+        'path': url.path,
+        'raw_path': url.path.encode('latin-1'),
+        'root_path': '',
+        'query_string': url.query.encode('latin-1'),
+        'headers': [(b'host', b'testserver')] + headers,
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+        'state': {},
+    }
+
+    request_sent = False
+
+    async def receive() -> dict:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        return {'type': 'http.disconnect'}
+
+    response: Response = {'status_code': 500, 'headers': [], 'body': b''}
+    chunks: list[bytes] = []
+
+    async def send(message: dict) -> None:
+        if message['type'] == 'http.response.start':
+            response['status_code'] = message['status']
+            response['headers'] = [(key.decode('latin-1'), value.decode('latin-1'))
+                                   for key, value in message.get('headers', [])]
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    response['body'] = b''.join(chunks)
+    return response
+
+
+async def get(app: ASGIApp, path: str, headers: dict[str, str] = {}) -> Response:
+    return await request(app, {'method': 'GET', 'path': path, 'headers': headers})
+
+
+async def send_json(app: ASGIApp, method: str, path: str, data, headers: dict[str, str] = {}) -> Response:
+    return await request(app, {
+        'method': method,
+        'path': path,
+        'headers': {**headers, 'content-type': 'application/json'},
+        'body': json.dumps(data).encode(),
+    })
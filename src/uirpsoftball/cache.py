@@ -0,0 +1,157 @@
+from typing import Generic, TypeVar
+from pathlib import Path
+from contextlib import contextmanager
+import mmap
+import struct
+import os
+from uirpsoftball import config
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+"""
+Developer's Note:
+In-process caches of values computed from the league data (standings, simulations, ...).
+
+Every write to the database bumps the data version. A cached value is only served while the data version it was computed
+from is still current, so nothing has to be invalidated explicitly. A process that can apply its own write to a cached
+value in place (the head to head matrices) carries the value over to the version its write bumped to with carry_over.
+
+The data version lives in a small memory mapped file (config.DATA_VERSION_PATH) shared by every process using the
+database: each uvicorn worker, the CLI, ... A write in one worker makes the caches of every other worker stale, and
+reading the version costs a read from memory. Bumping it takes an exclusive lock on the file. Without a path, or on
+platforms without fcntl, the version is kept in process, which is only coherent with a single worker.
+"""
+
+TKey = TypeVar('TKey')
+TValue = TypeVar('TValue')
+
+DataVersion = int
+
+_VERSION_FORMAT = struct.Struct('<Q')
+
+
+class LocalCounter:
+    _value: DataVersion
+
+    def __init__(self):
+        self._value = 0
+
+    def value(self) -> DataVersion:
+        return self._value
+
+    def increment(self) -> DataVersion:
+        self._value += 1
+        return self._value
+
+
+class SharedCounter:
+    """a counter stored in the first 8 bytes of a file, shared by every process mapping it"""
+
+    path: Path
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size < _VERSION_FORMAT.size:
+            with self._locked():
+                if os.fstat(self._fd).st_size < _VERSION_FORMAT.size:
+                    os.ftruncate(self._fd, _VERSION_FORMAT.size)
+        self._mmap = mmap.mmap(self._fd, _VERSION_FORMAT.size)
+
+    @contextmanager
+    def _locked(self):
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def value(self) -> DataVersion:
+        return _VERSION_FORMAT.unpack_from(self._mmap, 0)[0]
+
+    def increment(self) -> DataVersion:
+        with self._locked():
+            value = self.value() + 1
+            _VERSION_FORMAT.pack_into(self._mmap, 0, value)
+        return value
+
+
+_counter: LocalCounter | SharedCounter | None = None
+
+
+def counter() -> LocalCounter | SharedCounter:
+    """returns the data version counter, mapping the shared file on first use, after uvicorn has started the worker"""
+
+    global _counter
+    if _counter is None:
+        path = config.DATA_VERSION_PATH
+        if path is None or fcntl is None:
+            _counter = LocalCounter()
+        else:
+            _counter = SharedCounter(path)
+    return _counter
+
+
+def data_version() -> DataVersion:
+    """returns the current data version"""
+    return counter().value()
+
+
+def bump_data_version() -> DataVersion:
+    """mark every cached value as stale, in every process, call after committing a write"""
+    return counter().increment()
+
+
+class VersionedCache(Generic[TKey, TValue]):
+    _entries: dict[TKey, tuple[DataVersion, TValue]]
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, key: TKey) -> TValue | None:
+        """returns the cached value, or None if it is missing or stale"""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        version, value = entry
+        if version != data_version():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: TKey, value: TValue, version: DataVersion) -> None:
+        """store a value computed from the data at `version`, read the version before starting the computation"""
+
+        if version == data_version():
+            self._entries[key] = (version, value)
+
+    def entries(self) -> tuple[DataVersion, dict[TKey, TValue]]:
+        """returns the current data version and the values cached for it"""
+
+        version = data_version()
+        return version, {key: value for key, (entry_version, value) in self._entries.items() if entry_version == version}
+
+    def carry_over(self, values: dict[TKey, TValue], from_version: DataVersion, to_version: DataVersion) -> None:
+        """keep `values`, read with entries() at `from_version` before a write, as the values of `to_version`, the version
+        the write bumped to, once the write has been applied to them in place
+        they are dropped instead when another write bumped the version too, or when the entry was replaced meanwhile"""
+
+        carried = to_version == from_version + 1 and to_version == data_version()
+        for key, value in values.items():
+            entry = self._entries.get(key)
+            if entry is None or entry[1] is not value:
+                continue
+            if carried and entry[0] == from_version:
+                self._entries[key] = (to_version, value)
+            else:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,23 +1,43 @@
 import typer
 import asyncio
 import json
-from sqlmodel import SQLModel
-import uvicorn
-from uirpsoftball import models, config
-from uirpsoftball.app import app as fastapi_app
-from uirpsoftball.services import game as game_service
+import os
+from datetime import datetime
+from pathlib import Path
+from uirpsoftball import config
+
+"""
+Developer's Note:
+Commands import what they need when they run, so `--help` and the commands that never serve a request do not pay for
+importing the app, SQLModel or uvicorn.
+"""
 
 cli = typer.Typer()
 
 
 @cli.command()
-def runserver():
-    uvicorn.run("uirpsoftball.app:app", **config.UVICORN)
+def runserver(workers: int | None = typer.Option(None, help='Worker processes, defaults to UVICORN.workers of the config')):
+    import uvicorn
+
+    uvicorn_config = dict(config.UVICORN)
+    uvicorn_config['workers'] = workers if workers is not None else config.UVICORN_WORKERS
+    # the workers size their odds process pools by it
+    os.environ['WEB_CONCURRENCY'] = str(uvicorn_config['workers'])
+
+    # uvicorn ignores workers when reloading
+    if uvicorn_config.get('workers', 1) > 1 and uvicorn_config.get('reload', False):
+        print('Reload is not supported with multiple workers, disabling reload.')
+        uvicorn_config['reload'] = False
+
+    uvicorn.run("uirpsoftball.app:app", **uvicorn_config)
 
 
 @cli.command()
 def create_tables():
     """Create all database tables."""
+    from sqlmodel import SQLModel
+    from uirpsoftball import models
+
     async def _main():
         async with config.DB_ASYNC_ENGINE.begin() as conn:
             await conn.run_sync(SQLModel.metadata.create_all)
@@ -26,14 +46,278 @@ def create_tables():
     asyncio.run(_main())
 
 
+@cli.command()
+def create_indexes():
+    """Create the indexes missing from existing tables, create_tables only indexes the tables it creates."""
+    from sqlmodel import SQLModel
+    from uirpsoftball import models
+
+    def create(conn):
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    async def _main():
+        async with config.DB_ASYNC_ENGINE.begin() as conn:
+            await conn.run_sync(create)
+
+    print("Creating indexes...")
+    asyncio.run(_main())
+
+
+@cli.command()
+def shuffle_divisions(
+    seed: int | None = typer.Option(
+        None, help='Random seed, the same seed gives the same divisions'),
+    balance: bool = typer.Option(
+        False, help='Deal the teams out by their previous seed so every division gets the same spread'),
+):
+    """Reassign every team to a random division and reseed all divisions."""
+    from uirpsoftball.services import division as division_service
+
+    async def _main():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            division_id_by_team_id = await division_service.Division.shuffle(session, seed=seed, balance=balance)
+        await config.DB_ASYNC_ENGINE.dispose()
+        return division_id_by_team_id
+
+    print('Shuffled {} teams.'.format(len(asyncio.run(_main()))))
+
+
+@cli.command()
+def generate_schedule(
+    first_round_start: datetime = typer.Argument(
+        ..., help='Start of the first slot of the first round, in UTC'),
+    rounds: int = 12,
+    round_interval_days: int = 7,
+    slot_interval_minutes: int = 60,
+    first_round_id: int = 1,
+    seed: int | None = typer.Option(
+        None, help='Random seed, the same seed gives the same schedule'),
+    replace: bool = typer.Option(
+        False, help='Delete the regular season games already in these rounds'),
+):
+    """Schedule a round robin season for every division and print its fairness."""
+    from datetime import timedelta, timezone
+    from uirpsoftball.services import game as game_service
+
+    async def _main():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            schedule = await game_service.Game.generate_schedule(
+                session,
+                first_round_start.replace(tzinfo=timezone.utc),
+                rounds,
+                round_interval=timedelta(days=round_interval_days),
+                slot_interval=timedelta(minutes=slot_interval_minutes),
+                first_round_id=first_round_id,
+                seed=seed,
+                replace=replace,
+            )
+        await config.DB_ASYNC_ENGINE.dispose()
+        return schedule
+
+    schedule = asyncio.run(_main())
+    fairness = {key: value for key,
+                value in schedule['fairness'].items() if key != 'teams'}
+    print('Scheduled {} games.'.format(len(schedule['games'])))
+    print(json.dumps(fairness, indent=2))
+
+
+@cli.command('export')
+def export_league(
+    path: Path = typer.Argument(
+        ..., help='A .json file, or a directory to write one CSV per table to'),
+    format: str | None = typer.Option(
+        None, help='json or csv, defaults to json for .json paths and csv otherwise'),
+):
+    """Export the league (everything but visits) to JSON or CSV."""
+    from uirpsoftball import league_io
+
+    if format not in (None, 'json', 'csv'):
+        raise typer.BadParameter('format must be json or csv')
+
+    async def _main():
+        counts = await league_io.export_league(config.DB_READ_ASYNC_ENGINE, path, format)
+        await config.DB_READ_ASYNC_ENGINE.dispose()
+        await config.DB_ASYNC_ENGINE.dispose()
+        return counts
+
+    for table_name, count in asyncio.run(_main()).items():
+        print('{:>8} {}'.format(count, table_name))
+
+
+@cli.command('import')
+def import_league(
+    path: Path = typer.Argument(
+        ..., help='A .json file, or a directory of CSVs, written by export'),
+    format: str | None = typer.Option(
+        None, help='json or csv, defaults to json for .json paths and csv otherwise'),
+    replace: bool = typer.Option(
+        False, help='Delete the league in the database first'),
+):
+    """Import a league exported by export in one transaction, nothing is written if any row fails."""
+    import time
+    from sqlalchemy.exc import IntegrityError
+    from uirpsoftball import league_io, cache
+
+    if format not in (None, 'json', 'csv'):
+        raise typer.BadParameter('format must be json or csv')
+
+    async def _main():
+        counts = await league_io.import_league(config.DB_ASYNC_ENGINE, path, format, replace=replace)
+        await config.DB_ASYNC_ENGINE.dispose()
+        return counts
+
+    start = time.perf_counter()
+    try:
+        counts = asyncio.run(_main())
+    except (league_io.LeagueImportError, IntegrityError) as e:
+        print('Nothing imported: ' + str(e).splitlines()[0])
+        raise typer.Exit(1)
+    cache.bump_data_version()
+
+    for table_name, count in counts.items():
+        print('{:>8} {}'.format(count, table_name))
+    print('Imported in {:.2f}s'.format(time.perf_counter() - start))
+
+
+def _snapshot_directory(directory: Path | None) -> Path:
+    directory = directory or config.SNAPSHOT_DIRECTORY
+    if directory is None:
+        raise typer.BadParameter(
+            'Snapshots need a SQLite database file, or SNAPSHOT.DIRECTORY and --directory')
+    return directory
+
+
+@cli.command()
+def snapshot(
+    full: bool = typer.Option(
+        False, help='Store every page instead of the pages changed since the latest snapshot'),
+    directory: Path | None = typer.Option(
+        None, help='Defaults to SNAPSHOT.DIRECTORY of the config'),
+):
+    """Take a consistent, compressed snapshot of the SQLite database while the server is running."""
+    from uirpsoftball import snapshot as snapshot_module
+
+    if config.SQLITE_PATH is None:
+        raise typer.BadParameter('Snapshots need a SQLite database file')
+
+    info, new = snapshot_module.take(
+        config.SQLITE_PATH, _snapshot_directory(directory), full=full)
+    if not new:
+        print('Unchanged since snapshot {}.'.format(info['name']))
+        return
+    print('Snapshot {}: {} of {} pages, {} bytes{}'.format(info['name'], info['changed_pages'], info['page_count'],
+          info['pages_size'], '' if info['base'] is None else ', on ' + info['base']))
+
+
+@cli.command()
+def list_snapshots(directory: Path | None = typer.Option(None, help='Defaults to SNAPSHOT.DIRECTORY of the config')):
+    """List the snapshots, oldest first."""
+    from uirpsoftball import snapshot as snapshot_module
+
+    for info in snapshot_module.list_snapshots(_snapshot_directory(directory)):
+        print('{}  {:>7} of {:>7} pages  {:>10} bytes  {}'.format(
+            info['name'], info['changed_pages'], info['page_count'], info['pages_size'], info['base'] or 'full'))
+
+
+@cli.command()
+def restore(
+    name: str | None = typer.Argument(
+        None, help='Snapshot to restore, defaults to the latest'),
+    directory: Path | None = typer.Option(
+        None, help='Defaults to SNAPSHOT.DIRECTORY of the config'),
+    to: Path | None = typer.Option(
+        None, help='Database file to restore into, defaults to the configured database'),
+):
+    """Verify a snapshot and swap it into the database in one transaction."""
+    from uirpsoftball import snapshot as snapshot_module, cache
+
+    directory = _snapshot_directory(directory)
+    database = to or config.SQLITE_PATH
+    if database is None:
+        raise typer.BadParameter('Restores need a SQLite database file, or --to')
+
+    if name is None:
+        snapshots = snapshot_module.list_snapshots(directory)
+        if len(snapshots) == 0:
+            raise typer.BadParameter('No snapshots in {}'.format(directory))
+        name = snapshots[-1]['name']
+
+    try:
+        info = snapshot_module.restore(directory, name, database)
+    except snapshot_module.SnapshotError as e:
+        print('Nothing restored: ' + str(e))
+        raise typer.Exit(1)
+
+    # the running server's caches hold the data from before
+    if config.SQLITE_PATH is not None and database.resolve() == config.SQLITE_PATH.resolve():
+        cache.bump_data_version()
+    print('Restored snapshot {} into {}, checksum {}'.format(
+        info['name'], database, info['database_sha256'][:16]))
+
+
 @cli.command()
 def export_openapi():
     """Export OpenAPI schema to file."""
 
+    from uirpsoftball.app import app as fastapi_app
+
     print('Exporting OpenAPI schema...')
     config.OPENAPI_SCHEMA_PATH.write_text(json.dumps(fastapi_app.openapi()))
 
 
+@cli.command()
+def loadtest(
+    profile: Path = typer.Argument(
+        config.EXAMPLES_DIR / 'loadtest' / 'game_night.yaml', help='YAML traffic profile'),
+    url: str | None = typer.Option(
+        None, help='Base URL of a running server, the app is driven in-process if omitted'),
+    output: Path | None = typer.Option(
+        None, help='Also write the report as JSON'),
+    seed: int | None = None,
+):
+    """Replay a traffic profile against the app and report latency, throughput and errors per endpoint."""
+    from uirpsoftball import loadtest as loadtest_module
+
+    if url is None:
+        from uirpsoftball.app import app as fastapi_app
+        target = 'in-process'
+        send = loadtest_module.in_process_sender(fastapi_app)
+    else:
+        target = url
+        send = loadtest_module.url_sender(url)
+
+    report = asyncio.run(loadtest_module.run(
+        loadtest_module.load_profile(profile), send, target, seed))
+
+    print(loadtest_module.format_report(report))
+    if output is not None:
+        output.write_text(json.dumps(report, indent=2))
+
+
+@cli.command()
+def list_profiles(directory: Path | None = typer.Option(None, help='Defaults to PROFILER.DIRECTORY of the config')):
+    """List the request profiles written by the profiler."""
+    from uirpsoftball import profiler
+
+    for info in profiler.list_profiles(directory or config.PROFILER_DIRECTORY):
+        print('{}  {:<8} {:>4} {:>9.1f} ms  {:>6} samples  {}  {}'.format(
+            info['started'], info['method'], info['status_code'], info['duration'] * 1000, info['samples'], info['path'], info['profile']))
+
+
+@cli.command()
+def summarize_profile(
+    profiles: list[Path] = typer.Argument(
+        ..., help='Profiles to summarize together, all .collapsed or all .pstats'),
+    top: int = 20,
+):
+    """Summarize request profiles by the frames they spent the most time in."""
+    from uirpsoftball import profiler
+
+    print(profiler.summarize(profiles, top))
+
+
 @cli.command()
 def test():
 
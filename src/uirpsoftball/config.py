@@ -1,19 +1,20 @@
-from sqlmodel.ext.asyncio.session import AsyncSession as SQLMAsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, async_sessionmaker
-import json
 from pathlib import Path
+from functools import cached_property
 import os
 import typing
 from typing import TypedDict, NotRequired, Literal
-import yaml
-from dotenv import dotenv_values
-import datetime as datetime_module
-import isodate
-from platformdirs import user_config_dir
 import warnings
-import secrets
-from uirpsoftball import custom_types
-import toml
+
+if typing.TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+    from sqlmodel.ext.asyncio.session import AsyncSession as SQLMAsyncSession
+
+"""
+Developer's Note:
+Importing this module has no side effects. The values read from the config files live on the Settings object and are
+computed the first time they are used, so `config.ASYNC_SESSIONMAKER` reads the config files and creates the engine on
+first access, and CLI commands that never touch the database never pay for it.
+"""
 
 UIRPSOFTBALL_DIR = Path(__file__).parent
 SRC_DIR = UIRPSOFTBALL_DIR.parent
@@ -27,22 +28,6 @@ EXAMPLE_SHARED_CONFIG_PATH = EXAMPLES_CONFIG_DIR / "shared.yaml"
 
 PYPROJECT_TOML_PATH = REPO_DIR / "pyproject.toml"
 
-PYPROJECT_TOML_CONTENT = toml.load(PYPROJECT_TOML_PATH)
-
-# POSSIBLE ENVIRONMENT VARIABLES
-
-# Priority 1. These three paths are explicit paths set to config files
-_backend_config_path = os.getenv('BACKEND_CONFIG_PATH', None)
-_shared_config_path = os.getenv('SHARED_CONFIG_PATH', None)
-
-# also included is 'FRONTEND_CONFIG_PATH', which is not used in the backend
-
-# Priority 2. This specifies the config directory, names of config files are fixed
-_config_env_dir = os.getenv('CONFIG_ENV_DIR', None)
-
-# Priority 3. This specifies the name of the config folder, parent direct is the user config dir
-_app_env = os.getenv('APP_ENV', None)
-
 
 def convert_env_path_to_absolute(root_dir: Path, a: str) -> Path:
     """process a relative path sent to an environment variable"""
@@ -69,87 +54,476 @@ def process_explicit_config_path(config_path: str | None) -> Path | None:
         return path
 
 
-BACKEND_CONFIG_PATH = process_explicit_config_path(_backend_config_path)
-SHARED_CONFIG_PATH = process_explicit_config_path(_shared_config_path)
+class SharedConfig(TypedDict):
+    BACKEND_URL: str
+    FRONTEND_URL: str
 
-if BACKEND_CONFIG_PATH is None or SHARED_CONFIG_PATH is None:
 
-    if _config_env_dir is not None:
-        CONFIG_ENV_DIR = convert_env_path_to_absolute(
-            Path.cwd(), _config_env_dir)
-    else:
-        # this is going to reference the USER_CONFIG_DIR
-        USER_CONFIG_DIR = Path(user_config_dir(
-            PYPROJECT_TOML_CONTENT['project']['name'], appauthor=False))
-
-        if not USER_CONFIG_DIR.exists():
-            warnings.warn(
-                'Config dir {} does not exist. Creating a new one.'.format(USER_CONFIG_DIR))
-            USER_CONFIG_DIR.mkdir()
-
-        if _app_env is not None:
-            CONFIG_ENV_DIR = USER_CONFIG_DIR / _app_env
-        else:
-            CONFIG_ENV_DIR = USER_CONFIG_DIR / 'dev'
-            warnings.warn(
-                'Environment variables APP_ENV and CONFIG_ENV_DIR are not set. Defaulting to builtin dev environment located at {}.'.format(CONFIG_ENV_DIR))
-
-    if not CONFIG_ENV_DIR.exists():
-        CONFIG_ENV_DIR.mkdir()
-        warnings.warn(
-            'Config env dir {} does not exist. Creating a new one.'.format(CONFIG_ENV_DIR))
-
-    if BACKEND_CONFIG_PATH is None:
-        BACKEND_CONFIG_PATH = CONFIG_ENV_DIR / EXAMPLE_BACKEND_CONFIG_PATH.name
-        if not BACKEND_CONFIG_PATH.exists():
-            warnings.warn(
-                'Backend config file {} does not exist. Creating a new one.'.format(BACKEND_CONFIG_PATH))
-            BACKEND_CONFIG_PATH.write_text(
-                EXAMPLE_BACKEND_CONFIG_PATH.read_text())
-
-    if SHARED_CONFIG_PATH is None:
-        SHARED_CONFIG_PATH = CONFIG_ENV_DIR / EXAMPLE_SHARED_CONFIG_PATH.name
-        if not SHARED_CONFIG_PATH.exists():
-            warnings.warn(
-                'Shared config file {} does not exist. Creating a new one.'.format(SHARED_CONFIG_PATH))
-            SHARED_CONFIG_PATH.write_text(
-                EXAMPLE_SHARED_CONFIG_PATH.read_text())
-
-# Shared config
+class DbEnv(TypedDict):
+    URL: str
+    READ_URL: NotRequired[str]
+    READ_POOL_SIZE: NotRequired[int]
+    WRITE_POOL_SIZE: NotRequired[int]
+    ENGINE: NotRequired[dict]
 
 
-class SharedConfig(TypedDict):
-    BACKEND_URL: str
-    FRONTEND_URL: str
+class OddsConfig(TypedDict):
+    SIMULATIONS: NotRequired[int]
+    PROCESSES: NotRequired[int]
 
 
-with SHARED_CONFIG_PATH.open('r') as f:
-    _SHARED_CONFIG: SharedConfig = yaml.safe_load(f)
+class MetricsConfig(TypedDict):
+    ENABLED: NotRequired[bool]
 
-BACKEND_URL = _SHARED_CONFIG['BACKEND_URL']
-FRONTEND_URL = _SHARED_CONFIG['FRONTEND_URL']
 
+class ServerTimingConfig(TypedDict):
+    ENABLED: NotRequired[bool]
 
-class DbEnv(TypedDict):
-    URL: str
+
+class ProfilerConfig(TypedDict):
+    TOKEN: NotRequired[str]
+    DIRECTORY: NotRequired[str]
+    MODE: NotRequired[Literal['sampling', 'cprofile']]
+    SAMPLING_INTERVAL: NotRequired[float]
+    ROUTE: NotRequired[str]
+    REQUESTS: NotRequired[int]
+
+
+class CacheConfig(TypedDict):
+    DATA_VERSION_PATH: NotRequired[str | None]
+
+
+class SnapshotConfig(TypedDict):
+    DIRECTORY: NotRequired[str]
+
+
+class ResponseCacheConfig(TypedDict):
+    ENABLED: NotRequired[bool]
+    PATHS: NotRequired[list[str]]
+    MAX_AGE: NotRequired[float]
+    MAX_ENTRIES: NotRequired[int]
+    MINIMUM_SIZE: NotRequired[int]
+    GZIP_LEVEL: NotRequired[int]
+    BROTLI_QUALITY: NotRequired[int]
+
+
+class QueryBudgetConfig(TypedDict):
+    MODE: NotRequired[Literal['off', 'warn', 'fail']]
+    REPEAT_THRESHOLD: NotRequired[int]
 
 
 class BackendConfig(TypedDict):
     DB: DbEnv
     UVICORN: dict
     OPENAPI_SCHEMA_PATH: str
+    ODDS: NotRequired[OddsConfig]
+    CACHE: NotRequired[CacheConfig]
+    SNAPSHOT: NotRequired[SnapshotConfig]
+    RESPONSE_CACHE: NotRequired[ResponseCacheConfig]
+    METRICS: NotRequired[MetricsConfig]
+    QUERY_BUDGET: NotRequired[QueryBudgetConfig]
+    SERVER_TIMING: NotRequired[ServerTimingConfig]
+    PROFILER: NotRequired[ProfilerConfig]
+
+
+def _create_async_engine(url, pool_size: int, max_overflow: int, options: dict) -> 'AsyncEngine':
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = make_url(url)
+    # in-memory SQLite gets a StaticPool, which takes no sizes
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return create_async_engine(url, **options)
+    return create_async_engine(url, **{'pool_size': pool_size, 'max_overflow': max_overflow, **options})
+
+
+def _create_sessionmaker(engine: 'AsyncEngine') -> 'async_sessionmaker[SQLMAsyncSession]':
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from sqlmodel.ext.asyncio.session import AsyncSession as SQLMAsyncSession
+    return async_sessionmaker(
+        bind=engine,
+        class_=SQLMAsyncSession,
+        expire_on_commit=False
+    )
+
+
+class Settings:
+
+    @cached_property
+    def PYPROJECT_TOML_CONTENT(self) -> dict:
+        import toml
+        return toml.load(PYPROJECT_TOML_PATH)
+
+    @cached_property
+    def _CONFIG_PATHS(self) -> tuple[Path, Path]:
+        """returns the backend and shared config paths, creating them from the examples if needed"""
+
+        # POSSIBLE ENVIRONMENT VARIABLES
+
+        # Priority 1. These three paths are explicit paths set to config files
+        backend_config_path = process_explicit_config_path(
+            os.getenv('BACKEND_CONFIG_PATH', None))
+        shared_config_path = process_explicit_config_path(
+            os.getenv('SHARED_CONFIG_PATH', None))
+
+        # also included is 'FRONTEND_CONFIG_PATH', which is not used in the backend
+
+        # Priority 2. This specifies the config directory, names of config files are fixed
+        config_env_dir = os.getenv('CONFIG_ENV_DIR', None)
+
+        # Priority 3. This specifies the name of the config folder, parent direct is the user config dir
+        app_env = os.getenv('APP_ENV', None)
+
+        if backend_config_path is None or shared_config_path is None:
+
+            if config_env_dir is not None:
+                CONFIG_ENV_DIR = convert_env_path_to_absolute(
+                    Path.cwd(), config_env_dir)
+            else:
+                from platformdirs import user_config_dir
+
+                # this is going to reference the USER_CONFIG_DIR
+                USER_CONFIG_DIR = Path(user_config_dir(
+                    self.PYPROJECT_TOML_CONTENT['project']['name'], appauthor=False))
+
+                if not USER_CONFIG_DIR.exists():
+                    warnings.warn(
+                        'Config dir {} does not exist. Creating a new one.'.format(USER_CONFIG_DIR))
+                    USER_CONFIG_DIR.mkdir()
+
+                if app_env is not None:
+                    CONFIG_ENV_DIR = USER_CONFIG_DIR / app_env
+                else:
+                    CONFIG_ENV_DIR = USER_CONFIG_DIR / 'dev'
+                    warnings.warn(
+                        'Environment variables APP_ENV and CONFIG_ENV_DIR are not set. Defaulting to builtin dev environment located at {}.'.format(CONFIG_ENV_DIR))
+
+            if not CONFIG_ENV_DIR.exists():
+                CONFIG_ENV_DIR.mkdir()
+                warnings.warn(
+                    'Config env dir {} does not exist. Creating a new one.'.format(CONFIG_ENV_DIR))
+
+            if backend_config_path is None:
+                backend_config_path = CONFIG_ENV_DIR / EXAMPLE_BACKEND_CONFIG_PATH.name
+                if not backend_config_path.exists():
+                    warnings.warn(
+                        'Backend config file {} does not exist. Creating a new one.'.format(backend_config_path))
+                    backend_config_path.write_text(
+                        EXAMPLE_BACKEND_CONFIG_PATH.read_text())
+
+            if shared_config_path is None:
+                shared_config_path = CONFIG_ENV_DIR / EXAMPLE_SHARED_CONFIG_PATH.name
+                if not shared_config_path.exists():
+                    warnings.warn(
+                        'Shared config file {} does not exist. Creating a new one.'.format(shared_config_path))
+                    shared_config_path.write_text(
+                        EXAMPLE_SHARED_CONFIG_PATH.read_text())
+
+        return backend_config_path, shared_config_path
+
+    @property
+    def BACKEND_CONFIG_PATH(self) -> Path:
+        return self._CONFIG_PATHS[0]
+
+    @property
+    def SHARED_CONFIG_PATH(self) -> Path:
+        return self._CONFIG_PATHS[1]
+
+    # Shared config
+
+    @cached_property
+    def _SHARED_CONFIG(self) -> SharedConfig:
+        import yaml
+        with self.SHARED_CONFIG_PATH.open('r') as f:
+            return yaml.safe_load(f)
+
+    @property
+    def BACKEND_URL(self) -> str:
+        return self._SHARED_CONFIG['BACKEND_URL']
+
+    @property
+    def FRONTEND_URL(self) -> str:
+        return self._SHARED_CONFIG['FRONTEND_URL']
+
+    # Backend config
+
+    @cached_property
+    def _BACKEND_CONFIG(self) -> BackendConfig:
+        import yaml
+        with self.BACKEND_CONFIG_PATH.open('r') as f:
+            return yaml.safe_load(f)
+
+    def _section(self, name: str) -> typing.Any:
+        """an optional section of the backend config, a section holding only comments is null and counts as empty"""
+        return self._BACKEND_CONFIG.get(name) or {}
+
+    @property
+    def _DB_CONFIG(self) -> DbEnv:
+        return self._BACKEND_CONFIG['DB']
+
+    @cached_property
+    def DB_ASYNC_ENGINE(self) -> 'AsyncEngine':
+        """the engine for writes, a small pool is enough as SQLite runs one writer at a time"""
+        return _create_async_engine(self._DB_CONFIG['URL'], self._DB_CONFIG.get('WRITE_POOL_SIZE', 2), 0, self._DB_CONFIG.get('ENGINE', {}))
+
+    @cached_property
+    def DB_READ_ASYNC_ENGINE(self) -> 'AsyncEngine':
+        """the engine for reads, its connections cannot write: SQLite is opened read-only (mode=ro) with the query_only
+        pragma, other databases run read only transactions"""
+
+        from sqlalchemy import event
+        from sqlalchemy.engine import make_url
+
+        url = make_url(self._DB_CONFIG.get('READ_URL', self._DB_CONFIG['URL']))
+        is_sqlite = url.get_backend_name() == 'sqlite'
+
+        # an in-memory database only exists on the connections of the writer engine
+        if is_sqlite and url.database in (None, '', ':memory:'):
+            return self.DB_ASYNC_ENGINE
+
+        if is_sqlite and url.query.get('uri') != 'true':
+            url = url.set(database='file:' + url.database,
+                          query={**url.query, 'mode': 'ro', 'uri': 'true'})
+
+        engine = _create_async_engine(
+            url, self._DB_CONFIG.get('READ_POOL_SIZE', 10), 10, self._DB_CONFIG.get('ENGINE', {}))
+
+        def connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            if is_sqlite:
+                cursor.execute('PRAGMA query_only = ON')
+            else:
+                cursor.execute(
+                    'SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY')
+            cursor.close()
+            # a rolled back SET is undone, and the driver may have opened a transaction for it
+            dbapi_connection.commit()
+
+        event.listen(engine.sync_engine, 'connect', connect)
+        return engine
+
+    @cached_property
+    def ASYNC_SESSIONMAKER(self) -> 'async_sessionmaker[SQLMAsyncSession]':
+        """sessions for writes, and for reads that must see them"""
+        return _create_sessionmaker(self.DB_ASYNC_ENGINE)
+
+    @cached_property
+    def READ_ASYNC_SESSIONMAKER(self) -> 'async_sessionmaker[SQLMAsyncSession]':
+        """sessions for GET traffic, anything that writes through them fails"""
+        return _create_sessionmaker(self.DB_READ_ASYNC_ENGINE)
+
+    @property
+    def UVICORN(self) -> dict:
+        return self._BACKEND_CONFIG['UVICORN']
+
+    @property
+    def UVICORN_WORKERS(self) -> int:
+        """worker processes serving the app, WEB_CONCURRENCY like uvicorn's --workers default, `cli runserver` sets it for its workers"""
+        return int(os.getenv('WEB_CONCURRENCY') or self.UVICORN.get('workers') or 1)
+
+    @cached_property
+    def OPENAPI_SCHEMA_PATH(self) -> Path:
+        return convert_env_path_to_absolute(
+            Path.cwd(), self._BACKEND_CONFIG['OPENAPI_SCHEMA_PATH'])
+
+    @property
+    def _ODDS_CONFIG(self) -> OddsConfig:
+        return self._section('ODDS')
+
+    @property
+    def ODDS_SIMULATIONS(self) -> int:
+        return self._ODDS_CONFIG.get('SIMULATIONS', 2000)
+
+    @property
+    def ODDS_PROCESSES(self) -> int:
+        # every worker starts its own pool, together they use each core once
+        return self._ODDS_CONFIG.get('PROCESSES', max(1, (os.cpu_count() or 1) // self.UVICORN_WORKERS))
+
+    @property
+    def _CACHE_CONFIG(self) -> CacheConfig:
+        return self._section('CACHE')
+
+    @cached_property
+    def DATA_VERSION_PATH(self) -> Path | None:
+        """the file holding the data version shared by every process using the database, None keeps it in process
+        defaults to a file next to a SQLite database, or one in the temp dir named after the database URL"""
+
+        if 'DATA_VERSION_PATH' in self._CACHE_CONFIG:
+            data_version_path = self._CACHE_CONFIG['DATA_VERSION_PATH']
+            if data_version_path is None:
+                return None
+            return convert_env_path_to_absolute(Path.cwd(), data_version_path)
+
+        if self.SQLITE_PATH is not None:
+            return self.SQLITE_PATH.with_name(self.SQLITE_PATH.name + '.version')
+
+        from sqlalchemy.engine import make_url
+        url = make_url(self._BACKEND_CONFIG['DB']['URL'])
+        if url.get_backend_name() == 'sqlite':
+            return None
+
+        import tempfile
+        import hashlib
+        return Path(tempfile.gettempdir()) / 'uirpsoftball-{}.version'.format(
+            hashlib.sha1(url.render_as_string(hide_password=False).encode()).hexdigest()[:12])
+
+    @cached_property
+    def SQLITE_PATH(self) -> Path | None:
+        """the database file, None if the database is not a SQLite file"""
+
+        from sqlalchemy.engine import make_url
+        url = make_url(self._BACKEND_CONFIG['DB']['URL'])
+        if url.get_backend_name() != 'sqlite' or url.database is None or url.database in ('', ':memory:'):
+            return None
+        return convert_env_path_to_absolute(Path.cwd(), url.database)
+
+    @property
+    def _SNAPSHOT_CONFIG(self) -> SnapshotConfig:
+        return self._section('SNAPSHOT')
+
+    @cached_property
+    def SNAPSHOT_DIRECTORY(self) -> Path | None:
+        """where snapshots of the SQLite database are written, defaults to snapshots/ next to the database file"""
+
+        if 'DIRECTORY' in self._SNAPSHOT_CONFIG:
+            return convert_env_path_to_absolute(Path.cwd(), self._SNAPSHOT_CONFIG['DIRECTORY'])
+        if self.SQLITE_PATH is None:
+            return None
+        return self.SQLITE_PATH.parent / 'snapshots'
+
+    @property
+    def _RESPONSE_CACHE_CONFIG(self) -> ResponseCacheConfig:
+        return self._section('RESPONSE_CACHE')
+
+    @property
+    def RESPONSE_CACHE_ENABLED(self) -> bool:
+        return self._RESPONSE_CACHE_CONFIG.get('ENABLED', True)
+
+    @property
+    def RESPONSE_CACHE_PATHS(self) -> list[str]:
+        return self._RESPONSE_CACHE_CONFIG.get('PATHS', ['/pages/'])
+
+    @property
+    def RESPONSE_CACHE_MAX_AGE(self) -> float:
+        return self._RESPONSE_CACHE_CONFIG.get('MAX_AGE', 60)
+
+    @property
+    def RESPONSE_CACHE_MAX_ENTRIES(self) -> int:
+        return self._RESPONSE_CACHE_CONFIG.get('MAX_ENTRIES', 256)
+
+    @property
+    def RESPONSE_CACHE_MINIMUM_SIZE(self) -> int:
+        return self._RESPONSE_CACHE_CONFIG.get('MINIMUM_SIZE', 512)
+
+    @property
+    def RESPONSE_CACHE_GZIP_LEVEL(self) -> int:
+        return self._RESPONSE_CACHE_CONFIG.get('GZIP_LEVEL', 9)
+
+    @property
+    def RESPONSE_CACHE_BROTLI_QUALITY(self) -> int:
+        return self._RESPONSE_CACHE_CONFIG.get('BROTLI_QUALITY', 9)
+
+    @property
+    def _METRICS_CONFIG(self) -> MetricsConfig:
+        return self._section('METRICS')
+
+    @property
+    def METRICS_ENABLED(self) -> bool:
+        return self._METRICS_CONFIG.get('ENABLED', True)
+
+    @property
+    def _QUERY_BUDGET_CONFIG(self) -> QueryBudgetConfig:
+        return self._section('QUERY_BUDGET')
+
+    @property
+    def QUERY_BUDGET_MODE(self) -> Literal['off', 'warn', 'fail']:
+        return self._QUERY_BUDGET_CONFIG.get('MODE', 'off')
+
+    @property
+    def QUERY_BUDGET_REPEAT_THRESHOLD(self) -> int:
+        return self._QUERY_BUDGET_CONFIG.get('REPEAT_THRESHOLD', 3)
+
+    @property
+    def _SERVER_TIMING_CONFIG(self) -> ServerTimingConfig:
+        return self._section('SERVER_TIMING')
+
+    @property
+    def SERVER_TIMING_ENABLED(self) -> bool:
+        return self._SERVER_TIMING_CONFIG.get('ENABLED', False)
+
+    @property
+    def _PROFILER_CONFIG(self) -> ProfilerConfig:
+        return self._section('PROFILER')
+
+    @property
+    def PROFILER_TOKEN(self) -> str | None:
+        return self._PROFILER_CONFIG.get('TOKEN', None)
+
+    @cached_property
+    def PROFILER_DIRECTORY(self) -> Path:
+        return convert_env_path_to_absolute(
+            Path.cwd(), self._PROFILER_CONFIG.get('DIRECTORY', './profiles'))
+
+    @property
+    def PROFILER_MODE(self) -> Literal['sampling', 'cprofile']:
+        return self._PROFILER_CONFIG.get('MODE', 'sampling')
+
+    @property
+    def PROFILER_SAMPLING_INTERVAL(self) -> float:
+        return self._PROFILER_CONFIG.get('SAMPLING_INTERVAL', 0.001)
+
+    @property
+    def PROFILER_ROUTE(self) -> str | None:
+        return self._PROFILER_CONFIG.get('ROUTE', None)
 
-with BACKEND_CONFIG_PATH.open('r') as f:
-    _BACKEND_CONFIG: BackendConfig = yaml.safe_load(f)
+    @property
+    def PROFILER_REQUESTS(self) -> int:
+        return self._PROFILER_CONFIG.get('REQUESTS', 0)
 
-DB_ASYNC_ENGINE = create_async_engine(_BACKEND_CONFIG['DB']['URL'])
-ASYNC_SESSIONMAKER = async_sessionmaker(
-    bind=DB_ASYNC_ENGINE,
-    class_=SQLMAsyncSession,
-    expire_on_commit=False
-)
-UVICORN = _BACKEND_CONFIG['UVICORN']
 
-OPENAPI_SCHEMA_PATH = convert_env_path_to_absolute(
-    Path.cwd(), _BACKEND_CONFIG['OPENAPI_SCHEMA_PATH'])
+SETTINGS = Settings()
 
+if typing.TYPE_CHECKING:
+    PYPROJECT_TOML_CONTENT: dict
+    BACKEND_CONFIG_PATH: Path
+    SHARED_CONFIG_PATH: Path
+    BACKEND_URL: str
+    FRONTEND_URL: str
+    DB_ASYNC_ENGINE: AsyncEngine
+    DB_READ_ASYNC_ENGINE: AsyncEngine
+    ASYNC_SESSIONMAKER: async_sessionmaker[SQLMAsyncSession]
+    READ_ASYNC_SESSIONMAKER: async_sessionmaker[SQLMAsyncSession]
+    UVICORN: dict
+    UVICORN_WORKERS: int
+    OPENAPI_SCHEMA_PATH: Path
+    ODDS_SIMULATIONS: int
+    ODDS_PROCESSES: int
+    DATA_VERSION_PATH: Path | None
+    SQLITE_PATH: Path | None
+    SNAPSHOT_DIRECTORY: Path | None
+    RESPONSE_CACHE_ENABLED: bool
+    RESPONSE_CACHE_PATHS: list[str]
+    RESPONSE_CACHE_MAX_AGE: float
+    RESPONSE_CACHE_MAX_ENTRIES: int
+    RESPONSE_CACHE_MINIMUM_SIZE: int
+    RESPONSE_CACHE_GZIP_LEVEL: int
+    RESPONSE_CACHE_BROTLI_QUALITY: int
+    METRICS_ENABLED: bool
+    QUERY_BUDGET_MODE: Literal['off', 'warn', 'fail']
+    QUERY_BUDGET_REPEAT_THRESHOLD: int
+    SERVER_TIMING_ENABLED: bool
+    PROFILER_TOKEN: str | None
+    PROFILER_DIRECTORY: Path
+    PROFILER_MODE: Literal['sampling', 'cprofile']
+    PROFILER_SAMPLING_INTERVAL: float
+    PROFILER_ROUTE: str | None
+    PROFILER_REQUESTS: int
+
+
+def __getattr__(name: str):
+    """config.X reads X from SETTINGS, so the existing call sites stay lazy"""
+
+    if not name.startswith('_') and hasattr(Settings, name):
+        return getattr(SETTINGS, name)
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name))
@@ -0,0 +1,185 @@
+from typing import TypedDict, NotRequired
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import datetime as datetime_module
+
+"""
+Developer's Note:
+Writes iCalendar (RFC 5545) feeds. Events are written in the local time of their time zone (DTSTART;TZID=...), and every
+time zone used gets a VTIMEZONE covering the years of the events, with one component per UTC offset transition found
+in zoneinfo, so calendar clients show the right time without their own copy of the zone. Unknown time zones are written
+in UTC.
+
+The output only depends on its input (DTSTAMP is passed in), so an unchanged feed is the same bytes.
+"""
+
+PRODUCT_ID = '-//uirpsoftball//calendar//EN'
+MAX_LINE_OCTETS = 75
+UTC = datetime_module.timezone.utc
+
+
+class Event(TypedDict):
+    uid: str
+    start: datetime_module.datetime
+    end: datetime_module.datetime
+    summary: str
+    time_zone: str
+    location: NotRequired[str | None]
+    url: NotRequired[str | None]
+    description: NotRequired[str | None]
+
+
+def escape_text(value: str) -> str:
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def fold(line: str) -> str:
+    """splits a content line into lines of at most 75 octets, continuation lines start with a space"""
+
+    encoded = line.encode('utf-8')
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line
+
+    parts: list[str] = []
+    current = ''
+    current_octets = 0
+    limit = MAX_LINE_OCTETS
+    for character in line:
+        octets = len(character.encode('utf-8'))
+        if current_octets + octets > limit:
+            parts.append(current)
+            current, current_octets = '', 0
+            # the leading space of the continuation line counts
+            limit = MAX_LINE_OCTETS - 1
+        current += character
+        current_octets += octets
+    parts.append(current)
+    return '\r\n '.join(parts)
+
+
+def format_utc(value: datetime_module.datetime) -> str:
+    return value.astimezone(UTC).strftime('%Y%m%dT%H%M%SZ')
+
+
+def format_local(value: datetime_module.datetime) -> str:
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def format_offset(offset: datetime_module.timedelta) -> str:
+    seconds = int(offset.total_seconds())
+    sign = '+' if seconds >= 0 else '-'
+    hours, remainder = divmod(abs(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return '{}{:02d}{:02d}'.format(sign, hours, minutes) + ('{:02d}'.format(seconds) if seconds else '')
+
+
+def get_zone(time_zone: str) -> ZoneInfo | None:
+    """returns the zone, None if it is unknown"""
+
+    try:
+        return ZoneInfo(time_zone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def transitions(zone: ZoneInfo, start: datetime_module.datetime, end: datetime_module.datetime) -> list[datetime_module.datetime]:
+    """returns the UTC instants between `start` and `end` at which the offset of `zone` changes, to the minute"""
+
+    found: list[datetime_module.datetime] = []
+    step = datetime_module.timedelta(days=1)
+    before = start
+    while before < end:
+        after = min(before + step, end)
+        if before.astimezone(zone).utcoffset() != after.astimezone(zone).utcoffset():
+            low, high = before, after
+            while high - low > datetime_module.timedelta(minutes=1):
+                middle = low + (high - low) / 2
+                if middle.astimezone(zone).utcoffset() == low.astimezone(zone).utcoffset():
+                    low = middle
+                else:
+                    high = middle
+            found.append(high.replace(second=0, microsecond=0))
+        before = after
+    return found
+
+
+def vtimezone(zone: ZoneInfo, start: datetime_module.datetime, end: datetime_module.datetime) -> list[str]:
+    """the VTIMEZONE of `zone` from the first to past the last year of `start` to `end`"""
+
+    range_start = datetime_module.datetime(start.year, 1, 1, tzinfo=UTC)
+    range_end = datetime_module.datetime(end.year + 1, 1, 1, tzinfo=UTC)
+
+    def component(instant: datetime_module.datetime, offset_from: datetime_module.timedelta) -> list[str]:
+        local = instant.astimezone(zone)
+        kind = 'DAYLIGHT' if local.dst() else 'STANDARD'
+        return [
+            'BEGIN:' + kind,
+            # the onset, in the local time in effect before it
+            'DTSTART:' + format_local((instant + offset_from).replace(tzinfo=None)),
+            'TZOFFSETFROM:' + format_offset(offset_from),
+            'TZOFFSETTO:' + format_offset(local.utcoffset()),
+            'TZNAME:' + escape_text(local.tzname() or zone.key),
+            'END:' + kind,
+        ]
+
+    lines = ['BEGIN:VTIMEZONE', 'TZID:' + zone.key]
+    offset = range_start.astimezone(zone).utcoffset()
+    lines.extend(component(range_start, offset))
+    for instant in transitions(zone, range_start, range_end):
+        lines.extend(component(instant, offset))
+        offset = instant.astimezone(zone).utcoffset()
+    lines.append('END:VTIMEZONE')
+    return lines
+
+
+def calendar(name: str, events: list[Event], timestamp: datetime_module.datetime, refresh_interval: datetime_module.timedelta | None = None) -> bytes:
+    """returns the feed of `events`, `timestamp` is written as the DTSTAMP of every event"""
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:' + PRODUCT_ID,
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:' + escape_text(name),
+    ]
+    if refresh_interval is not None:
+        minutes = max(int(refresh_interval.total_seconds() // 60), 1)
+        lines.append('REFRESH-INTERVAL;VALUE=DURATION:PT{}M'.format(minutes))
+        lines.append('X-PUBLISHED-TTL:PT{}M'.format(minutes))
+
+    zones: dict[str, ZoneInfo] = {}
+    for event in events:
+        zone = get_zone(event['time_zone'])
+        if zone is not None:
+            zones[zone.key] = zone
+
+    for key in sorted(zones):
+        starts = [event['start'] for event in events if event['time_zone'] == key]
+        lines.extend(vtimezone(zones[key], min(starts), max(starts)))
+
+    for event in events:
+        zone = zones.get(event['time_zone'])
+        lines.extend([
+            'BEGIN:VEVENT',
+            'UID:' + event['uid'],
+            'DTSTAMP:' + format_utc(timestamp),
+        ])
+        if zone is None:
+            lines.append('DTSTART:' + format_utc(event['start']))
+            lines.append('DTEND:' + format_utc(event['end']))
+        else:
+            lines.append('DTSTART;TZID={}:{}'.format(
+                zone.key, format_local(event['start'].astimezone(zone))))
+            lines.append('DTEND;TZID={}:{}'.format(
+                zone.key, format_local(event['end'].astimezone(zone))))
+        lines.append('SUMMARY:' + escape_text(event['summary']))
+        if event.get('location') is not None:
+            lines.append('LOCATION:' + escape_text(event['location']))
+        if event.get('url') is not None:
+            lines.append('URL:' + event['url'])
+        if event.get('description') is not None:
+            lines.append('DESCRIPTION:' + escape_text(event['description']))
+        lines.append('END:VEVENT')
+
+    lines.append('END:VCALENDAR')
+    return ''.join(fold(line) + '\r\n' for line in lines).encode('utf-8')
@@ -0,0 +1,215 @@
+from typing import Literal, Any
+from pathlib import Path
+import datetime as datetime_module
+import json
+import csv
+
+from sqlalchemy import Table, Boolean, Integer, Float, insert, delete, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection
+from sqlmodel import SQLModel
+
+from uirpsoftball.models import tables
+from uirpsoftball.models.custom_field_types import timestamp
+
+"""
+Developer's Note:
+Exports the league (divisions, locations, seeding parameters, teams, tournaments, games, tournament games) to JSON or CSV
+and imports it back, to seed a season without copying database files around. Visits are traffic, not league data, and
+are left out.
+
+A JSON export is one file with the rows of every table by table name; a CSV export is a directory with one <table>.csv
+per table. Datetimes are written in ISO 8601 with their UTC offset, empty CSV cells of nullable columns are NULL.
+
+The export reads every table in one transaction, so it is consistent while the server keeps writing. The import loads
+every table in one transaction, each with a single executemany INSERT in dependency order. Foreign keys are checked once
+at the end: SQLite defers them (PRAGMA defer_foreign_keys) and runs PRAGMA foreign_key_check before committing,
+PostgreSQL defers the deferrable ones. Any error rolls the whole import back.
+"""
+
+Format = Literal['json', 'csv']
+
+# in dependency order, referenced tables first
+MODELS: list[type[SQLModel]] = [
+    tables.Division,
+    tables.Location,
+    tables.SeedingParameter,
+    tables.Team,
+    tables.Tournament,
+    tables.Game,
+    tables.TournamentGame,
+]
+
+Rows = dict[str, list[dict[str, Any]]]
+
+
+class LeagueImportError(ValueError):
+    pass
+
+
+def table_of(model: type[SQLModel]) -> Table:
+    return model.__table__  # type: ignore[attr-defined]
+
+
+def infer_format(path: Path) -> Format:
+    return 'json' if path.suffix.lower() == '.json' else 'csv'
+
+
+def serialize(value: Any) -> Any:
+    if isinstance(value, datetime_module.datetime):
+        return value.isoformat()
+    return value
+
+
+def parse(table: Table, column_name: str, value: Any) -> Any:
+    """converts a value read from JSON or CSV to the type of its column"""
+
+    if column_name not in table.c:
+        raise LeagueImportError('{} has no column {}'.format(table.name, column_name))
+    column = table.c[column_name]
+
+    if value is None or (value == '' and column.nullable and not column.primary_key):
+        return None
+
+    try:
+        if isinstance(column.type, timestamp.Timestamp):
+            value = datetime_module.datetime.fromisoformat(value) if isinstance(
+                value, str) else value
+            if value.tzinfo is None:
+                raise ValueError('datetimes must have a UTC offset')
+            return value.astimezone(datetime_module.timezone.utc)
+        if isinstance(column.type, Boolean):
+            if isinstance(value, str):
+                if value.lower() not in ('true', 'false', '1', '0'):
+                    raise ValueError('not a boolean')
+                return value.lower() in ('true', '1')
+            return bool(value)
+        if isinstance(column.type, Integer):
+            return int(value)
+        if isinstance(column.type, Float):
+            return float(value)
+        return value
+    except (TypeError, ValueError) as e:
+        raise LeagueImportError('{}.{}: invalid value {!r}, {}'.format(
+            table.name, column_name, value, e))
+
+
+async def read_rows(engine: AsyncEngine) -> Rows:
+    """every row of every table, read in one transaction"""
+
+    rows: Rows = {}
+    async with engine.connect() as conn:
+        # pysqlite does not start a transaction for SELECTs, every statement would see its own snapshot
+        if conn.dialect.name == 'sqlite':
+            await conn.exec_driver_sql('BEGIN')
+        else:
+            await conn.execution_options(isolation_level='REPEATABLE READ')
+
+        for model in MODELS:
+            table = table_of(model)
+            result = await conn.execute(select(table).order_by(*table.primary_key.columns))
+            rows[table.name] = [{key: serialize(value) for key, value in row.items()}
+                                for row in result.mappings()]
+        await conn.rollback()
+    return rows
+
+
+def write_rows(rows: Rows, path: Path, format: Format) -> None:
+
+    if format == 'json':
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(rows, indent=2))
+        return
+
+    path.mkdir(parents=True, exist_ok=True)
+    for model in MODELS:
+        table = table_of(model)
+        with (path / (table.name + '.csv')).open('w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(table.c.keys()))
+            writer.writeheader()
+            for row in rows[table.name]:
+                writer.writerow({key: '' if value is None else str(value).lower() if isinstance(value, bool) else value
+                                 for key, value in row.items()})
+
+
+def load_rows(path: Path, format: Format) -> Rows:
+    """rows by table name, missing tables are imported as empty"""
+
+    raw: Rows = {}
+    if format == 'json':
+        raw = json.loads(path.read_text())
+    else:
+        for model in MODELS:
+            table_path = path / (table_of(model).name + '.csv')
+            if table_path.exists():
+                with table_path.open(newline='') as file:
+                    raw[table_of(model).name] = list(csv.DictReader(file))
+
+    unknown = set(raw) - {table_of(model).name for model in MODELS}
+    if len(unknown) > 0:
+        raise LeagueImportError('Unknown tables: ' + ', '.join(sorted(unknown)))
+
+    rows: Rows = {}
+    for model in MODELS:
+        table = table_of(model)
+        rows[table.name] = [{key: parse(table, key, value) for key, value in row.items()}
+                            for row in raw.get(table.name, [])]
+    return rows
+
+
+async def check_foreign_keys(conn: AsyncConnection) -> None:
+
+    if conn.dialect.name != 'sqlite':
+        return
+    violations = (await conn.exec_driver_sql('PRAGMA foreign_key_check')).all()
+    if len(violations) > 0:
+        raise LeagueImportError('{} rows reference missing rows, first: {} row {} references {}'.format(
+            len(violations), violations[0][0], violations[0][1], violations[0][2]))
+
+
+async def insert_rows(engine: AsyncEngine, rows: Rows, replace: bool = False) -> dict[str, int]:
+    """inserts the rows in one transaction, deleting the existing league first with `replace`
+    returns the number of rows inserted by table name"""
+
+    counts: dict[str, int] = {}
+    async with engine.begin() as conn:
+
+        if conn.dialect.name == 'sqlite':
+            await conn.exec_driver_sql('PRAGMA defer_foreign_keys = ON')
+        else:
+            await conn.execute(text('SET CONSTRAINTS ALL DEFERRED'))
+
+        if replace:
+            for model in reversed(MODELS):
+                await conn.execute(delete(table_of(model)))
+
+        for model in MODELS:
+            table = table_of(model)
+            table_rows = rows.get(table.name, [])
+            if len(table_rows) > 0:
+                await conn.execute(insert(table), table_rows)
+            counts[table.name] = len(table_rows)
+
+        await check_foreign_keys(conn)
+
+        # the ids were given explicitly, move the sequences past them so later inserts do not collide
+        if conn.dialect.name == 'postgresql':
+            for model in MODELS:
+                table = table_of(model)
+                if 'id' in table.c and counts[table.name] > 0:
+                    await conn.execute(text("SELECT setval(pg_get_serial_sequence('{0}', 'id'), (SELECT max(id) FROM {0}))".format(table.name)))
+
+    return counts
+
+
+async def export_league(engine: AsyncEngine, path: Path, format: Format | None = None) -> dict[str, int]:
+    """returns the number of rows exported by table name"""
+
+    rows = await read_rows(engine)
+    write_rows(rows, path, format or infer_format(path))
+    return {table_name: len(table_rows) for table_name, table_rows in rows.items()}
+
+
+async def import_league(engine: AsyncEngine, path: Path, format: Format | None = None, replace: bool = False) -> dict[str, int]:
+    """returns the number of rows imported by table name"""
+
+    return await insert_rows(engine, load_rows(path, format or infer_format(path)), replace=replace)
@@ -0,0 +1,299 @@
+from typing import TypedDict, NotRequired, Literal
+from collections.abc import Callable, Awaitable
+from urllib.parse import urlsplit
+from pathlib import Path
+import statistics
+import asyncio
+import random
+import json
+import time
+import yaml
+from uirpsoftball import asgi_client
+
+"""
+Developer's Note:
+An open-model load generator. Requests are scheduled by a Poisson process at the arrival rate of each stage of the
+profile, and a request's latency is measured from the moment it was scheduled to be sent, so a server that falls behind
+shows up in the percentiles instead of silently lowering the request rate.
+
+The target is either the app itself (in-process, through asgi_client) or a base URL, which is spoken to with one
+HTTP/1.1 connection per request so no HTTP library is needed.
+"""
+
+
+class IntRange(TypedDict):
+    MIN: int
+    MAX: int
+
+
+class Stage(TypedDict):
+    DURATION: float
+    ARRIVAL_RATE: float
+
+
+class Endpoint(TypedDict):
+    NAME: str
+    METHOD: NotRequired[Literal['GET', 'POST', 'PATCH', 'DELETE']]
+    PATH: str
+    WEIGHT: float
+    BODY: NotRequired[dict]
+
+
+class Profile(TypedDict):
+    STAGES: list[Stage]
+    MAX_CONCURRENCY: NotRequired[int]
+    TIMEOUT: NotRequired[float]
+    PARAMETERS: NotRequired[dict[str, list | IntRange]]
+    ENDPOINTS: list[Endpoint]
+
+
+class EndpointReport(TypedDict):
+    requests: int
+    errors: int
+    error_rate: float
+    database_locked: int
+    throughput: float
+    p50_ms: float | None
+    p90_ms: float | None
+    p95_ms: float | None
+    p99_ms: float | None
+    max_ms: float | None
+
+
+class Report(TypedDict):
+    target: str
+    duration: float
+    endpoints: dict[str, EndpointReport]
+    total: EndpointReport
+
+
+Send = Callable[[asgi_client.RequestParams], Awaitable[asgi_client.Response]]
+
+DATABASE_LOCKED = 'database is locked'
+
+
+def load_profile(path: Path) -> Profile:
+    with path.open('r') as f:
+        profile: Profile = yaml.safe_load(f)
+
+    if len(profile['ENDPOINTS']) == 0:
+        raise ValueError('Load test profile {} has no endpoints'.format(path))
+    return profile
+
+
+def _choose_parameters(parameters: dict[str, list | IntRange], rng: random.Random) -> dict[str, str]:
+
+    chosen: dict[str, str] = {}
+    for name, values in parameters.items():
+        if isinstance(values, dict):
+            chosen[name] = str(rng.randint(values['MIN'], values['MAX']))
+        else:
+            chosen[name] = str(rng.choice(values))
+    return chosen
+
+
+def _format_body(body, chosen: dict[str, str]):
+    """fill in "{parameter}" placeholders, a value that is just a placeholder is converted back to a number when possible"""
+
+    if isinstance(body, dict):
+        return {key: _format_body(value, chosen) for key, value in body.items()}
+    if isinstance(body, list):
+        return [_format_body(value, chosen) for value in body]
+    if isinstance(body, str):
+        formatted = body.format(**chosen)
+        if body.startswith('{') and body.endswith('}') and formatted.lstrip('-').isdigit():
+            return int(formatted)
+        return formatted
+    return body
+
+
+def in_process_sender(app: asgi_client.ASGIApp) -> Send:
+
+    async def send(params: asgi_client.RequestParams) -> asgi_client.Response:
+        return await asgi_client.request(app, params)
+
+    return send
+
+
+def url_sender(base_url: str) -> Send:
+
+    url = urlsplit(base_url)
+    use_ssl = url.scheme == 'https'
+    host = url.hostname or 'localhost'
+    port = url.port or (443 if use_ssl else 80)
+    base_path = url.path.rstrip('/')
+
+    async def send(params: asgi_client.RequestParams) -> asgi_client.Response:
+
+        body = params.get('body', b'')
+        lines = ['{} {} HTTP/1.1'.format(params['method'], base_path + params['path']),
+                 'Host: {}'.format(url.netloc),
+                 'Connection: close',
+                 'Content-Length: {}'.format(len(body))]
+        lines += ['{}: {}'.format(key, value)
+                  for key, value in params.get('headers', {}).items()]
+
+        reader, writer = await asyncio.open_connection(host, port, ssl=use_ssl)
+        try:
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+
+        head, _, response_body = raw.partition(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        headers = [tuple(line.split(': ', 1)) for line in header_lines]
+        if ('transfer-encoding', 'chunked') in [(key.lower(), value.lower()) for key, value in headers]:
+            response_body = _dechunk(response_body)
+
+        return {
+            'status_code': int(status_line.split(' ')[1]),
+            'headers': headers,
+            'body': response_body,
+        }
+
+    return send
+
+
+def _dechunk(body: bytes) -> bytes:
+
+    chunks: list[bytes] = []
+    while True:
+        size_line, _, body = body.partition(b'\r\n')
+        size = int(size_line.split(b';')[0], 16)
+        if size == 0:
+            return b''.join(chunks)
+        chunks.append(body[:size])
+        body = body[size + 2:]
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float | None:
+    if len(sorted_values) == 0:
+        return None
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def _endpoint_report(latencies: list[float], errors: int, database_locked: int, duration: float) -> EndpointReport:
+
+    latencies = sorted(latencies)
+    requests = len(latencies)
+    return {
+        'requests': requests,
+        'errors': errors,
+        'error_rate': errors / requests if requests > 0 else 0.0,
+        'database_locked': database_locked,
+        'throughput': requests / duration if duration > 0 else 0.0,
+        'p50_ms': statistics.median(latencies) if requests > 0 else None,
+        'p90_ms': _percentile(latencies, 0.90),
+        'p95_ms': _percentile(latencies, 0.95),
+        'p99_ms': _percentile(latencies, 0.99),
+        'max_ms': latencies[-1] if requests > 0 else None,
+    }
+
+
+async def run(profile: Profile, send: Send, target: str, seed: int | None = None) -> Report:
+
+    rng = random.Random(seed)
+    endpoints = profile['ENDPOINTS']
+    weights = [endpoint['WEIGHT'] for endpoint in endpoints]
+    parameters = profile.get('PARAMETERS', {})
+    timeout = profile.get('TIMEOUT', 30.0)
+    semaphore = asyncio.Semaphore(profile.get('MAX_CONCURRENCY', 100))
+
+    latencies: dict[str, list[float]] = {
+        endpoint['NAME']: [] for endpoint in endpoints}
+    errors: dict[str, int] = {endpoint['NAME']: 0 for endpoint in endpoints}
+    database_locked: dict[str, int] = {
+        endpoint['NAME']: 0 for endpoint in endpoints}
+
+    async def fire(endpoint: Endpoint, scheduled: float):
+
+        chosen = _choose_parameters(parameters, rng)
+        params: asgi_client.RequestParams = {
+            'method': endpoint.get('METHOD', 'GET'),
+            'path': endpoint['PATH'].format(**chosen),
+        }
+        if 'BODY' in endpoint:
+            params['headers'] = {'content-type': 'application/json'}
+            params['body'] = json.dumps(
+                _format_body(endpoint['BODY'], chosen)).encode()
+
+        failed = False
+        locked = False
+        async with semaphore:
+            try:
+                response = await asyncio.wait_for(send(params), timeout)
+                failed = response['status_code'] >= 400
+                locked = DATABASE_LOCKED.encode() in response['body']
+            except Exception as e:
+                failed = True
+                locked = DATABASE_LOCKED in str(e)
+
+        latencies[endpoint['NAME']].append(
+            (time.perf_counter() - scheduled) * 1000)
+        if failed:
+            errors[endpoint['NAME']] += 1
+        if locked:
+            database_locked[endpoint['NAME']] += 1
+
+    tasks: list[asyncio.Task] = []
+    start = time.perf_counter()
+    scheduled = start
+
+    for stage in profile['STAGES']:
+        stage_end = scheduled + stage['DURATION']
+        while True:
+            scheduled += rng.expovariate(stage['ARRIVAL_RATE'])
+            if scheduled >= stage_end:
+                scheduled = stage_end
+                break
+
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            endpoint = rng.choices(endpoints, weights)[0]
+            tasks.append(asyncio.create_task(fire(endpoint, scheduled)))
+
+    await asyncio.gather(*tasks)
+    duration = time.perf_counter() - start
+
+    return {
+        'target': target,
+        'duration': duration,
+        'endpoints': {
+            name: _endpoint_report(latencies[name], errors[name], database_locked[name], duration) for name in latencies
+        },
+        'total': _endpoint_report(
+            [latency for values in latencies.values() for latency in values],
+            sum(errors.values()),
+            sum(database_locked.values()),
+            duration
+        ),
+    }
+
+
+def format_report(report: Report) -> str:
+
+    def milliseconds(value: float | None) -> str:
+        return '-' if value is None else '{:.1f}'.format(value)
+
+    lines = ['Target: {}, {:.1f}s'.format(report['target'], report['duration']),
+             '{:<20} {:>8} {:>8} {:>8} {:>8} {:>9} {:>9} {:>9} {:>9}'.format(
+                 'endpoint', 'requests', 'req/s', 'errors', 'locked', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms')]
+
+    for name, endpoint_report in list(report['endpoints'].items()) + [('total', report['total'])]:
+        lines.append('{:<20} {:>8} {:>8.1f} {:>7.1%} {:>8} {:>9} {:>9} {:>9} {:>9}'.format(
+            name,
+            endpoint_report['requests'],
+            endpoint_report['throughput'],
+            endpoint_report['error_rate'],
+            endpoint_report['database_locked'],
+            milliseconds(endpoint_report['p50_ms']),
+            milliseconds(endpoint_report['p95_ms']),
+            milliseconds(endpoint_report['p99_ms']),
+            milliseconds(endpoint_report['max_ms']),
+        ))
+
+    return '\n'.join(lines)
@@ -0,0 +1,331 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, SessionTransaction
+from contextvars import ContextVar
+from collections.abc import Callable, Sequence
+import hashlib
+import time
+import re
+from uirpsoftball import request_context
+
+"""
+Developer's Note:
+Metrics in the Prometheus text exposition format, kept in process so nothing external has to run next to the API.
+Requests are labelled by their route template (/pages/team/{team_slug}/), never by the raw path, and statements by a
+fingerprint of their SQL with the bound values and IN lists collapsed, so the number of series stays bounded. The SQL
+itself is never published, the metrics are served under /admin.
+
+Connection acquisition is measured with public events only: a session starting a transaction notes the time, and the
+pool's `checkout` event, fired once the connection is handed over, observes the time since. That is the pool's wait plus
+the session's own setup before it asks for a connection, not the pool's checkout alone, hence connection_acquire rather
+than pool wait; the pool saturation gauge tells whether the time goes to waiting. Connections checked out without a
+session (engine.connect()) are not timed.
+"""
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005,
+                     0.01, 0.025, 0.05, 0.1, 0.25, 1)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+WAIT_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1, 5)
+
+MAX_FINGERPRINTS = 200
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = '') -> str:
+    pairs = ['{}="{}"'.format(name, _escape(value))
+             for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    if len(pairs) == 0:
+        return ''
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    name: str
+    help: str
+    type: str
+    label_names: tuple[str, ...]
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        _REGISTRY.append(self)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return '\n'.join(['# HELP {} {}'.format(self.name, self.help),
+                          '# TYPE {} {}'.format(self.name, self.type)] + self.samples())
+
+
+class Counter(Metric):
+    type = 'counter'
+    _values: dict[Labels, float]
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, help, label_names)
+        self._values = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> list[str]:
+        return ['{}{} {}'.format(self.name, _format_labels(self.label_names, labels), _format_number(value))
+                for labels, value in self._values.items()]
+
+
+class Gauge(Metric):
+    """a gauge is either set directly, or read from `function` whenever the metrics are rendered"""
+
+    type = 'gauge'
+    _values: dict[Labels, float]
+    _functions: dict[Labels, Callable[[], float]]
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, help, label_names)
+        self._values = {}
+        self._functions = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def set_function(self, function: Callable[[], float], *labels: str) -> None:
+        self._functions[labels] = function
+
+    def samples(self) -> list[str]:
+        values = dict(self._values)
+        for labels, function in self._functions.items():
+            values[labels] = function()
+        return ['{}{} {}'.format(self.name, _format_labels(self.label_names, labels), _format_number(value))
+                for labels, value in values.items()]
+
+
+class Histogram(Metric):
+    type = 'histogram'
+    buckets: tuple[float, ...]
+    _counts: dict[Labels, list[int]]
+    _sums: dict[Labels, float]
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._counts = {}
+        self._sums = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+
+        if labels not in self._counts:
+            self._counts[labels] = [0] * len(self.buckets)
+            self._sums[labels] = 0.0
+
+        counts = self._counts[labels]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self._sums[labels] += value
+
+    def samples(self) -> list[str]:
+
+        lines: list[str] = []
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append('{}_bucket{} {}'.format(self.name, _format_labels(
+                    self.label_names, labels, 'le="{}"'.format(_format_number(bound))), cumulative))
+            lines.append('{}_sum{} {}'.format(self.name, _format_labels(
+                self.label_names, labels), _format_number(self._sums[labels])))
+            lines.append('{}_count{} {}'.format(
+                self.name, _format_labels(self.label_names, labels), cumulative))
+        return lines
+
+
+_REGISTRY: list[Metric] = []
+
+HTTP_REQUEST_DURATION = Histogram(
+    'uirpsoftball_http_request_duration_seconds', 'Time to serve a request.', ('method', 'route', 'status'))
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    'uirpsoftball_http_requests_in_flight', 'Requests currently being served.')
+HTTP_RESPONSE_SIZE = Histogram(
+    'uirpsoftball_http_response_size_bytes', 'Size of the response body.', ('method', 'route'), SIZE_BUCKETS)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'uirpsoftball_db_queries_per_request', 'SQL statements executed while serving a request.', ('route',), COUNT_BUCKETS)
+DB_QUERY_DURATION_PER_REQUEST = Histogram(
+    'uirpsoftball_db_query_duration_per_request_seconds', 'Time spent executing SQL while serving a request.', ('route',), LATENCY_BUCKETS)
+DB_STATEMENT_DURATION = Histogram(
+    'uirpsoftball_db_statement_duration_seconds', 'Execution time per statement fingerprint.', ('engine', 'fingerprint'), STATEMENT_BUCKETS)
+DB_CONNECTION_ACQUIRE = Histogram(
+    'uirpsoftball_db_connection_acquire_seconds', 'Time from a session starting a transaction to the pool handing it a connection, the pool wait plus the session setup.', ('engine',), WAIT_BUCKETS)
+DB_POOL_SIZE = Gauge(
+    'uirpsoftball_db_pool_size', 'Configured size of the connection pool.', ('engine',))
+DB_POOL_CHECKED_OUT = Gauge(
+    'uirpsoftball_db_pool_checked_out', 'Connections currently checked out of the pool.', ('engine',))
+DB_POOL_SATURATION = Gauge(
+    'uirpsoftball_db_pool_saturation', 'Checked out connections as a fraction of the pool size plus overflow.', ('engine',))
+RESPONSE_CACHE_REQUESTS = Counter(
+    'uirpsoftball_response_cache_requests_total', 'Requests to cached routes, by whether the response cache had them.', ('result',))
+
+
+def render() -> str:
+    """returns every metric in the Prometheus text exposition format"""
+    return '\n'.join(metric.render() for metric in _REGISTRY) + '\n'
+
+
+_IN_LIST = re.compile(r'\(\s*(\?|%\(\w+\)s|\$\d+|:\w+)(\s*,\s*(\?|%\(\w+\)s|\$\d+|:\w+))*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+_fingerprints: dict[str, str] = {}
+_known_fingerprints: set[str] = set()
+
+
+def normalize_statement(statement: str) -> str:
+    """collapse whitespace and IN lists so one query shape maps to one string whatever its bound values"""
+    return _IN_LIST.sub('(...)', _WHITESPACE.sub(' ', statement).strip())
+
+
+def fingerprint(statement: str) -> str:
+    """returns a short, stable id for the shape of a statement"""
+
+    if statement not in _fingerprints:
+        normalized = normalize_statement(statement)
+        statement_fingerprint = hashlib.sha1(
+            normalized.encode()).hexdigest()[:12]
+
+        if statement_fingerprint not in _known_fingerprints:
+            if len(_known_fingerprints) < MAX_FINGERPRINTS:
+                _known_fingerprints.add(statement_fingerprint)
+            else:
+                statement_fingerprint = 'other'
+
+        if len(_fingerprints) >= 10 * MAX_FINGERPRINTS:
+            _fingerprints.clear()
+        _fingerprints[statement] = statement_fingerprint
+
+    return _fingerprints[statement]
+
+
+def route_template(scope: dict) -> str:
+    """returns the path template of the route that handled the request"""
+
+    route = scope.get('route')
+    path = getattr(route, 'path', None)
+    if path is None:
+        return 'unmatched'
+    return path
+
+
+# when the current session started its transaction, before asking for a connection
+_CHECKOUT_STARTED: ContextVar[float | None] = ContextVar(
+    'checkout_started', default=None)
+
+
+@event.listens_for(Session, 'after_transaction_create')
+def _transaction_created(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        _CHECKOUT_STARTED.set(time.perf_counter())
+
+
+def instrument_engine(engine: AsyncEngine, name: str = 'default') -> None:
+    """time every statement and connection acquisition of `engine`, statements are timed by request_context.instrument_engine"""
+
+    sync_engine = engine.sync_engine
+
+    def observe_statement(engine_name: str, statement: str, duration: float):
+        if engine_name == name:
+            DB_STATEMENT_DURATION.observe(
+                duration, name, fingerprint(statement))
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        started = _CHECKOUT_STARTED.get()
+        if started is not None:
+            _CHECKOUT_STARTED.set(None)
+            DB_CONNECTION_ACQUIRE.observe(time.perf_counter() - started, name)
+
+    request_context.add_statement_listener(observe_statement)
+    # pool events given the engine follow it to the new pool when the engine is disposed
+    event.listen(sync_engine, 'checkout', checkout)
+
+    def pool_size() -> float:
+        size = getattr(sync_engine.pool, 'size', None)
+        return size() if callable(size) else 0
+
+    def pool_checked_out() -> float:
+        checked_out = getattr(sync_engine.pool, 'checkedout', None)
+        return checked_out() if callable(checked_out) else 0
+
+    def pool_saturation() -> float:
+        capacity = pool_size() + max(getattr(sync_engine.pool, '_max_overflow', 0), 0)
+        return pool_checked_out() / capacity if capacity > 0 else 0
+
+    DB_POOL_SIZE.set_function(pool_size, name)
+    DB_POOL_CHECKED_OUT.set_function(pool_checked_out, name)
+    DB_POOL_SATURATION.set_function(pool_saturation, name)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the request metrics, add it inside of request_context.RequestContextMiddleware"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                response_size += len(message.get('body', b''))
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.observe(
+                duration, scope['method'], route, str(status_code))
+            HTTP_RESPONSE_SIZE.observe(response_size, scope['method'], route)
+
+            current_request_context = request_context.current()
+            if current_request_context is not None:
+                DB_QUERIES_PER_REQUEST.observe(
+                    current_request_context.query_count, route)
+                DB_QUERY_DURATION_PER_REQUEST.observe(
+                    current_request_context.query_duration, route)
@@ -11,6 +11,7 @@ Developer's Note:
 This module defines a custom SQLAlchemy type decorator for Timestamp types
 
 For databases that do not support datetimes types (SQLite), datetime objects are converted to floating point numbers (unix timestamps).
+Other databases store them in a timezone aware column (timestamptz on PostgreSQL), the values are always timezone aware.
 For precision of language, the table types are always referred to as "datetime.datetime" objects, since that best describes them. For SQLite applcations, these are actually floating point numbers, but this custom type solves the I/O.
 
 When switching from different databases, this custom type should speed up the change process.
@@ -28,7 +29,7 @@ class Timestamp(TypeDecorator):
         # Use REAL for SQLite, DateTime for others
         if dialect.name == "sqlite":
             return REAL()
-        return DateTime()
+        return DateTime(timezone=True)
 
     def process_bind_param(self, value: datetime_module.datetime | None, dialect: Dialect) -> custom_types.timestamp | datetime_module.datetime | None:
         # Convert to float (Unix timestamp) for SQLite, pass datetime for others
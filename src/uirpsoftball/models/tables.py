@@ -33,8 +33,8 @@ class Team(SQLModel, table=True):
         primary_key=True, index=True, unique=True, const=True)
     name: custom_types.Team.name = Field(max_length=256)
     division_id: custom_types.Team.division_id | None = Field(
-        foreign_key=str(Division.__tablename__) + '.id', ondelete="SET NULL", nullable=True)
-    slug: custom_types.Team.slug = Field(max_length=256)
+        foreign_key=str(Division.__tablename__) + '.id', ondelete="SET NULL", nullable=True, index=True)
+    slug: custom_types.Team.slug = Field(max_length=256, index=True)
     seed: custom_types.Team.seed = Field()
     color: custom_types.Team.color | None = Field(
         max_length=6, nullable=True, default=None)
@@ -60,21 +60,21 @@ class Game(SQLModel, table=True):
     __tablename__ = "games"  # type: ignore[assignment]
     id: custom_types.Game.id = Field(
         primary_key=True, index=True, unique=True, const=True)
-    round_id: custom_types.Game.round_id = Field()
+    round_id: custom_types.Game.round_id = Field(index=True)
     home_team_id: custom_types.Game.home_team_id | None = Field(
-        foreign_key=str(Team.__tablename__) + '.id', ondelete="SET NULL", nullable=True, default=None)
+        foreign_key=str(Team.__tablename__) + '.id', ondelete="SET NULL", nullable=True, default=None, index=True)
     away_team_id: custom_types.Game.away_team_id | None = Field(
-        foreign_key=str(Team.__tablename__) + '.id', ondelete="SET NULL", nullable=True, default=None)
+        foreign_key=str(Team.__tablename__) + '.id', ondelete="SET NULL", nullable=True, default=None, index=True)
     officiating_team_id: custom_types.Game.officiating_team_id | None = Field(
         foreign_key=str(Team.__tablename__) + '.id',  ondelete="SET NULL", nullable=True, default=None)
     datetime: custom_types.Game.datetime = Field(
-        sa_column=Column(timestamp.Timestamp))
+        sa_column=Column(timestamp.Timestamp, index=True))
     location_id: custom_types.Game.location_id | None = Field(
-        foreign_key=str(Location.__tablename__) + '.id',  ondelete="SET NULL", nullable=True, default=None)
+        foreign_key=str(Location.__tablename__) + '.id',  ondelete="SET NULL", nullable=True, default=None, index=True)
     is_accepting_scores: custom_types.Game.is_accepting_scores = Field(
         default=False)
     home_team_score: custom_types.Game.home_team_score | None = Field(
-        nullable=True, default=None)
+        nullable=True, default=None, index=True)
     away_team_score: custom_types.Game.away_team_score | None = Field(
         nullable=True, default=None)
 
@@ -122,7 +122,7 @@ class TournamentGame(SQLModel, table=True):
     game_id: custom_types.TournamentGame.game_id = Field(
         primary_key=True, index=True, unique=True, const=True, foreign_key=str(Game.__tablename__) + '.id', ondelete="CASCADE")
     tournament_id: custom_types.TournamentGame.tournament_id = Field(
-        foreign_key=str(Tournament.__tablename__) + '.id', ondelete="RESTRICT")
+        foreign_key=str(Tournament.__tablename__) + '.id', ondelete="RESTRICT", index=True)
     bracket_id: custom_types.TournamentGame.bracket_id = Field()
     round: custom_types.TournamentGame.round = Field()
     home_team_filler: custom_types.TournamentGame.home_team_filler | None = Field(
@@ -143,5 +143,5 @@ class Visit(SQLModel, table=True):
     id: custom_types.Visit.id = Field(
         primary_key=True, index=True, unique=True, const=True)
     datetime: custom_types.Visit.datetime = Field(
-        sa_column=Column(timestamp.Timestamp))
-    path: custom_types.Visit.path = Field()
+        sa_column=Column(timestamp.Timestamp, index=True))
+    path: custom_types.Visit.path = Field(index=True)
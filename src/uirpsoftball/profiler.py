@@ -0,0 +1,274 @@
+from typing import TypedDict, Literal
+from starlette.routing import Match
+from urllib.parse import parse_qs
+from pathlib import Path
+import datetime as datetime_module
+import collections
+import io
+import threading
+import secrets
+import pstats
+import cProfile
+import json
+import time
+import sys
+
+"""
+Developer's Note:
+Profiles the next N requests to a route, on the machine that is slow. Profiling is armed either from the config
+(PROFILER.ROUTE and PROFILER.REQUESTS) or by sending a request with ?profile=N and the X-Profile-Token header, which arms
+the route of that request, starting with the request itself.
+
+The sampling profiler reads the stack of the event loop thread from a background thread every SAMPLING_INTERVAL
+seconds and writes collapsed stacks (flamegraph.pl / speedscope input). Statements run in aiosqlite's own thread, so
+time waiting on the database shows up as the event loop waiting in select. cProfile is used when MODE is "cprofile" or
+the interpreter cannot sample other threads, and writes pstats. One request is profiled at a time, requests to an armed
+route arriving while another is being profiled are served normally.
+
+While sampling, the interpreter's switch interval (sys.setswitchinterval) is lowered for the whole process, so every
+thread switches more often until the profiled request ends, the previous interval is restored in a finally block.
+"""
+
+Mode = Literal['sampling', 'cprofile']
+
+TOKEN_HEADER = b'x-profile-token'
+QUERY_PARAMETER = 'profile'
+
+
+class ProfileInfo(TypedDict):
+    route: str
+    method: str
+    path: str
+    status_code: int
+    mode: Mode
+    started: str
+    duration: float
+    samples: int
+    profile: str
+
+
+class StackSampler(threading.Thread):
+    """counts the collapsed stacks of `thread_id` until stopped"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: collections.Counter[str] = collections.Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._switch_interval = sys.getswitchinterval()
+
+    @staticmethod
+    def frame_name(frame) -> str:
+        code = frame.f_code
+        return '{} ({}:{})'.format(code.co_qualname, '/'.join(Path(code.co_filename).parts[-2:]), code.co_firstlineno)
+
+    def start(self):
+        # otherwise a busy thread keeps the GIL for the whole switch interval and the sampler only ever gets to run,
+        # and look, when the event loop releases it to wait in select
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 10))
+        try:
+            super().start()
+        except BaseException:
+            sys.setswitchinterval(self._switch_interval)
+            raise
+
+    def run(self):
+        last = time.perf_counter()
+        while not self._stopped.wait(self.interval):
+
+            # weigh each sample by the time it stands for, the sampler can be woken late
+            now = time.perf_counter()
+            weight = max(1, round((now - last) / self.interval))
+            last = now
+
+            frame = sys._current_frames().get(self.thread_id)
+            names: list[str] = []
+            while frame is not None:
+                names.append(self.frame_name(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += weight
+            self.samples += weight
+
+    def stop(self):
+        self._stopped.set()
+        try:
+            self.join()
+        finally:
+            sys.setswitchinterval(self._switch_interval)
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling armed routes, `routes` is the app's route list used to find the route of a request"""
+
+    def __init__(self, app, routes: list, directory: Path, token: str | None = None, mode: Mode = 'sampling', sampling_interval: float = 0.001, route: str | None = None, requests: int = 0):
+        self.app = app
+        self.routes = routes
+        self.directory = directory
+        self.token = token
+        self.mode: Mode = mode if hasattr(sys, '_current_frames') else 'cprofile'
+        self.sampling_interval = sampling_interval
+        self.armed: dict[str, int] = {}
+        self.busy = False
+
+        if route is not None and requests > 0:
+            self.armed[route] = requests
+
+    def route_template(self, scope) -> str | None:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, 'path', None)
+        return None
+
+    def requested_profiles(self, scope) -> int:
+        """returns N if the request asks to profile N requests with a valid token"""
+
+        if self.token is None or (QUERY_PARAMETER + '=').encode() not in scope['query_string']:
+            return 0
+
+        values = parse_qs(scope['query_string'].decode('latin-1')).get(QUERY_PARAMETER, [])
+        # compared as bytes, compare_digest raises TypeError on a str that is not ASCII
+        token = dict(scope['headers']).get(TOKEN_HEADER, b'')
+        if len(values) == 0 or not values[0].isdigit() or not secrets.compare_digest(token, self.token.encode()):
+            return 0
+        return int(values[0])
+
+    async def __call__(self, scope, receive, send):
+
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        requested = self.requested_profiles(scope)
+        if requested == 0 and len(self.armed) == 0:
+            await self.app(scope, receive, send)
+            return
+
+        route = self.route_template(scope)
+        if route is not None and requested > 0:
+            self.armed[route] = requested
+
+        if route is None or route not in self.armed or self.busy:
+            await self.app(scope, receive, send)
+            return
+
+        self.armed[route] -= 1
+        if self.armed[route] == 0:
+            del self.armed[route]
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        self.busy = True
+        started = datetime_module.datetime.now(tz=datetime_module.timezone.utc)
+        start = time.perf_counter()
+
+        if self.mode == 'sampling':
+            sampler = StackSampler(threading.get_ident(),
+                                   self.sampling_interval)
+            sampler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                sampler.stop()
+                self.busy = False
+                duration = time.perf_counter() - start
+                path = self.profile_path(started, route, 'collapsed')
+                path.write_text(''.join('{} {}\n'.format(
+                    stack, count) for stack, count in sampler.stacks.most_common()))
+                self.write_info(path, scope, route, status_code,
+                                started, duration, sampler.samples)
+
+        else:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profile.disable()
+                self.busy = False
+                duration = time.perf_counter() - start
+                path = self.profile_path(started, route, 'pstats')
+                profile.dump_stats(path)
+                self.write_info(path, scope, route, status_code,
+                                started, duration, 0)
+
+    def profile_path(self, started: datetime_module.datetime, route: str, suffix: str) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = route.strip('/').replace('/', '_')
+        name = name.replace('{', '').replace('}', '') or 'root'
+        return self.directory / '{}_{}.{}'.format(started.strftime('%Y%m%dT%H%M%S%f'), name, suffix)
+
+    def write_info(self, path: Path, scope, route: str, status_code: int, started: datetime_module.datetime, duration: float, samples: int) -> None:
+        info: ProfileInfo = {
+            'route': route,
+            'method': scope['method'],
+            'path': scope['path'],
+            'status_code': status_code,
+            'mode': self.mode,
+            'started': started.isoformat(),
+            'duration': duration,
+            'samples': samples,
+            'profile': path.name,
+        }
+        path.with_suffix('.json').write_text(json.dumps(info, indent=2))
+
+
+def list_profiles(directory: Path) -> list[ProfileInfo]:
+    """returns the profiles written to `directory`, oldest first"""
+
+    if not directory.exists():
+        return []
+    return [json.loads(path.read_text()) for path in sorted(directory.glob('*.json'))]
+
+
+def summarize_collapsed(paths: list[Path], top: int) -> str:
+    """the frames with the most samples, on top of the stack (self) and anywhere in it (total)"""
+
+    self_counts: collections.Counter[str] = collections.Counter()
+    total_counts: collections.Counter[str] = collections.Counter()
+    samples = 0
+
+    for path in paths:
+        for line in path.read_text().splitlines():
+            stack, _, count_string = line.rpartition(' ')
+            count = int(count_string)
+            frames = stack.split(';')
+            samples += count
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+
+    lines = ['{} samples'.format(samples)]
+    for title, counts in (('self', self_counts), ('total', total_counts)):
+        lines.append('')
+        lines.append('{:>7} {:>6}  frame'.format(title, '%'))
+        for frame, count in counts.most_common(top):
+            lines.append('{:>7} {:>6.1%}  {}'.format(
+                count, count / samples if samples > 0 else 0, frame))
+    return '\n'.join(lines)
+
+
+def summarize_pstats(paths: list[Path], top: int) -> str:
+
+    stream = io.StringIO()
+    pstats.Stats(*[str(path) for path in paths], stream=stream).sort_stats(
+        'cumulative').print_stats(top)
+    return stream.getvalue()
+
+
+def summarize(paths: list[Path], top: int = 20) -> str:
+    """summarize one or more profiles of the same kind together"""
+
+    if all(path.suffix == '.pstats' for path in paths):
+        return summarize_pstats(paths, top)
+    if all(path.suffix == '.collapsed' for path in paths):
+        return summarize_collapsed(paths, top)
+    raise ValueError('Profiles to summarize must all be .collapsed or all be .pstats')
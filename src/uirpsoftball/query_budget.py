@@ -0,0 +1,104 @@
+from typing import TypedDict, NotRequired, Literal
+import warnings
+import json
+from uirpsoftball import request_context, metrics
+
+"""
+Developer's Note:
+Checks the SQL statements of every request against the budget declared for its route (Router._QUERY_BUDGETS), and flags
+N+1 patterns: the same statement executed over and over with different parameters.
+
+In "warn" mode a violation issues a QueryBudgetWarning. In "fail" mode the response is held back and replaced with a
+500 listing the violations, so a regression fails whatever drives the app (tests, the benchmark suite, the load test).
+"""
+
+Mode = Literal['off', 'warn', 'fail']
+
+
+class Budget(TypedDict):
+    statements: int
+    repeats: NotRequired[int]
+
+
+class QueryBudgetWarning(UserWarning):
+    pass
+
+
+# by method and route template, the routes of one path can have different budgets
+_BUDGETS: dict[tuple[str, str], Budget] = {}
+
+
+def declare(method: str, route: str, budget: Budget) -> None:
+    """declare the budget of a method of a route template"""
+    _BUDGETS[(method, route)] = budget
+
+
+def budget(method: str, route: str) -> Budget | None:
+    return _BUDGETS.get((method, route))
+
+
+def find_violations(method: str, route: str, current_request_context: request_context.RequestContext, repeat_threshold: int) -> list[str]:
+    """returns a description of everything the request did over its budget"""
+
+    violations: list[str] = []
+    route_budget = budget(method, route)
+    route = method + ' ' + route
+
+    if route_budget is not None:
+        if current_request_context.query_count > route_budget['statements']:
+            violations.append('{} executed {} statements, budget is {}'.format(
+                route, current_request_context.query_count, route_budget['statements']))
+        repeat_threshold = route_budget.get('repeats', repeat_threshold)
+
+    for statement, statement_record in current_request_context.statements.items():
+        if statement_record.count > repeat_threshold and len(statement_record.parameters) > 1:
+            violations.append('{} executed the same statement {} times with {} different parameters: {}'.format(
+                route, statement_record.count, len(statement_record.parameters), metrics.normalize_statement(statement)))
+
+    return violations
+
+
+class QueryBudgetMiddleware:
+    """ASGI middleware enforcing the query budgets, add it inside of request_context.RequestContextMiddleware with track_statements"""
+
+    def __init__(self, app, mode: Mode = 'warn', repeat_threshold: int = 3):
+        self.app = app
+        self.mode = mode
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+
+        current_request_context = request_context.current()
+        if scope['type'] != 'http' or self.mode == 'off' or current_request_context is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.mode == 'warn':
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                for violation in find_violations(scope['method'], metrics.route_template(scope), current_request_context, self.repeat_threshold):
+                    warnings.warn(violation, QueryBudgetWarning)
+            return
+
+        messages: list[dict] = []
+
+        async def hold(message):
+            messages.append(message)
+
+        await self.app(scope, receive, hold)
+
+        violations = find_violations(scope['method'], metrics.route_template(
+            scope), current_request_context, self.repeat_threshold)
+        if len(violations) == 0:
+            for message in messages:
+                await send(message)
+            return
+
+        body = json.dumps({'detail': violations}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 500,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,177 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from contextvars import ContextVar
+from contextlib import contextmanager
+from collections.abc import Callable
+import time
+
+"""
+Developer's Note:
+State collected while serving one request. The context is set by RequestContextMiddleware and read from anywhere below it,
+including SQLAlchemy's engine events, which run in a greenlet that shares the request's context.
+
+A statement the app executes counts once, however many cursor executions the driver splits it into: an executemany INSERT
+with sort_by_parameter_order runs one row per batch on SQLite, which cannot sort RETURNING rows otherwise. The batches
+share SQLAlchemy's execution context, their time is added to the statement.
+"""
+
+StatementListener = Callable[[str, str, float], None]
+
+
+class StatementRecord:
+    count: int
+    parameters: set[str]
+
+    def __init__(self):
+        self.count = 0
+        self.parameters = set()
+
+
+class OpenSpan:
+    name: str
+    start: float
+    excluded: float
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.excluded = 0.0
+
+
+class RequestContext:
+    track_statements: bool
+    track_timing: bool
+    query_count: int
+    query_duration: float
+    statements: dict[str, StatementRecord]
+    timings: dict[str, float]
+    endpoint_end: float | None
+    open_spans: list[OpenSpan]
+    last_execution: object | None
+
+    def __init__(self, track_statements: bool = False, track_timing: bool = False):
+        self.track_statements = track_statements
+        self.track_timing = track_timing
+        self.query_count = 0
+        self.query_duration = 0.0
+        self.statements = {}
+        self.timings = {}
+        self.endpoint_end = None
+        self.open_spans = []
+        self.last_execution = None
+
+    def record_statement(self, statement: str, parameters, duration: float, execution: object | None = None) -> None:
+        """`execution` is the execution context of the statement, further batches of the same execution add their time only"""
+
+        batch = execution is not None and execution is self.last_execution
+        self.last_execution = execution
+        if not batch:
+            self.query_count += 1
+        self.query_duration += duration
+
+        # SQL is its own stage, take it out of the span it ran in
+        if len(self.open_spans) > 0:
+            self.open_spans[-1].excluded += duration
+
+        if self.track_statements and not batch:
+            if statement not in self.statements:
+                self.statements[statement] = StatementRecord()
+            statement_record = self.statements[statement]
+            statement_record.count += 1
+            statement_record.parameters.add(repr(parameters))
+
+
+_REQUEST_CONTEXT: ContextVar[RequestContext | None] = ContextVar(
+    'request_context', default=None)
+
+_STATEMENT_LISTENERS: list[StatementListener] = []
+
+
+def current() -> RequestContext | None:
+    """returns the context of the request being served, None outside of a request"""
+    return _REQUEST_CONTEXT.get()
+
+
+@contextmanager
+def activate(request_context: RequestContext):
+    token = _REQUEST_CONTEXT.set(request_context)
+    try:
+        yield request_context
+    finally:
+        _REQUEST_CONTEXT.reset(token)
+
+
+@contextmanager
+def span(name: str):
+    """time a stage of the request, nested spans and SQL are not counted towards the enclosing span"""
+
+    current_request_context = current()
+    if current_request_context is None or not current_request_context.track_timing:
+        yield
+        return
+
+    open_span = OpenSpan(name)
+    current_request_context.open_spans.append(open_span)
+    try:
+        yield
+    finally:
+        current_request_context.open_spans.pop()
+        duration = time.perf_counter() - open_span.start
+        current_request_context.timings[name] = current_request_context.timings.get(
+            name, 0.0) + duration - open_span.excluded
+        if len(current_request_context.open_spans) > 0:
+            current_request_context.open_spans[-1].excluded += duration
+
+
+def add_statement_listener(listener: StatementListener) -> None:
+    """`listener` is called with the engine name, the statement and its duration after every statement"""
+    _STATEMENT_LISTENERS.append(listener)
+
+
+def instrument_engine(engine: AsyncEngine, name: str = 'default') -> None:
+    """time every statement executed by `engine` and attribute it to the current request"""
+
+    sync_engine = engine.sync_engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['query_start'].pop()
+
+        for listener in _STATEMENT_LISTENERS:
+            listener(name, statement, duration)
+
+        current_request_context = current()
+        if current_request_context is not None:
+            current_request_context.record_statement(
+                statement, parameters, duration, context)
+
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            query_starts = exception_context.connection.info.get(
+                'query_start', [])
+            if len(query_starts) > 0:
+                query_starts.pop()
+
+    event.listen(sync_engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(sync_engine, 'handle_error', handle_error)
+
+
+class RequestContextMiddleware:
+    """ASGI middleware giving every HTTP request its own RequestContext, add it outside of the middlewares reading it"""
+
+    def __init__(self, app, track_statements: bool = False, track_timing: bool = False):
+        self.app = app
+        self.track_statements = track_statements
+        self.track_timing = track_timing
+
+    async def __call__(self, scope, receive, send):
+
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with activate(RequestContext(self.track_statements, self.track_timing)):
+            await self.app(scope, receive, send)
@@ -0,0 +1,170 @@
+from collections import OrderedDict
+from typing import Any
+import gzip
+import time
+from uirpsoftball import cache, metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+"""
+Developer's Note:
+Caches the responses of GET routes (the pages) for as long as the data version they were rendered from is current, and
+at most MAX_AGE seconds, as some pages depend on the time (the upcoming round, a team's next game).
+
+Compressed variants are stored next to the payload: a payload is compressed at most once per encoding and data version,
+and repeated requests are served the stored bytes without running the route or compressing anything. Accept-Encoding
+is negotiated between brotli (when the brotli extra is installed, pip install uirpsoftball[brotli]), gzip and identity.
+
+A hit is answered before routing, so the route that rendered the response is stored with it and set on the scope again,
+the middlewares outside (metrics) label the hit by its route template like the miss.
+
+Add it inside of CORSMiddleware, which adds its headers per request.
+"""
+
+CONTENT_ENCODINGS: list[str] = (['br'] if brotli is not None else []) + ['gzip']
+
+# headers describing the stored body, replaced for every variant
+_BODY_HEADERS = {b'content-length', b'content-encoding', b'vary'}
+
+
+def negotiate(accept_encoding: str, available: list[str] = CONTENT_ENCODINGS) -> str | None:
+    """returns the encoding to send out of `available` (in order of preference), None for identity"""
+
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        coding, _, parameters = part.strip().partition(';')
+        quality = 1.0
+        parameter_name, _, value = parameters.strip().partition('=')
+        if parameter_name.strip() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding:
+            qualities[coding.strip().lower()] = quality
+
+    best: str | None = None
+    best_quality = 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CachedResponse:
+    version: cache.DataVersion
+    expires: float
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    variants: dict[str | None, bytes]
+    route: Any
+
+    def __init__(self, version: cache.DataVersion, expires: float, status: int, headers: list[tuple[bytes, bytes]], body: bytes, route: Any = None):
+        self.version = version
+        self.expires = expires
+        self.status = status
+        self.headers = [(key, value) for key, value in headers
+                        if key.lower() not in _BODY_HEADERS]
+        self.variants = {None: body}
+        self.route = route
+
+    def is_fresh(self) -> bool:
+        return self.version == cache.data_version() and time.monotonic() < self.expires
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware caching and precompressing the responses of GET requests to `paths` (prefixes)"""
+
+    def __init__(self, app, paths: list[str], max_age: float = 60, max_entries: int = 256, minimum_size: int = 512, gzip_level: int = 9, brotli_quality: int = 9):
+        self.app = app
+        self.paths = tuple(paths)
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def variant(self, cached_response: CachedResponse, encoding: str | None) -> bytes:
+        if encoding not in cached_response.variants:
+            cached_response.variants[encoding] = self.compress(
+                cached_response.variants[None], encoding)
+        return cached_response.variants[encoding]
+
+    async def send_cached(self, cached_response: CachedResponse, accept_encoding: str, send) -> None:
+
+        encoding = None
+        if len(cached_response.variants[None]) >= self.minimum_size:
+            encoding = negotiate(accept_encoding)
+        body = self.variant(cached_response, encoding)
+
+        headers = list(cached_response.headers)
+        headers.append((b'content-length', str(len(body)).encode()))
+        headers.append((b'vary', b'accept-encoding'))
+        if encoding is not None:
+            headers.append((b'content-encoding', encoding.encode()))
+
+        await send({'type': 'http.response.start', 'status': cached_response.status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    def store(self, key: str, cached_response: CachedResponse) -> None:
+        # like cache.VersionedCache.set, a response rendered while the data changed is not kept
+        if cached_response.version != cache.data_version():
+            return
+        self.entries[key] = cached_response
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def __call__(self, scope, receive, send):
+
+        if scope['type'] != 'http' or scope['method'] != 'GET' or not scope['path'].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        key = scope['path'] + '?' + scope['query_string'].decode('latin-1')
+        accept_encoding = dict(scope['headers']).get(
+            b'accept-encoding', b'').decode('latin-1')
+
+        cached_response = self.entries.get(key)
+        if cached_response is not None and cached_response.is_fresh():
+            metrics.RESPONSE_CACHE_REQUESTS.inc('hit')
+            if cached_response.route is not None:
+                scope['route'] = cached_response.route
+            await self.send_cached(cached_response, accept_encoding, send)
+            return
+
+        metrics.RESPONSE_CACHE_REQUESTS.inc('miss')
+        version = cache.data_version()
+        expires = time.monotonic() + self.max_age
+        messages: list[dict] = []
+
+        async def hold(message):
+            messages.append(message)
+
+        await self.app(scope, receive, hold)
+
+        start = messages[0] if len(messages) > 0 else None
+        cacheable = start is not None and start['type'] == 'http.response.start' and start['status'] == 200 and \
+            not any(name.lower() == b'set-cookie' for name, _ in start.get('headers', []))
+
+        if not cacheable:
+            for message in messages:
+                await send(message)
+            return
+
+        body = b''.join(message.get('body', b'')
+                        for message in messages if message['type'] == 'http.response.body')
+        cached_response = CachedResponse(
+            version, expires, start['status'], start.get('headers', []), body, scope.get('route'))
+        self.store(key, cached_response)
+        await self.send_cached(cached_response, accept_encoding, send)
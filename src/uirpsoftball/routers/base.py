@@ -1,23 +1,71 @@
 from pydantic import BaseModel
 from typing import Protocol, Unpack, TypeVar, TypedDict, Generic, NotRequired, Literal, Self, ClassVar, Type, Optional
 from typing import TypeVar, Type, List, Callable, ClassVar, TYPE_CHECKING, Generic, Protocol, Any, Annotated, cast
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi.routing import APIRoute
 from functools import wraps, lru_cache
 from enum import Enum
 from collections.abc import Sequence
+import datetime as datetime_module
 
 
-from uirpsoftball import config, custom_types, models
+from uirpsoftball import config, custom_types, models, query_budget, server_timing
 from uirpsoftball.services import base as base_service
 from uirpsoftball.schemas import pagination as pagination_schema, order_by as order_by_schema
 
 
+# most instances a bulk endpoint takes in one request
+MAX_BATCH_SIZE = 1000
+
+TExport = TypeVar('TExport', bound=BaseModel)
+
+# statement budgets of the bulk handlers of the admin routers
+BULK_QUERY_BUDGETS: dict[str, query_budget.Budget] = {
+    'create_many': {'statements': 2},
+    'update_many': {'statements': 3},
+    'delete_many': {'statements': 2},
+}
+
+
 def get_pagination(max_limit: int = 100, default_limit: int = 50):
     def dependency(limit: int = Query(default_limit, ge=1, le=max_limit, description='Quantity of results'), offset: int = Query(0, ge=0, description='Index of the first result')):
         return pagination_schema.Pagination(limit=limit, offset=offset)
     return dependency
 
 
+def get_ids(ids: str | None = Query(None, description='Comma separated ids to fetch instead of a page, at most {}. The results are in the same order, with a not found marker for every id not found'.format(MAX_BATCH_SIZE))) -> list[int] | None:
+
+    if ids is None:
+        return None
+    try:
+        parsed_ids = [int(id) for id in ids.split(',')]
+    except ValueError:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST,
+                            detail='"ids" must be comma separated integers')
+    if len(parsed_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST,
+                            detail='"ids" takes at most {} ids'.format(MAX_BATCH_SIZE))
+    return parsed_ids
+
+
+class NotFound(BaseModel):
+    """stands in for an instance requested by id that does not exist"""
+    id: custom_types.Id
+    not_found: Literal[True] = True
+
+
+def check_time_window(datetime_from: datetime_module.datetime | None, datetime_to: datetime_module.datetime | None) -> None:
+    """the `from` and `to` query parameters of a time window must have a UTC offset and be in order"""
+
+    for value in (datetime_from, datetime_to):
+        if value is not None and value.tzinfo is None:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST,
+                                detail='from and to must include a UTC offset')
+    if datetime_from is not None and datetime_to is not None and datetime_from > datetime_to:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST,
+                            detail='from must not be after to')
+
+
 def order_by_depends(
     order_by: list[base_service.TOrderBy_co] = Query(
         [], description='Ordered series of fields to sort the results by, in the order they should be applied'),
@@ -77,6 +125,18 @@ class DeleteParams(Generic[custom_types.TId], RouterVerbParams, WithId[custom_ty
     pass
 
 
+class PostManyParams(Generic[base_service.TCreateModel], RouterVerbParams):
+    create_models: Sequence[base_service.TCreateModel]
+
+
+class PatchManyParams(Generic[custom_types.TId, base_service.TUpdateModel], RouterVerbParams):
+    update_models: dict[custom_types.TId, base_service.TUpdateModel]
+
+
+class DeleteManyParams(Generic[custom_types.TId], RouterVerbParams):
+    ids: list[custom_types.TId]
+
+
 class HasPrefix(Protocol):
     _PREFIX: ClassVar[str]
 
@@ -90,6 +150,10 @@ class HasTag(Protocol):
 
 
 class Router(HasPrefix, HasAdmin, HasTag):
+
+    # statement budgets of the route handlers, by handler name
+    _QUERY_BUDGETS: ClassVar[dict[str, query_budget.Budget]] = {}
+
     def __init__(self):
 
         prefix = self._PREFIX
@@ -100,9 +164,16 @@ class Router(HasPrefix, HasAdmin, HasTag):
         if self._ADMIN:
             tags.append('Admin')
 
-        self.router = APIRouter(prefix=prefix, tags=tags)
+        self.router = APIRouter(prefix=prefix, tags=tags,
+                                route_class=server_timing.TimedAPIRoute)
         self._set_routes()
 
+        for route in self.router.routes:
+            if isinstance(route, APIRoute) and route.name in self._QUERY_BUDGETS:
+                for method in route.methods:
+                    query_budget.declare(
+                        method, route.path, self._QUERY_BUDGETS[route.name])
+
     def _set_routes(self):
         pass
 
@@ -148,10 +219,14 @@ class ServiceRouter(Generic[
 
 ]):
 
+    def __init__(self):
+        self._SERVICE.check_filters_indexed()
+        super().__init__()
+
     @classmethod
     async def _get(cls, params: GetParams[custom_types.TId]) -> models.TModel:
 
-        async with config.ASYNC_SESSIONMAKER() as session:
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
             try:
                 model_inst = await cls._SERVICE.read({
                     'session': session,
@@ -171,7 +246,7 @@ class ServiceRouter(Generic[
 
     @classmethod
     async def _get_many(cls, params: GetManyParams[models.TModel, base_service.TOrderBy_co]) -> Sequence[models.TModel]:
-        async with config.ASYNC_SESSIONMAKER() as session:
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
             try:
                 d: base_service.ReadManyParams[models.TModel, base_service.TOrderBy_co] = {
                     'session': session,
@@ -188,6 +263,19 @@ class ServiceRouter(Generic[
 
             return model_insts
 
+    @classmethod
+    async def _get_by_ids(cls, ids: Sequence[custom_types.TId], export: Type[TExport]) -> list[TExport | NotFound]:
+        """one SELECT ... WHERE id IN, the instances exported in the order of `ids`, NotFound for the missing ones"""
+
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
+            model_insts = await cls._SERVICE.read_by_ids({
+                'session': session,
+                'ids': ids,
+            })
+
+            return [export.model_validate(model_insts[id]) if id in model_insts else NotFound(id=id)
+                    for id in ids]
+
     @classmethod
     async def _post(cls, params: PostParams[base_service.TCreateModel]) -> models.TModel:
         async with config.ASYNC_SESSIONMAKER() as session:
@@ -237,6 +325,38 @@ class ServiceRouter(Generic[
             except Exception as e:
                 raise
 
+    @classmethod
+    async def _post_many(cls, params: PostManyParams[base_service.TCreateModel]) -> list[models.TModel]:
+        async with config.ASYNC_SESSIONMAKER() as session:
+            return await cls._SERVICE.create_many({
+                'session': session,
+                'create_models': params['create_models'],
+            })
+
+    @classmethod
+    async def _patch_many(cls, params: PatchManyParams[custom_types.TId, base_service.TUpdateModel]) -> list[models.TModel]:
+        async with config.ASYNC_SESSIONMAKER() as session:
+            try:
+                return await cls._SERVICE.update_many({
+                    'session': session,
+                    'update_models': params['update_models'],
+                })
+            except base_service.NotFoundError as e:
+                raise HTTPException(
+                    status.HTTP_404_NOT_FOUND, detail=e.error_message)
+
+    @classmethod
+    async def _delete_many(cls, params: DeleteManyParams[custom_types.TId]) -> None:
+        async with config.ASYNC_SESSIONMAKER() as session:
+            try:
+                await cls._SERVICE.delete_many({
+                    'session': session,
+                    'ids': params['ids'],
+                })
+            except base_service.NotFoundError as e:
+                raise HTTPException(
+                    status.HTTP_404_NOT_FOUND, detail=e.error_message)
+
     @classmethod
     @lru_cache(maxsize=None)
     def get_responses(cls):
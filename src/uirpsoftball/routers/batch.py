@@ -0,0 +1,102 @@
+from fastapi import Request, status, HTTPException
+from pydantic import BaseModel, Field
+from typing import Any
+import asyncio
+import json
+
+from uirpsoftball import asgi_client, cache
+from uirpsoftball.routers import base
+
+"""
+Developer's Note:
+Runs several GET requests in one round trip, for clients on slow connections that would otherwise pay the latency of
+every request. The sub-requests go through the whole app in-process, middleware included (response cache, metrics,
+query budgets), concurrently, and come back in the order they were sent.
+
+Every sub-request opens its own session: a session cannot be shared by concurrent coroutines. What sharing one snapshot
+would give, every response seeing the same data, comes from the data version instead: when a write lands while the
+batch runs, the batch runs again, up to _ATTEMPTS times. `consistent` says whether the responses all saw
+`data_version`. Sub-requests to /pages/ are served from the response cache when it is enabled, so a batch of pages
+that did not change costs no SQL at all.
+"""
+
+MAX_SUB_REQUESTS = 20
+_ATTEMPTS = 3
+
+
+class SubRequest(BaseModel):
+    path: str = Field(description='Path of a GET request, with its query string, e.g. /pages/game/1/')
+    headers: dict[str, str] = {}
+
+
+class BatchRequest(BaseModel):
+    requests: list[SubRequest] = Field(max_length=MAX_SUB_REQUESTS)
+
+
+class SubResponse(BaseModel):
+    status_code: int
+    headers: dict[str, str]
+    body: Any = Field(description='Decoded JSON when the response is JSON, the text otherwise')
+
+
+class BatchResponse(BaseModel):
+    data_version: int
+    consistent: bool
+    responses: list[SubResponse]
+
+
+class BatchRouter(base.Router):
+    _PREFIX = '/batch'
+    _TAG = 'Batch'
+    _ADMIN = False
+    _QUERY_BUDGETS = {
+        'batch': {'statements': 0},
+    }
+
+    @classmethod
+    async def dispatch(cls, app: asgi_client.ASGIApp, sub_request: SubRequest) -> SubResponse:
+
+        # the batch response is compressed as a whole, a compressed body could not be embedded in it
+        headers = {key: value for key, value in sub_request.headers.items()
+                   if key.lower() != 'accept-encoding'}
+        try:
+            response = await asgi_client.get(app, sub_request.path, headers)
+        except Exception:
+            # the app already answered 500, the exception is raised again for the server to log
+            response = {'status_code': 500, 'headers': [],
+                        'body': b'Internal Server Error'}
+
+        response_headers = {key: value for key, value in response['headers']
+                            if key != 'content-length'}
+        text = response['body'].decode('utf-8', errors='replace')
+        body: Any = text
+        if response_headers.get('content-type', '').startswith('application/json') and len(text) > 0:
+            body = json.loads(text)
+
+        return SubResponse(status_code=response['status_code'], headers=response_headers, body=body)
+
+    @classmethod
+    async def batch(cls, request: Request, batch_request: BatchRequest) -> BatchResponse:
+        """runs up to MAX_SUB_REQUESTS GET sub-requests concurrently and returns their responses in order, a larger batch
+        answers 422; every sub-request is checked against the query budget of its own route, one over its budget answers
+        500 in its place
+        a write landing while the sub-requests run runs them all again; when one lands during each of the _ATTEMPTS (3)
+        attempts, the responses of the last attempt are returned anyway, with `consistent` false and `data_version` the
+        version that attempt started at, they may have seen different data"""
+
+        for sub_request in batch_request.requests:
+            if not sub_request.path.startswith('/') or sub_request.path.startswith(cls._PREFIX):
+                raise HTTPException(status.HTTP_400_BAD_REQUEST,
+                                    detail='Sub-request paths must start with / and must not be batches: ' + sub_request.path)
+
+        for _ in range(_ATTEMPTS):
+            version = cache.data_version()
+            responses = await asyncio.gather(*(cls.dispatch(request.app, sub_request)
+                                               for sub_request in batch_request.requests))
+            if cache.data_version() == version:
+                return BatchResponse(data_version=version, consistent=True, responses=responses)
+
+        return BatchResponse(data_version=version, consistent=False, responses=responses)
+
+    def _set_routes(self):
+        self.router.post('/')(self.batch)
@@ -0,0 +1,74 @@
+from fastapi import Request, Response, status, HTTPException
+from email.utils import format_datetime, parsedate_to_datetime
+
+from uirpsoftball import custom_types
+from uirpsoftball.routers import base
+from uirpsoftball.services import calendar as calendar_service
+
+
+class CalendarRouter(base.Router):
+    _PREFIX = '/calendar'
+    _TAG = 'Calendar'
+    _ADMIN = False
+    _QUERY_BUDGETS = {
+        'team': {'statements': 4},
+        'division': {'statements': 4},
+        'location': {'statements': 3},
+    }
+
+    @classmethod
+    def is_not_modified(cls, request: Request, feed: calendar_service.Feed) -> bool:
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match is not None:
+            # weak comparison, If-Modified-Since is ignored when If-None-Match is sent
+            etags = {etag.strip().removeprefix('W/')
+                     for etag in if_none_match.split(',')}
+            return '*' in etags or feed.etag.removeprefix('W/') in etags
+
+        if_modified_since = request.headers.get('if-modified-since')
+        if if_modified_since is not None:
+            try:
+                return feed.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @classmethod
+    async def respond(cls, request: Request, kind: calendar_service.FeedKind, identifier: str) -> Response:
+
+        feed = await calendar_service.Calendar.get_feed(kind, identifier)
+        if feed is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f'{kind.capitalize()} {identifier} not found',
+            )
+
+        headers = {
+            'ETag': feed.etag,
+            'Last-Modified': format_datetime(feed.last_modified, usegmt=True),
+            'Cache-Control': 'no-cache',
+        }
+        if cls.is_not_modified(request, feed):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(feed.body, media_type='text/calendar; charset=utf-8', headers=headers)
+
+    @classmethod
+    async def team(cls, request: Request, team_slug: custom_types.Team.slug) -> Response:
+        return await cls.respond(request, 'team', team_slug)
+
+    @classmethod
+    async def division(cls, request: Request, division_id: custom_types.Division.id) -> Response:
+        return await cls.respond(request, 'division', str(division_id))
+
+    @classmethod
+    async def location(cls, request: Request, location_id: custom_types.Location.id) -> Response:
+        return await cls.respond(request, 'location', str(location_id))
+
+    def _set_routes(self):
+        self.router.get('/team/{team_slug}.ics',
+                        response_class=Response)(self.team)
+        self.router.get('/division/{division_id}.ics',
+                        response_class=Response)(self.division)
+        self.router.get('/location/{location_id}.ics',
+                        response_class=Response)(self.location)
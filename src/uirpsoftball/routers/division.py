@@ -1,4 +1,4 @@
-from fastapi import Depends, status
+from fastapi import Depends, Body, status
 from sqlmodel import select
 from typing import Annotated, cast, Type
 from collections.abc import Sequence
@@ -30,7 +30,11 @@ class DivisionRouter(_Base):
         cls,
         pagination: Annotated[pagination_schema.Pagination, Depends(
             base.get_pagination())],
-    ) -> Sequence[division_schema.DivisionExport]:
+        ids: Annotated[list[custom_types.Division.id] | None, Depends(base.get_ids)],
+    ) -> Sequence[division_schema.DivisionExport | base.NotFound]:
+        if ids is not None:
+            return await cls._get_by_ids(ids, division_schema.DivisionExport)
+
         return [division_schema.DivisionExport.model_validate(division) for division in await cls._get_many({
             'pagination': pagination,
         })]
@@ -46,6 +50,51 @@ class DivisionRouter(_Base):
             })
         )
 
+    @classmethod
+    async def by_ids(
+        cls,
+        division_ids: Annotated[Sequence[custom_types.Division.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> Sequence[division_schema.DivisionExport | base.NotFound]:
+        return await cls._get_by_ids(division_ids, division_schema.DivisionExport)
+
     def _set_routes(self):
         self.router.get('/')(self.list)
+        self.router.post('/by-ids/')(self.by_ids)
         self.router.get('/{division_id}/')(self.by_id)
+
+
+class DivisionAdminRouter(_Base):
+    _ADMIN = True
+    _QUERY_BUDGETS = base.BULK_QUERY_BUDGETS
+
+    @classmethod
+    async def create_many(
+        cls,
+        divisions: Annotated[list[division_schema.DivisionAdminCreate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[division_schema.DivisionExport]:
+        return [division_schema.DivisionExport.model_validate(division) for division in await cls._post_many({
+            'create_models': divisions,
+        })]
+
+    @classmethod
+    async def update_many(
+        cls,
+        divisions: Annotated[dict[custom_types.Division.id, division_schema.DivisionAdminUpdate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[division_schema.DivisionExport]:
+        return [division_schema.DivisionExport.model_validate(division) for division in await cls._patch_many({
+            'update_models': divisions,
+        })]
+
+    @classmethod
+    async def delete_many(
+        cls,
+        division_ids: Annotated[list[custom_types.Division.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> None:
+        await cls._delete_many({
+            'ids': division_ids,
+        })
+
+    def _set_routes(self):
+        self.router.post('/bulk/')(self.create_many)
+        self.router.patch('/bulk/')(self.update_many)
+        self.router.delete('/bulk/')(self.delete_many)
@@ -1,16 +1,65 @@
-from fastapi import Depends, status
-from sqlmodel import select
+from fastapi import Depends, Body, Query, status
+from sqlmodel import select, col
 from typing import Annotated, cast, Type
-from collections.abc import Sequence
+from collections.abc import Sequence, Iterable
+import datetime as datetime_module
 
 from uirpsoftball import config, custom_types
 from uirpsoftball.routers import base
-from uirpsoftball.models.tables import Game as GameTable
+from uirpsoftball.models.tables import Game as GameTable, Team as TeamTable
 from uirpsoftball.services.game import Game as GameService
 from uirpsoftball.services.team import Team as TeamService
 from uirpsoftball.schemas import game as game_schema, pagination as pagination_schema, order_by as order_by_schema
 
 
+def get_filters(
+    team_id: custom_types.Team.id | None = Query(
+        None, description='Only games the team plays in, home or away'),
+    round_ids: list[custom_types.Game.round_id] = Query(
+        [], description='Only games of these rounds'),
+    location_id: custom_types.Game.location_id | None = None,
+    datetime_from: datetime_module.datetime | None = Query(
+        None, alias='from', description='Only games starting at or after this time, with a UTC offset'),
+    datetime_to: datetime_module.datetime | None = Query(
+        None, alias='to', description='Only games starting before this time, with a UTC offset'),
+    scored: bool | None = Query(
+        None, description='Only games with (true) or without (false) a score'),
+) -> game_schema.GameFilters:
+
+    base.check_time_window(datetime_from, datetime_to)
+    return game_schema.GameFilters(
+        team_id=team_id,
+        round_ids=round_ids if len(round_ids) > 0 else None,
+        location_id=location_id,
+        datetime_from=datetime_from,
+        datetime_to=datetime_to,
+        scored=scored,
+    )
+
+
+async def reseed_divisions(team_ids: Iterable[custom_types.Team.id | None]) -> None:
+    """reseeds the divisions of the teams, once each"""
+
+    real_team_ids = {team_id for team_id in team_ids if team_id is not None}
+    if len(real_team_ids) == 0:
+        return
+
+    async with config.ASYNC_SESSIONMAKER() as session:
+        division_ids = set(await TeamService.fetch_many_scalars(
+            session,
+            col(TeamTable.division_id),
+            pagination_schema.Pagination(limit=base.MAX_BATCH_SIZE * 2, offset=0),
+            where=[col(TeamTable.id).in_(real_team_ids), col(TeamTable.division_id).is_not(None)],
+        ))
+        if len(division_ids) > 0:
+            await TeamService.update_seeds_many(session, division_ids)
+
+
+# fields of a game that change the seeds of its teams' divisions
+_SEEDING_FIELDS = {'home_team_id', 'away_team_id',
+                   'home_team_score', 'away_team_score'}
+
+
 class _Base(base.ServiceRouter[
     GameTable,
     custom_types.Game.id,
@@ -31,9 +80,15 @@ class GameRouter(_Base):
         cls,
         pagination: Annotated[pagination_schema.Pagination, Depends(
             base.get_pagination())],
-    ) -> Sequence[game_schema.GameExport]:
+        filters: Annotated[game_schema.GameFilters, Depends(get_filters)],
+        ids: Annotated[list[custom_types.Game.id] | None, Depends(base.get_ids)],
+    ) -> Sequence[game_schema.GameExport | base.NotFound]:
+        if ids is not None:
+            return await cls._get_by_ids(ids, game_schema.GameExport)
+
         return [game_schema.GameExport.model_validate(game) for game in await cls._get_many({
             'pagination': pagination,
+            'query': select(GameTable).where(*cls._SERVICE.build_filters(filters)),
         })]
 
     @classmethod
@@ -53,6 +108,10 @@ class GameRouter(_Base):
         game_id: custom_types.Game.id,
         game: game_schema.ScoreUpdate,
     ):
+        version_before, head_to_head_matrices = TeamService.head_to_head_matrices()
+        async with config.ASYNC_SESSIONMAKER() as session:
+            game_before = await GameService.fetch_by_id(session, game_id)
+
         game_return = await cls._patch({
             'id': game_id,
             'update_model': game_schema.GameAdminUpdate(
@@ -60,18 +119,11 @@ class GameRouter(_Base):
                 away_team_score=game.away_team_score,
             )
         })
-        async with config.ASYNC_SESSIONMAKER() as session:
-            divisions: set[custom_types.Division.id] = set()
-            for team_id in [game_return.home_team_id, game_return.away_team_id]:
-                if team_id is not None:
-                    team = await TeamService.fetch_by_id(session, team_id)
-                    if team is not None:
-                        division = team.division_id
-                        if division is not None:
-                            divisions.add(division)
-
-            for division_id in divisions:
-                await TeamService.update_seeds(session, division_id)
+
+        if game_before is not None:
+            TeamService.update_head_to_head_matrices(
+                version_before, head_to_head_matrices, [game_before], [game_return])
+        await reseed_divisions([game_return.home_team_id, game_return.away_team_id])
 
     @classmethod
     async def update_is_accepting_scores(
@@ -88,9 +140,78 @@ class GameRouter(_Base):
             })
         )
 
+    @classmethod
+    async def by_ids(
+        cls,
+        game_ids: Annotated[Sequence[custom_types.Game.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> Sequence[game_schema.GameExport | base.NotFound]:
+        return await cls._get_by_ids(game_ids, game_schema.GameExport)
+
     def _set_routes(self):
         self.router.get('/')(self.list)
+        self.router.post('/by-ids/')(self.by_ids)
         self.router.get('/{game_id}/')(self.by_id)
         self.router.patch('/{game_id}/score/')(self.update_score)
         self.router.patch(
             '/{game_id}/is-accepting-scores/')(self.update_is_accepting_scores)
+
+
+class GameAdminRouter(_Base):
+    _ADMIN = True
+    _QUERY_BUDGETS = {
+        **base.BULK_QUERY_BUDGETS,
+        # the bulk update, then the divisions of the teams and one reseed of all of them
+        'update_many': {'statements': 11},
+    }
+
+    @classmethod
+    async def create_many(
+        cls,
+        games: Annotated[list[game_schema.GameAdminCreate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[game_schema.GameExport]:
+        return [game_schema.GameExport.model_validate(game) for game in await cls._post_many({
+            'create_models': games,
+        })]
+
+    @classmethod
+    async def update_many(
+        cls,
+        games: Annotated[dict[custom_types.Game.id, game_schema.GameAdminUpdate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[game_schema.GameExport]:
+
+        reseed = any(update_model.model_fields_set &
+                     _SEEDING_FIELDS for update_model in games.values())
+
+        # the results before the write update the head to head matrices, and the teams a game is moved away from are
+        # reseeded too
+        version_before, head_to_head_matrices = TeamService.head_to_head_matrices()
+        games_before: dict[custom_types.Game.id, GameTable] = {}
+        if reseed:
+            async with config.ASYNC_SESSIONMAKER() as session:
+                games_before = await cls._SERVICE.fetch_by_ids(session, games.keys())
+
+        games_after = await cls._patch_many({
+            'update_models': games,
+        })
+
+        if reseed:
+            TeamService.update_head_to_head_matrices(
+                version_before, head_to_head_matrices, [games_before[game_id] for game_id in games], games_after)
+            await reseed_divisions([team_id for game in list(games_before.values()) + games_after
+                                    for team_id in (game.home_team_id, game.away_team_id)])
+
+        return [game_schema.GameExport.model_validate(game) for game in games_after]
+
+    @classmethod
+    async def delete_many(
+        cls,
+        game_ids: Annotated[list[custom_types.Game.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> None:
+        await cls._delete_many({
+            'ids': game_ids,
+        })
+
+    def _set_routes(self):
+        self.router.post('/bulk/')(self.create_many)
+        self.router.patch('/bulk/')(self.update_many)
+        self.router.delete('/bulk/')(self.delete_many)
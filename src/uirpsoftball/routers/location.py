@@ -1,4 +1,4 @@
-from fastapi import Depends, status
+from fastapi import Depends, Body, status
 from sqlmodel import select
 from typing import Annotated, cast, Type
 from collections.abc import Sequence
@@ -30,7 +30,11 @@ class LocationRouter(_Base):
         cls,
         pagination: Annotated[pagination_schema.Pagination, Depends(
             base.get_pagination())],
-    ) -> Sequence[location_schema.LocationExport]:
+        ids: Annotated[list[custom_types.Location.id] | None, Depends(base.get_ids)],
+    ) -> Sequence[location_schema.LocationExport | base.NotFound]:
+        if ids is not None:
+            return await cls._get_by_ids(ids, location_schema.LocationExport)
+
         return [location_schema.LocationExport.model_validate(location) for location in await cls._get_many({
             'pagination': pagination,
         })]
@@ -46,6 +50,51 @@ class LocationRouter(_Base):
             })
         )
 
+    @classmethod
+    async def by_ids(
+        cls,
+        location_ids: Annotated[Sequence[custom_types.Location.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> Sequence[location_schema.LocationExport | base.NotFound]:
+        return await cls._get_by_ids(location_ids, location_schema.LocationExport)
+
     def _set_routes(self):
         self.router.get('/')(self.list)
+        self.router.post('/by-ids/')(self.by_ids)
         self.router.get('/{location_id}/')(self.by_id)
+
+
+class LocationAdminRouter(_Base):
+    _ADMIN = True
+    _QUERY_BUDGETS = base.BULK_QUERY_BUDGETS
+
+    @classmethod
+    async def create_many(
+        cls,
+        locations: Annotated[list[location_schema.LocationAdminCreate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[location_schema.LocationExport]:
+        return [location_schema.LocationExport.model_validate(location) for location in await cls._post_many({
+            'create_models': locations,
+        })]
+
+    @classmethod
+    async def update_many(
+        cls,
+        locations: Annotated[dict[custom_types.Location.id, location_schema.LocationAdminUpdate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[location_schema.LocationExport]:
+        return [location_schema.LocationExport.model_validate(location) for location in await cls._patch_many({
+            'update_models': locations,
+        })]
+
+    @classmethod
+    async def delete_many(
+        cls,
+        location_ids: Annotated[list[custom_types.Location.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> None:
+        await cls._delete_many({
+            'ids': location_ids,
+        })
+
+    def _set_routes(self):
+        self.router.post('/bulk/')(self.create_many)
+        self.router.patch('/bulk/')(self.update_many)
+        self.router.delete('/bulk/')(self.delete_many)
@@ -0,0 +1,17 @@
+from fastapi.responses import PlainTextResponse
+
+from uirpsoftball import metrics
+from uirpsoftball.routers import base
+
+
+class MetricsRouter(base.Router):
+    _PREFIX = '/metrics'
+    _TAG = 'Metrics'
+    _ADMIN = True
+
+    @classmethod
+    async def metrics(cls) -> PlainTextResponse:
+        return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+    def _set_routes(self):
+        self.router.get('/', include_in_schema=False)(self.metrics)
@@ -1,15 +1,15 @@
-from fastapi import Depends, status, HTTPException
+from fastapi import Depends, Query, status, HTTPException
 from sqlmodel import select, col
 from pydantic import BaseModel
 from typing import Annotated, cast, Type
 from collections.abc import Sequence
 import datetime as datetime_module
 
-from uirpsoftball import config, custom_types, models
+from uirpsoftball import config, custom_types, models, request_context
 
 from uirpsoftball.models import tables
 from uirpsoftball.routers import base, team as team_router, game as game_router
-from uirpsoftball.services import team as team_service, game as game_service, location as location_service, division as division_service, tournament as tournament_service, tournament_game as tournament_game_service, seeding_parameter as seeding_parameter_service
+from uirpsoftball.services import team as team_service, game as game_service, location as location_service, division as division_service, tournament as tournament_service, tournament_game as tournament_game_service, seeding_parameter as seeding_parameter_service, standings as standings_service
 from uirpsoftball.schemas import game as game_schema, team as team_schema, location as location_schema, tournament as tournament_schema, tournament_game as tournament_game_schema, division as division_schema, pagination as pagination_schema, seeding_parameter as seeding_parameter_schema, visit as visit_schema
 
 
@@ -86,6 +86,16 @@ class StandingsResponse(BaseModel):
     seeding_parameters: Sequence[seeding_parameter_schema.SeedingParameterExport]
 
 
+class StandingsOddsResponse(BaseModel):
+    simulations: int
+    seed_probabilities: dict[custom_types.Team.id,
+                             dict[custom_types.Team.seed, float]]
+
+
+class StandingsScenariosResponse(BaseModel):
+    seed_ranges: standings_service.SeedRangesByTeamId
+
+
 class AdminResponse(BaseModel):
     games: GameExportsById
     teams: TeamExportsById
@@ -99,11 +109,22 @@ class PagesRouter(
     _ADMIN = False
     _PREFIX = '/pages'
     _TAG = 'Pages'
+    # the most statements each page can run, tests/test_query_budgets.py requests every page in fail mode
+    _QUERY_BUDGETS = {
+        'home': {'statements': 13},
+        'team': {'statements': 8},
+        'schedule': {'statements': 6},
+        'game': {'statements': 8},
+        'standings': {'statements': 5},
+        'standings_odds': {'statements': 3},
+        'standings_scenarios': {'statements': 3},
+        'admin': {'statements': 3},
+    }
 
     @classmethod
     async def home(cls) -> HomeResponse:
 
-        async with config.ASYNC_SESSIONMAKER() as session:
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
 
             relevant_rounds = await game_service.Game.fetch_relevant_rounds(session)
             games = list(await game_service.Game.fetch_many(
@@ -120,11 +141,10 @@ class PagesRouter(
                 pagination=pagination_schema.Pagination(limit=1000, offset=0),
                 query=select(game_service.Game._MODEL).where(
                     col(game_service.Game._MODEL.id).in_(
-                        [tournament_game.game_id for tournament_game in await tournament_game_service.TournamentGame.fetch_many(
+                        await tournament_game_service.TournamentGame.fetch_many_ids(
                             session,
-                            pagination=pagination_schema.Pagination(
-                                limit=1000, offset=0),
-                        )]
+                            pagination_schema.Pagination(limit=1000, offset=0),
+                        )
                     )
                 )))
 
@@ -141,46 +161,43 @@ class PagesRouter(
                 pagination=pagination_schema.Pagination(limit=1000, offset=0),
             )
 
-            return HomeResponse(
-                games={game.id: game_schema.GameExport.model_validate(
-                    game) for game in games + games_played_in_tournament},
-                teams={team.id: team_schema.TeamExport.model_validate(
-                    team) for team in teams},
-                locations={location.id: location_schema.LocationExport.model_validate(
-                    location) for location in locations},
-                divisions={division.id: division_schema.DivisionExport.model_validate(
-                    division) for division in divisions},
-                division_ids_ordered=[division.id for division in divisions],
-                game_ids_and_rounds=game_service.Game.games_into_game_ids_and_rounds(
-                    games),
-                team_statistics=await team_service.Team.calculate_statistics(
-                    session,
-                    team_ids=[team.id for team in teams]
-                ),
-                team_ids_ranked_by_division={
-                    division.id: await team_service.Team.rank_by_division(
+            with request_context.span('validate'):
+                return HomeResponse(
+                    games={game.id: game_schema.GameExport.model_validate(
+                        game) for game in games + games_played_in_tournament},
+                    teams={team.id: team_schema.TeamExport.model_validate(
+                        team) for team in teams},
+                    locations={location.id: location_schema.LocationExport.model_validate(
+                        location) for location in locations},
+                    divisions={division.id: division_schema.DivisionExport.model_validate(
+                        division) for division in divisions},
+                    division_ids_ordered=[division.id for division in divisions],
+                    game_ids_and_rounds=game_service.Game.games_into_game_ids_and_rounds(
+                        games),
+                    team_statistics=await team_service.Team.calculate_statistics(
+                        session,
+                        team_ids=[team.id for team in teams]
+                    ),
+                    team_ids_ranked_by_division=await team_service.Team.rank_by_divisions(
+                        session,
+                        [division.id for division in divisions]
+                    ),
+                    tournaments=[tournament_schema.TournamentExport.model_validate(
+                        tournament) for tournament in await tournament_service.Tournament.fetch_many(
                         session,
-                        division.id,
                         pagination=pagination_schema.Pagination(
-                            limit=1000, offset=0)
-                    ) for division in divisions
-                },
-                tournaments=[tournament_schema.TournamentExport.model_validate(
-                    tournament) for tournament in await tournament_service.Tournament.fetch_many(
-                    session,
-                    pagination=pagination_schema.Pagination(
-                        limit=1000, offset=0),
-                )],
-                tournament_games=await tournament_game_service.TournamentGame.get_tournament_game_details(),
+                            limit=1000, offset=0),
+                    )],
+                    tournament_games=await tournament_game_service.TournamentGame.get_tournament_game_details(session),
 
 
 
-            )
+                )
 
     @classmethod
     async def team(cls, team_slug: custom_types.Team.slug) -> TeamResponse:
 
-        async with config.ASYNC_SESSIONMAKER() as session:
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
 
             team_id = await team_service.Team.id_from_slug(session, team_slug)
 
@@ -195,8 +212,9 @@ class PagesRouter(
 
             teams = await team_service.Team.fetch_many(session, pagination=pagination_schema.Pagination(limit=1000, offset=0))
 
-            teams_export = {team.id: team_schema.TeamExport.model_validate(
-                team) for team in teams}
+            with request_context.span('validate'):
+                teams_export = {team.id: team_schema.TeamExport.model_validate(
+                    team) for team in teams}
 
             division = await division_service.Division.fetch_one(
                 session,
@@ -216,67 +234,123 @@ class PagesRouter(
                         featured_game_id = game_id_by_datetimes[datetime].id
                         break
 
-            return TeamResponse(
-                games={game.id: game_schema.GameExport.model_validate(
-                    game) for game in games_known+games_unknown},
-                locations={location.id: location_schema.LocationExport.model_validate(location) for location in await location_service.Location.fetch_many(session, pagination=pagination_schema.Pagination(limit=1000, offset=0))},
-                teams=teams_export,
-                game_known_ids=[game.id for game in games_known],
-                division=division_schema.DivisionExport.model_validate(
-                    division),
-                game_unknown_ids=[game.id for game in games_unknown],
-                team_id=team_id,
-                featured_game_id=featured_game_id,
-                team_statistics=await team_service.Team.calculate_statistics(
+            with request_context.span('validate'):
+                return TeamResponse(
+                    games={game.id: game_schema.GameExport.model_validate(
+                        game) for game in games_known+games_unknown},
+                    locations={location.id: location_schema.LocationExport.model_validate(location) for location in await location_service.Location.fetch_many(session, pagination=pagination_schema.Pagination(limit=1000, offset=0))},
+                    teams=teams_export,
+                    game_known_ids=[game.id for game in games_known],
+                    division=division_schema.DivisionExport.model_validate(
+                        division),
+                    game_unknown_ids=[game.id for game in games_unknown],
+                    team_id=team_id,
+                    featured_game_id=featured_game_id,
+                    team_statistics=await team_service.Team.calculate_statistics(
+                        session,
+                        team_ids=[team.id for team in teams]
+                    ),
+                    team_ids_ranked=[] if division is None else (await team_service.Team.rank_by_divisions(
+                        session,
+                        [division.id]
+                    ))[division.id]
+                )
+
+    @classmethod
+    async def schedule(
+        cls,
+        datetime_from: Annotated[datetime_module.datetime | None, Query(
+            alias='from', description='Only games starting at or after this time, with a UTC offset')] = None,
+        datetime_to: Annotated[datetime_module.datetime | None, Query(
+            alias='to', description='Only games starting before this time, with a UTC offset')] = None,
+        round_ids: Annotated[list[custom_types.RoundId], Query(
+            description='Only games of these rounds')] = [],
+    ) -> ScheduleResponse:
+
+        base.check_time_window(datetime_from, datetime_to)
+
+        windowed = datetime_from is not None or datetime_to is not None or len(
+            round_ids) > 0
+
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
+
+            if not windowed:
+                games = await game_service.Game.fetch_many(
                     session,
-                    team_ids=[team.id for team in teams]
-                ),
-                team_ids_ranked=[] if division is None else await team_service.Team.rank_by_division(
+                    pagination=pagination_schema.Pagination(limit=1000, offset=0))
+                teams = await team_service.Team.fetch_many(
                     session,
-                    division.id,
                     pagination=pagination_schema.Pagination(
-                        limit=1000, offset=0
-                    )
+                        limit=1000, offset=0),
                 )
-            )
+                locations = await location_service.Location.fetch_many(
+                    session,
+                    pagination=pagination_schema.Pagination(
+                        limit=1000, offset=0),
+                )
+                tournaments = await tournament_service.Tournament.fetch_many(
+                    session,
+                    pagination=pagination_schema.Pagination(
+                        limit=1000, offset=0),
+                )
+                tournament_game_details = await tournament_game_service.TournamentGame.get_tournament_game_details(session)
 
-    @classmethod
-    async def schedule(cls) -> ScheduleResponse:
-        async with config.ASYNC_SESSIONMAKER() as session:
+            # only the games in the window, and the teams, locations and tournaments they reference
+            else:
+                games = await game_service.Game.fetch_many_in_window(
+                    session,
+                    datetime_from=datetime_from,
+                    datetime_to=datetime_to,
+                    round_ids=round_ids if len(round_ids) > 0 else None,
+                )
 
-            games = await game_service.Game.fetch_many(
-                session,
-                pagination=pagination_schema.Pagination(limit=1000, offset=0))
-            teams = await team_service.Team.fetch_many(
-                session,
-                pagination=pagination_schema.Pagination(limit=1000, offset=0),
-            )
-            locations = await location_service.Location.fetch_many(
-                session,
-                pagination=pagination_schema.Pagination(limit=1000, offset=0),
-            )
-            tournaments = await tournament_service.Tournament.fetch_many(
-                session,
-                pagination=pagination_schema.Pagination(limit=1000, offset=0),
-            )
+                team_ids = {team_id for game in games for team_id in (
+                    game.home_team_id, game.away_team_id, game.officiating_team_id) if team_id is not None}
+                location_ids = {
+                    game.location_id for game in games if game.location_id is not None}
 
-            return ScheduleResponse(
-                games={game.id: game_schema.GameExport.model_validate(
-                    game) for game in games},
-                teams={team.id: team_schema.TeamExport.model_validate(
-                    team) for team in teams},
-                locations={location.id: location_schema.LocationExport.model_validate(
-                    location) for location in locations},
-                tournaments=[tournament_schema.TournamentExport.model_validate(
-                    tournament) for tournament in tournaments],
-                game_ids_and_rounds=game_service.Game.games_into_game_ids_and_rounds(
-                    games),
-                tournament_games=await tournament_game_service.TournamentGame.get_tournament_game_details(),
-            )
+                teams = [] if len(team_ids) == 0 else await team_service.Team.fetch_many(
+                    session,
+                    pagination=pagination_schema.Pagination(
+                        limit=1000, offset=0),
+                    query=select(tables.Team).where(
+                        col(tables.Team.id).in_(team_ids))
+                )
+                locations = [] if len(location_ids) == 0 else await location_service.Location.fetch_many(
+                    session,
+                    pagination=pagination_schema.Pagination(
+                        limit=1000, offset=0),
+                    query=select(tables.Location).where(
+                        col(tables.Location.id).in_(location_ids))
+                )
+                tournament_game_details = {} if len(games) == 0 else await tournament_game_service.TournamentGame.get_tournament_game_details(
+                    session, game_ids=[game.id for game in games])
+                tournaments = [] if len(tournament_game_details) == 0 else await tournament_service.Tournament.fetch_many(
+                    session,
+                    pagination=pagination_schema.Pagination(
+                        limit=1000, offset=0),
+                    query=select(tables.Tournament).where(
+                        col(tables.Tournament.id).in_(tournament_game_details.keys()))
+                )
+
+            with request_context.span('validate'):
+                return ScheduleResponse(
+                    games={game.id: game_schema.GameExport.model_validate(
+                        game) for game in games},
+                    teams={team.id: team_schema.TeamExport.model_validate(
+                        team) for team in teams},
+                    locations={location.id: location_schema.LocationExport.model_validate(
+                        location) for location in locations},
+                    tournaments=[tournament_schema.TournamentExport.model_validate(
+                        tournament) for tournament in tournaments],
+                    game_ids_and_rounds=game_service.Game.games_into_game_ids_and_rounds(
+                        games),
+                    tournament_games=tournament_game_details,
+                )
 
     @classmethod
     async def game(cls, game_id: custom_types.Game.id) -> GameResponse:
-        async with config.ASYNC_SESSIONMAKER() as session:
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
 
             game = await game_router.GameRouter._get({
                 'id': game_id,
@@ -318,73 +392,88 @@ class PagesRouter(
                 )
             )
 
-            return GameResponse(
-                game=game_schema.GameExport.model_validate(game),
-                teams={team.id: team_schema.TeamExport.model_validate(
-                    team) for team in teams},
-                location=location_schema.LocationExport.model_validate(
-                    location) if location else None,
-                divisions={division.id: division_schema.DivisionExport.model_validate(
-                    division) for division in divisions},
-                team_statistics=await team_service.Team.calculate_statistics(
-                    session,
-                    team_ids=[team.id for team in teams]
-                ),
-                team_ids_ranked_by_division={
-                    division.id: await team_service.Team.rank_by_division(
+            with request_context.span('validate'):
+                return GameResponse(
+                    game=game_schema.GameExport.model_validate(game),
+                    teams={team.id: team_schema.TeamExport.model_validate(
+                        team) for team in teams},
+                    location=location_schema.LocationExport.model_validate(
+                        location) if location else None,
+                    divisions={division.id: division_schema.DivisionExport.model_validate(
+                        division) for division in divisions},
+                    team_statistics=await team_service.Team.calculate_statistics(
                         session,
-                        division.id,
-                        pagination=pagination_schema.Pagination(
-                            limit=1000, offset=0)
-                    ) for division in divisions
-                }
-            )
+                        team_ids=[team.id for team in teams]
+                    ),
+                    team_ids_ranked_by_division=await team_service.Team.rank_by_divisions(
+                        session,
+                        [division.id for division in divisions]
+                    )
+                )
 
     @classmethod
     async def standings(cls) -> StandingsResponse:
-        async with config.ASYNC_SESSIONMAKER() as session:
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
             teams = await team_service.Team.fetch_many(
                 session,
                 pagination=pagination_schema.Pagination(limit=1000, offset=0),
             )
             divisions = await division_service.Division.fetch_many(session, pagination=pagination_schema.Pagination(limit=1000, offset=0))
 
-            return StandingsResponse(
-                teams={team.id: team_schema.TeamExport.model_validate(
-                    team) for team in teams},
-                divisions={division.id: division_schema.DivisionExport.model_validate(
-                    division) for division in divisions},
-                division_ids_ordered=[
-                    division.id for division in divisions
-                ],
-                team_statistics=await team_service.Team.calculate_statistics(
-                    session,
-                    team_ids=[team.id for team in teams]
-                ),
-                team_ids_ranked_by_division={
-                    division.id: await team_service.Team.rank_by_division(
+            with request_context.span('validate'):
+                return StandingsResponse(
+                    teams={team.id: team_schema.TeamExport.model_validate(
+                        team) for team in teams},
+                    divisions={division.id: division_schema.DivisionExport.model_validate(
+                        division) for division in divisions},
+                    division_ids_ordered=[
+                        division.id for division in divisions
+                    ],
+                    team_statistics=await team_service.Team.calculate_statistics(
+                        session,
+                        team_ids=[team.id for team in teams]
+                    ),
+                    team_ids_ranked_by_division=await team_service.Team.rank_by_divisions(
+                        session,
+                        [division.id for division in divisions]
+                    ),
+                    seeding_parameters=[seeding_parameter_schema.SeedingParameterExport.model_validate(seeding_parameter) for seeding_parameter in
+                                        await seeding_parameter_service.SeedingParameter.fetch_many(
                         session,
-                        division.id,
                         pagination=pagination_schema.Pagination(
-                            limit=1000, offset=0)
-                    ) for division in divisions
-                },
-                seeding_parameters=[seeding_parameter_schema.SeedingParameterExport.model_validate(seeding_parameter) for seeding_parameter in
-                                    await seeding_parameter_service.SeedingParameter.fetch_many(
-                    session,
-                    pagination=pagination_schema.Pagination(
-                        limit=1000, offset=0),
-                    query=select(seeding_parameter_service.SeedingParameter._MODEL).order_by(
-                        col(seeding_parameter_service.SeedingParameter._MODEL.rank).asc()
+                            limit=1000, offset=0),
+                        query=select(seeding_parameter_service.SeedingParameter._MODEL).order_by(
+                            col(seeding_parameter_service.SeedingParameter._MODEL.rank).asc()
+                        )
+
                     )
+                    ]
+                )
 
+    @classmethod
+    async def standings_odds(cls) -> StandingsOddsResponse:
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
+            seed_odds = await standings_service.Standings.seed_odds(session)
+
+            with request_context.span('validate'):
+                return StandingsOddsResponse(
+                    simulations=seed_odds['simulations'],
+                    seed_probabilities=seed_odds['seed_probabilities'],
+                )
+
+    @classmethod
+    async def standings_scenarios(cls) -> StandingsScenariosResponse:
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
+            seed_ranges = await standings_service.Standings.seed_ranges(session)
+
+            with request_context.span('validate'):
+                return StandingsScenariosResponse(
+                    seed_ranges=seed_ranges,
                 )
-                ]
-            )
 
     @classmethod
     async def admin(cls) -> AdminResponse:
-        async with config.ASYNC_SESSIONMAKER() as session:
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
 
             games = await game_service.Game.fetch_many(
                 session,
@@ -398,16 +487,17 @@ class PagesRouter(
                 pagination=pagination_schema.Pagination(limit=1000, offset=0),
             )
 
-            return AdminResponse(
-                games={game.id: game_schema.GameExport.model_validate(
-                    game) for game in games},
-                teams={team.id: team_schema.TeamExport.model_validate(
-                    team) for team in teams},
-                locations={location.id: location_schema.LocationExport.model_validate(
-                    location) for location in locations},
-                game_ids_and_rounds=game_service.Game.games_into_game_ids_and_rounds(
-                    games),
-            )
+            with request_context.span('validate'):
+                return AdminResponse(
+                    games={game.id: game_schema.GameExport.model_validate(
+                        game) for game in games},
+                    teams={team.id: team_schema.TeamExport.model_validate(
+                        team) for team in teams},
+                    locations={location.id: location_schema.LocationExport.model_validate(
+                        location) for location in locations},
+                    game_ids_and_rounds=game_service.Game.games_into_game_ids_and_rounds(
+                        games),
+                )
 
     def _set_routes(self):
         self.router.get('/')(self.home)
@@ -415,4 +505,7 @@ class PagesRouter(
         self.router.get('/schedule/')(self.schedule)
         self.router.get('/game/{game_id}/')(self.game)
         self.router.get('/standings/')(self.standings)
+        self.router.get('/standings/odds/')(self.standings_odds)
+        self.router.get(
+            '/standings/scenarios/')(self.standings_scenarios)
         self.router.get('/admin/')(self.admin)
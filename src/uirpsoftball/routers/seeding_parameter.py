@@ -1,4 +1,4 @@
-from fastapi import Depends, status
+from fastapi import Depends, Body, status
 from sqlmodel import select
 from typing import Annotated, cast, Type
 from collections.abc import Sequence
@@ -30,7 +30,11 @@ class SeedingParameterRouter(_Base):
         cls,
         pagination: Annotated[pagination_schema.Pagination, Depends(
             base.get_pagination())],
-    ) -> Sequence[seeding_parameter_schema.SeedingParameterExport]:
+        ids: Annotated[list[custom_types.SeedingParameter.id] | None, Depends(base.get_ids)],
+    ) -> Sequence[seeding_parameter_schema.SeedingParameterExport | base.NotFound]:
+        if ids is not None:
+            return await cls._get_by_ids(ids, seeding_parameter_schema.SeedingParameterExport)
+
         return [seeding_parameter_schema.SeedingParameterExport.model_validate(seeding_parameter) for seeding_parameter in await cls._get_many({
             'pagination': pagination,
         })]
@@ -46,6 +50,51 @@ class SeedingParameterRouter(_Base):
             })
         )
 
+    @classmethod
+    async def by_ids(
+        cls,
+        seeding_parameter_ids: Annotated[Sequence[custom_types.SeedingParameter.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> Sequence[seeding_parameter_schema.SeedingParameterExport | base.NotFound]:
+        return await cls._get_by_ids(seeding_parameter_ids, seeding_parameter_schema.SeedingParameterExport)
+
     def _set_routes(self):
         self.router.get('/')(self.list)
+        self.router.post('/by-ids/')(self.by_ids)
         self.router.get('/{seeding_parameter_id}/')(self.by_id)
+
+
+class SeedingParameterAdminRouter(_Base):
+    _ADMIN = True
+    _QUERY_BUDGETS = base.BULK_QUERY_BUDGETS
+
+    @classmethod
+    async def create_many(
+        cls,
+        seeding_parameters: Annotated[list[seeding_parameter_schema.SeedingParameterAdminCreate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[seeding_parameter_schema.SeedingParameterExport]:
+        return [seeding_parameter_schema.SeedingParameterExport.model_validate(seeding_parameter) for seeding_parameter in await cls._post_many({
+            'create_models': seeding_parameters,
+        })]
+
+    @classmethod
+    async def update_many(
+        cls,
+        seeding_parameters: Annotated[dict[custom_types.SeedingParameter.id, seeding_parameter_schema.SeedingParameterAdminUpdate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[seeding_parameter_schema.SeedingParameterExport]:
+        return [seeding_parameter_schema.SeedingParameterExport.model_validate(seeding_parameter) for seeding_parameter in await cls._patch_many({
+            'update_models': seeding_parameters,
+        })]
+
+    @classmethod
+    async def delete_many(
+        cls,
+        seeding_parameter_ids: Annotated[list[custom_types.SeedingParameter.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> None:
+        await cls._delete_many({
+            'ids': seeding_parameter_ids,
+        })
+
+    def _set_routes(self):
+        self.router.post('/bulk/')(self.create_many)
+        self.router.patch('/bulk/')(self.update_many)
+        self.router.delete('/bulk/')(self.delete_many)
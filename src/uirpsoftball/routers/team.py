@@ -1,4 +1,4 @@
-from fastapi import Depends, status
+from fastapi import Depends, Body, status
 from sqlmodel import select
 from typing import Annotated, cast, Type
 from collections.abc import Sequence
@@ -10,6 +10,10 @@ from uirpsoftball.services.team import Team as TeamService
 from uirpsoftball.schemas import team as team_schema, pagination as pagination_schema, order_by as order_by_schema
 
 
+def get_filters(division_id: custom_types.Team.division_id | None = None) -> team_schema.TeamFilters:
+    return team_schema.TeamFilters(division_id=division_id)
+
+
 class _Base(base.ServiceRouter[
     TeamTable,
     custom_types.Team.id,
@@ -30,9 +34,15 @@ class TeamRouter(_Base):
         cls,
         pagination: Annotated[pagination_schema.Pagination, Depends(
             base.get_pagination())],
-    ) -> Sequence[team_schema.TeamExport]:
+        filters: Annotated[team_schema.TeamFilters, Depends(get_filters)],
+        ids: Annotated[list[custom_types.Team.id] | None, Depends(base.get_ids)],
+    ) -> Sequence[team_schema.TeamExport | base.NotFound]:
+        if ids is not None:
+            return await cls._get_by_ids(ids, team_schema.TeamExport)
+
         return [team_schema.TeamExport.model_validate(team) for team in await cls._get_many({
             'pagination': pagination,
+            'query': select(TeamTable).where(*cls._SERVICE.build_filters(filters)),
         })]
 
     @classmethod
@@ -46,6 +56,51 @@ class TeamRouter(_Base):
             })
         )
 
+    @classmethod
+    async def by_ids(
+        cls,
+        team_ids: Annotated[Sequence[custom_types.Team.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> Sequence[team_schema.TeamExport | base.NotFound]:
+        return await cls._get_by_ids(team_ids, team_schema.TeamExport)
+
     def _set_routes(self):
         self.router.get('/')(self.list)
+        self.router.post('/by-ids/')(self.by_ids)
         self.router.get('/{team_id}/')(self.by_id)
+
+
+class TeamAdminRouter(_Base):
+    _ADMIN = True
+    _QUERY_BUDGETS = base.BULK_QUERY_BUDGETS
+
+    @classmethod
+    async def create_many(
+        cls,
+        teams: Annotated[list[team_schema.TeamAdminCreate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[team_schema.TeamExport]:
+        return [team_schema.TeamExport.model_validate(team) for team in await cls._post_many({
+            'create_models': teams,
+        })]
+
+    @classmethod
+    async def update_many(
+        cls,
+        teams: Annotated[dict[custom_types.Team.id, team_schema.TeamAdminUpdate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[team_schema.TeamExport]:
+        return [team_schema.TeamExport.model_validate(team) for team in await cls._patch_many({
+            'update_models': teams,
+        })]
+
+    @classmethod
+    async def delete_many(
+        cls,
+        team_ids: Annotated[list[custom_types.Team.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> None:
+        await cls._delete_many({
+            'ids': team_ids,
+        })
+
+    def _set_routes(self):
+        self.router.post('/bulk/')(self.create_many)
+        self.router.patch('/bulk/')(self.update_many)
+        self.router.delete('/bulk/')(self.delete_many)
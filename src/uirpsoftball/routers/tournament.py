@@ -1,4 +1,4 @@
-from fastapi import Depends, status
+from fastapi import Depends, Body, status
 from sqlmodel import select
 from typing import Annotated, cast, Type
 from collections.abc import Sequence
@@ -30,7 +30,11 @@ class TournamentRouter(_Base):
         cls,
         pagination: Annotated[pagination_schema.Pagination, Depends(
             base.get_pagination())],
-    ) -> Sequence[tournament_schema.TournamentExport]:
+        ids: Annotated[list[custom_types.Tournament.id] | None, Depends(base.get_ids)],
+    ) -> Sequence[tournament_schema.TournamentExport | base.NotFound]:
+        if ids is not None:
+            return await cls._get_by_ids(ids, tournament_schema.TournamentExport)
+
         return [tournament_schema.TournamentExport.model_validate(tournament) for tournament in await cls._get_many({
             'pagination': pagination,
         })]
@@ -46,6 +50,51 @@ class TournamentRouter(_Base):
             })
         )
 
+    @classmethod
+    async def by_ids(
+        cls,
+        tournament_ids: Annotated[Sequence[custom_types.Tournament.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> Sequence[tournament_schema.TournamentExport | base.NotFound]:
+        return await cls._get_by_ids(tournament_ids, tournament_schema.TournamentExport)
+
     def _set_routes(self):
         self.router.get('/')(self.list)
+        self.router.post('/by-ids/')(self.by_ids)
         self.router.get('/{tournament_id}/')(self.by_id)
+
+
+class TournamentAdminRouter(_Base):
+    _ADMIN = True
+    _QUERY_BUDGETS = base.BULK_QUERY_BUDGETS
+
+    @classmethod
+    async def create_many(
+        cls,
+        tournaments: Annotated[list[tournament_schema.TournamentAdminCreate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[tournament_schema.TournamentExport]:
+        return [tournament_schema.TournamentExport.model_validate(tournament) for tournament in await cls._post_many({
+            'create_models': tournaments,
+        })]
+
+    @classmethod
+    async def update_many(
+        cls,
+        tournaments: Annotated[dict[custom_types.Tournament.id, tournament_schema.TournamentAdminUpdate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[tournament_schema.TournamentExport]:
+        return [tournament_schema.TournamentExport.model_validate(tournament) for tournament in await cls._patch_many({
+            'update_models': tournaments,
+        })]
+
+    @classmethod
+    async def delete_many(
+        cls,
+        tournament_ids: Annotated[list[custom_types.Tournament.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> None:
+        await cls._delete_many({
+            'ids': tournament_ids,
+        })
+
+    def _set_routes(self):
+        self.router.post('/bulk/')(self.create_many)
+        self.router.patch('/bulk/')(self.update_many)
+        self.router.delete('/bulk/')(self.delete_many)
@@ -1,4 +1,4 @@
-from fastapi import Depends, status
+from fastapi import Depends, Body, status
 from sqlmodel import select
 from typing import Annotated, cast, Type
 from collections.abc import Sequence
@@ -30,7 +30,11 @@ class TournamentGameRouter(_Base):
         cls,
         pagination: Annotated[pagination_schema.Pagination, Depends(
             base.get_pagination())],
-    ) -> Sequence[tournament_game_schema.TournamentGameExport]:
+        ids: Annotated[list[custom_types.Game.id] | None, Depends(base.get_ids)],
+    ) -> Sequence[tournament_game_schema.TournamentGameExport | base.NotFound]:
+        if ids is not None:
+            return await cls._get_by_ids(ids, tournament_game_schema.TournamentGameExport)
+
         return [tournament_game_schema.TournamentGameExport.model_validate(tournament_game) for tournament_game in await cls._get_many({
             'pagination': pagination,
         })]
@@ -46,6 +50,51 @@ class TournamentGameRouter(_Base):
             })
         )
 
+    @classmethod
+    async def by_ids(
+        cls,
+        tournament_game_ids: Annotated[Sequence[custom_types.Game.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> Sequence[tournament_game_schema.TournamentGameExport | base.NotFound]:
+        return await cls._get_by_ids(tournament_game_ids, tournament_game_schema.TournamentGameExport)
+
     def _set_routes(self):
         self.router.get('/')(self.list)
+        self.router.post('/by-ids/')(self.by_ids)
         self.router.get('/{tournament_game_id}/')(self.by_id)
+
+
+class TournamentGameAdminRouter(_Base):
+    _ADMIN = True
+    _QUERY_BUDGETS = base.BULK_QUERY_BUDGETS
+
+    @classmethod
+    async def create_many(
+        cls,
+        tournament_games: Annotated[list[tournament_game_schema.TournamentGameAdminCreate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[tournament_game_schema.TournamentGameExport]:
+        return [tournament_game_schema.TournamentGameExport.model_validate(tournament_game) for tournament_game in await cls._post_many({
+            'create_models': tournament_games,
+        })]
+
+    @classmethod
+    async def update_many(
+        cls,
+        tournament_games: Annotated[dict[custom_types.Game.id, tournament_game_schema.TournamentGameAdminUpdate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[tournament_game_schema.TournamentGameExport]:
+        return [tournament_game_schema.TournamentGameExport.model_validate(tournament_game) for tournament_game in await cls._patch_many({
+            'update_models': tournament_games,
+        })]
+
+    @classmethod
+    async def delete_many(
+        cls,
+        tournament_game_ids: Annotated[list[custom_types.Game.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> None:
+        await cls._delete_many({
+            'ids': tournament_game_ids,
+        })
+
+    def _set_routes(self):
+        self.router.post('/bulk/')(self.create_many)
+        self.router.patch('/bulk/')(self.update_many)
+        self.router.delete('/bulk/')(self.delete_many)
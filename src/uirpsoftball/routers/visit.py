@@ -1,7 +1,8 @@
-from fastapi import Depends, status
+from fastapi import Depends, Body, Query, status
 from sqlmodel import select
 from typing import Annotated, cast, Type
 from collections.abc import Sequence
+import datetime as datetime_module
 
 from uirpsoftball import config, custom_types
 from uirpsoftball.routers import base
@@ -10,6 +11,18 @@ from uirpsoftball.services.visit import Visit as VisitService
 from uirpsoftball.schemas import visit as visit_schema, pagination as pagination_schema, order_by as order_by_schema
 
 
+def get_filters(
+    path: custom_types.Visit.path | None = None,
+    datetime_from: datetime_module.datetime | None = Query(
+        None, alias='from', description='Only visits at or after this time, with a UTC offset'),
+    datetime_to: datetime_module.datetime | None = Query(
+        None, alias='to', description='Only visits before this time, with a UTC offset'),
+) -> visit_schema.VisitFilters:
+
+    base.check_time_window(datetime_from, datetime_to)
+    return visit_schema.VisitFilters(path=path, datetime_from=datetime_from, datetime_to=datetime_to)
+
+
 class _Base(base.ServiceRouter[
     VisitTable,
     custom_types.Visit.id,
@@ -30,9 +43,15 @@ class VisitRouter(_Base):
         cls,
         pagination: Annotated[pagination_schema.Pagination, Depends(
             base.get_pagination())],
-    ) -> Sequence[visit_schema.VisitExport]:
+        filters: Annotated[visit_schema.VisitFilters, Depends(get_filters)],
+        ids: Annotated[list[custom_types.Visit.id] | None, Depends(base.get_ids)],
+    ) -> Sequence[visit_schema.VisitExport | base.NotFound]:
+        if ids is not None:
+            return await cls._get_by_ids(ids, visit_schema.VisitExport)
+
         return [visit_schema.VisitExport.model_validate(visit) for visit in await cls._get_many({
             'pagination': pagination,
+            'query': select(VisitTable).where(*cls._SERVICE.build_filters(filters)),
         })]
 
     @classmethod
@@ -46,6 +65,51 @@ class VisitRouter(_Base):
             })
         )
 
+    @classmethod
+    async def by_ids(
+        cls,
+        visit_ids: Annotated[Sequence[custom_types.Visit.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> Sequence[visit_schema.VisitExport | base.NotFound]:
+        return await cls._get_by_ids(visit_ids, visit_schema.VisitExport)
+
     def _set_routes(self):
         self.router.get('/')(self.list)
+        self.router.post('/by-ids/')(self.by_ids)
         self.router.get('/{visit_id}/')(self.by_id)
+
+
+class VisitAdminRouter(_Base):
+    _ADMIN = True
+    _QUERY_BUDGETS = base.BULK_QUERY_BUDGETS
+
+    @classmethod
+    async def create_many(
+        cls,
+        visits: Annotated[list[visit_schema.VisitAdminCreate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[visit_schema.VisitExport]:
+        return [visit_schema.VisitExport.model_validate(visit) for visit in await cls._post_many({
+            'create_models': visits,
+        })]
+
+    @classmethod
+    async def update_many(
+        cls,
+        visits: Annotated[dict[custom_types.Visit.id, visit_schema.VisitAdminUpdate], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> list[visit_schema.VisitExport]:
+        return [visit_schema.VisitExport.model_validate(visit) for visit in await cls._patch_many({
+            'update_models': visits,
+        })]
+
+    @classmethod
+    async def delete_many(
+        cls,
+        visit_ids: Annotated[list[custom_types.Visit.id], Body(max_length=base.MAX_BATCH_SIZE)],
+    ) -> None:
+        await cls._delete_many({
+            'ids': visit_ids,
+        })
+
+    def _set_routes(self):
+        self.router.post('/bulk/')(self.create_many)
+        self.router.patch('/bulk/')(self.update_many)
+        self.router.delete('/bulk/')(self.delete_many)
@@ -0,0 +1,294 @@
+from typing import TypedDict
+from collections.abc import Sequence
+import datetime as datetime_module
+import collections
+import itertools
+import random
+
+from uirpsoftball import custom_types
+
+"""
+Developer's Note:
+Builds a regular season: round robin matchups within each division, home and away, officiating teams, locations and
+time slots. Pure computation on ids, Game.generate_schedule reads the teams and locations and writes the games.
+
+Matchups come from the circle method on a shuffled order of each division's teams, repeated when there are more rounds
+than opponents; odd divisions give one team a bye per round. Everything after that is greedy, one round at a time:
+- home goes to the team with the fewer home games so far (net of away games); a team still two or more games from even
+  at the end gets home and away reversed along a chain of games, which leaves every team at most one game from even
+- the games of a round fill time slots location by location, the games whose teams played the latest slots so far go
+  first, and within a slot each game takes the location its teams have played at the least
+- a team officiates at most once per round and never in a slot it plays in. Preferred are teams playing right before or
+  after the game at the same location, then teams with a bye, then any team of the round, each time the team that has
+  officiated the least
+Every location hosts one game per slot and every team plays once per round, so nothing is double booked by
+construction; the fairness report still counts double bookings as a check.
+"""
+
+Matchup = tuple[custom_types.Team.id, custom_types.Team.id]
+
+
+class ScheduledGame(TypedDict):
+    round_id: custom_types.Game.round_id
+    home_team_id: custom_types.Team.id
+    away_team_id: custom_types.Team.id
+    officiating_team_id: custom_types.Team.id | None
+    location_id: custom_types.Location.id
+    datetime: datetime_module.datetime
+
+
+class TeamFairness(TypedDict):
+    games: int
+    home: int
+    away: int
+    officiating: int
+    byes: int
+    mean_slot: float
+
+
+class Fairness(TypedDict):
+    teams: dict[custom_types.Team.id, TeamFairness]
+    max_home_away_difference: int
+    officiating_spread: int
+    mean_slot_spread: float
+    max_games_at_one_location: int
+    repeated_matchups: int
+    unofficiated_games: int
+    double_bookings: int
+
+
+class Schedule(TypedDict):
+    games: list[ScheduledGame]
+    fairness: Fairness
+
+
+def round_robin(team_ids: Sequence[custom_types.Team.id], rounds: int) -> list[tuple[list[Matchup], list[custom_types.Team.id]]]:
+    """matchups and teams with a bye of each round, the circle method repeated as often as needed"""
+
+    circle: list[custom_types.Team.id | None] = list(team_ids)
+    if len(circle) % 2 == 1:
+        circle.append(None)
+
+    rounds_matchups: list[tuple[list[Matchup], list[custom_types.Team.id]]] = []
+    for _ in range(rounds):
+        matchups: list[Matchup] = []
+        byes: list[custom_types.Team.id] = []
+        for i in range(len(circle) // 2):
+            team_id, opponent_id = circle[i], circle[len(circle) - 1 - i]
+            if team_id is None or opponent_id is None:
+                byes.extend(id for id in (team_id, opponent_id)
+                            if id is not None)
+            else:
+                matchups.append((team_id, opponent_id))
+        rounds_matchups.append((matchups, byes))
+        if len(circle) > 2:
+            circle = [circle[0], circle[-1]] + circle[1:-1]
+
+    return rounds_matchups
+
+
+def fairness(games: Sequence[ScheduledGame], team_ids: Sequence[custom_types.Team.id], rounds: int, slot_index_by_game: Sequence[int], division_sizes: dict[custom_types.Team.id, int]) -> Fairness:
+
+    teams: dict[custom_types.Team.id, TeamFairness] = {team_id: {
+        'games': 0, 'home': 0, 'away': 0, 'officiating': 0, 'byes': 0, 'mean_slot': 0.0} for team_id in team_ids}
+    slot_sums = {team_id: 0 for team_id in team_ids}
+    games_at_location: dict[tuple[custom_types.Team.id,
+                                  custom_types.Location.id], int] = {}
+    matchups: dict[frozenset[custom_types.Team.id], int] = {}
+    bookings: dict[tuple[custom_types.Team.id, datetime_module.datetime], int] = {}
+    location_bookings: dict[tuple[custom_types.Location.id,
+                                  datetime_module.datetime], int] = {}
+    unofficiated_games = 0
+
+    for game, slot_index in zip(games, slot_index_by_game):
+        teams[game['home_team_id']]['home'] += 1
+        teams[game['away_team_id']]['away'] += 1
+        for team_id in (game['home_team_id'], game['away_team_id']):
+            teams[team_id]['games'] += 1
+            slot_sums[team_id] += slot_index
+            key = (team_id, game['location_id'])
+            games_at_location[key] = games_at_location.get(key, 0) + 1
+        pair = frozenset((game['home_team_id'], game['away_team_id']))
+        matchups[pair] = matchups.get(pair, 0) + 1
+
+        if game['officiating_team_id'] is None:
+            unofficiated_games += 1
+        else:
+            teams[game['officiating_team_id']]['officiating'] += 1
+
+        for team_id in (game['home_team_id'], game['away_team_id'], game['officiating_team_id']):
+            if team_id is not None:
+                key = (team_id, game['datetime'])
+                bookings[key] = bookings.get(key, 0) + 1
+        location_key = (game['location_id'], game['datetime'])
+        location_bookings[location_key] = location_bookings.get(
+            location_key, 0) + 1
+
+    for team_id, team in teams.items():
+        team['byes'] = rounds - team['games']
+        team['mean_slot'] = slot_sums[team_id] / \
+            team['games'] if team['games'] > 0 else 0.0
+
+    # a pair meets once per full cycle of its division, more is a repeat
+    repeated_matchups = 0
+    for pair, count in matchups.items():
+        opponents = max(division_sizes[next(iter(pair))] - 1, 1)
+        allowed = -(-rounds // opponents)
+        repeated_matchups += max(count - allowed, 0)
+
+    playing = [team for team in teams.values() if team['games'] > 0]
+    return {
+        'teams': teams,
+        'max_home_away_difference': max((abs(team['home'] - team['away']) for team in teams.values()), default=0),
+        'officiating_spread': max((team['officiating'] for team in teams.values()), default=0) - min((team['officiating'] for team in teams.values()), default=0),
+        'mean_slot_spread': max((team['mean_slot'] for team in playing), default=0.0) - min((team['mean_slot'] for team in playing), default=0.0),
+        'max_games_at_one_location': max(games_at_location.values(), default=0),
+        'repeated_matchups': repeated_matchups,
+        'unofficiated_games': unofficiated_games,
+        'double_bookings': sum(count - 1 for count in itertools.chain(bookings.values(), location_bookings.values()) if count > 1),
+    }
+
+
+def schedule(team_ids_by_division: dict[custom_types.Division.id, Sequence[custom_types.Team.id]], round_starts: Sequence[datetime_module.datetime], location_ids: Sequence[custom_types.Location.id], slot_interval: datetime_module.timedelta, first_round_id: custom_types.Game.round_id = 1, seed: int | None = None) -> Schedule:
+    """schedules len(`round_starts`) rounds, the games of a round start at its start, one slot every `slot_interval`"""
+
+    if len(location_ids) == 0:
+        raise ValueError('At least one location is needed to schedule games')
+
+    rng = random.Random(seed)
+    rounds = len(round_starts)
+
+    division_sizes: dict[custom_types.Team.id, int] = {}
+    division_rounds: list[list[tuple[list[Matchup], list[custom_types.Team.id]]]] = []
+    for division_id in sorted(team_ids_by_division):
+        division_team_ids = list(team_ids_by_division[division_id])
+        for team_id in division_team_ids:
+            division_sizes[team_id] = len(division_team_ids)
+        rng.shuffle(division_team_ids)
+        division_rounds.append(round_robin(division_team_ids, rounds))
+
+    team_ids = sorted(division_sizes)
+    home_minus_away = {team_id: 0 for team_id in team_ids}
+    slot_sums = {team_id: 0 for team_id in team_ids}
+    officiating = {team_id: 0 for team_id in team_ids}
+    games_at_location = {(team_id, location_id): 0
+                         for team_id in team_ids for location_id in location_ids}
+
+    games: list[ScheduledGame] = []
+    slot_index_by_game: list[int] = []
+
+    for round_index in range(rounds):
+
+        matchups: list[Matchup] = []
+        byes: list[custom_types.Team.id] = []
+        for rounds_matchups in division_rounds:
+            round_matchups, round_byes = rounds_matchups[round_index]
+            matchups.extend(round_matchups)
+            byes.extend(round_byes)
+        if len(matchups) == 0:
+            continue
+
+        # home and away
+        for i, (team_id, opponent_id) in enumerate(matchups):
+            if (home_minus_away[team_id], rng.random()) > (home_minus_away[opponent_id], rng.random()):
+                team_id, opponent_id = opponent_id, team_id
+            matchups[i] = (team_id, opponent_id)
+            home_minus_away[team_id] += 1
+            home_minus_away[opponent_id] -= 1
+
+        # time slots, latest so far first, then locations
+        tie_breakers = [rng.random() for _ in matchups]
+        order = sorted(range(len(matchups)), key=lambda i: (
+            -(slot_sums[matchups[i][0]] + slot_sums[matchups[i][1]]), tie_breakers[i]))
+
+        slots: list[dict[custom_types.Location.id, Matchup]] = []
+        for start in range(0, len(order), len(location_ids)):
+            slot: dict[custom_types.Location.id, Matchup] = {}
+            open_location_ids = list(location_ids)
+            for i in order[start:start + len(location_ids)]:
+                home_team_id, away_team_id = matchups[i]
+                location_id = min(open_location_ids, key=lambda location_id: (
+                    games_at_location[(home_team_id, location_id)] + games_at_location[(away_team_id, location_id)], rng.random()))
+                open_location_ids.remove(location_id)
+                slot[location_id] = matchups[i]
+                for team_id in matchups[i]:
+                    slot_sums[team_id] += len(slots)
+                    games_at_location[(team_id, location_id)] += 1
+            slots.append(slot)
+
+        # officiating, teams next to the game at its location, then teams with a bye, then anyone of the round
+        slot_index_by_team_id = {team_id: slot_index for slot_index, slot in enumerate(slots)
+                                 for matchup in slot.values() for team_id in matchup}
+        officiating_this_round: set[custom_types.Team.id] = set()
+
+        for slot_index, slot in enumerate(slots):
+            for location_id, (home_team_id, away_team_id) in slot.items():
+
+                candidates: list[tuple[int, custom_types.Team.id]] = []
+                for neighbour_index in (slot_index - 1, slot_index + 1):
+                    if 0 <= neighbour_index < len(slots) and location_id in slots[neighbour_index]:
+                        candidates.extend((0, team_id)
+                                          for team_id in slots[neighbour_index][location_id])
+                candidates.extend((1, team_id) for team_id in byes)
+                candidates.extend((2, team_id) for team_id, team_slot_index in slot_index_by_team_id.items()
+                                  if team_slot_index != slot_index)
+
+                candidates = [(tier, team_id) for tier, team_id in candidates
+                              if team_id not in officiating_this_round]
+                officiating_team_id = None
+                if len(candidates) > 0:
+                    _, officiating_team_id = min(candidates, key=lambda candidate: (
+                        candidate[0], officiating[candidate[1]], rng.random()))
+                    officiating_this_round.add(officiating_team_id)
+                    officiating[officiating_team_id] += 1
+
+                games.append({
+                    'round_id': first_round_id + round_index,
+                    'home_team_id': home_team_id,
+                    'away_team_id': away_team_id,
+                    'officiating_team_id': officiating_team_id,
+                    'location_id': location_id,
+                    'datetime': round_starts[round_index] + slot_index * slot_interval,
+                })
+                slot_index_by_game.append(slot_index)
+
+    # the greedy choice can leave a team two or more games from even. Among the teams it hosted, the teams those hosted
+    # and so on, one is short of home games; reversing home and away along the chain of games to it evens out both ends
+    # and leaves every team in between as it was, so every team ends up at most one game from even
+    games_by_team_id: dict[custom_types.Team.id, list[ScheduledGame]] = {
+        team_id: [] for team_id in team_ids}
+    for game in games:
+        games_by_team_id[game['home_team_id']].append(game)
+        games_by_team_id[game['away_team_id']].append(game)
+
+    for team_id in team_ids:
+        while abs(home_minus_away[team_id]) > 1:
+            # follow home to away for a team with too many home games, away to home for one with too many away games
+            direction = 1 if home_minus_away[team_id] > 0 else -1
+            # the game each reached team was reached through
+            game_by_reached_team_id: dict[custom_types.Team.id,
+                                          ScheduledGame] = {}
+            queue = collections.deque([team_id])
+            end_team_id = team_id
+            while len(queue) > 0:
+                end_team_id = queue.popleft()
+                if direction * home_minus_away[end_team_id] < 0:
+                    break
+                for game in games_by_team_id[end_team_id]:
+                    from_team_id, to_team_id = (game['home_team_id'], game['away_team_id'])[::direction]
+                    if from_team_id == end_team_id and to_team_id != team_id and to_team_id not in game_by_reached_team_id:
+                        game_by_reached_team_id[to_team_id] = game
+                        queue.append(to_team_id)
+
+            reached_team_id = end_team_id
+            while reached_team_id != team_id:
+                game = game_by_reached_team_id[reached_team_id]
+                game['home_team_id'], game['away_team_id'] = game['away_team_id'], game['home_team_id']
+                reached_team_id = game['home_team_id'] if game['away_team_id'] == reached_team_id else game['away_team_id']
+            home_minus_away[team_id] -= 2 * direction
+            home_minus_away[end_team_id] += 2 * direction
+
+    return {
+        'games': games,
+        'fairness': fairness(games, team_ids, rounds, slot_index_by_game, division_sizes),
+    }
@@ -62,3 +62,12 @@ class GameCreate(BaseModel):
 
 class GameAdminCreate(GameCreate):
     pass
+
+
+class GameFilters(BaseModel):
+    team_id: custom_types.Team.id | None = None
+    round_ids: list[custom_types.Game.round_id] | None = None
+    location_id: custom_types.Game.location_id | None = None
+    datetime_from: custom_types.Game.datetime | None = None
+    datetime_to: custom_types.Game.datetime | None = None
+    scored: bool | None = None
@@ -38,3 +38,7 @@ class TeamCreate(BaseModel):
 
 class TeamAdminCreate(TeamCreate):
     pass
+
+
+class TeamFilters(BaseModel):
+    division_id: custom_types.Team.division_id | None = None
@@ -24,3 +24,9 @@ class VisitCreate(BaseModel):
 
 class VisitAdminCreate(VisitCreate):
     pass
+
+
+class VisitFilters(BaseModel):
+    path: custom_types.Visit.path | None = None
+    datetime_from: custom_types.Visit.datetime | None = None
+    datetime_to: custom_types.Visit.datetime | None = None
@@ -0,0 +1,88 @@
+from fastapi.routing import APIRoute
+from functools import wraps
+import asyncio
+import time
+from uirpsoftball import request_context
+
+"""
+Developer's Note:
+Reports where a request spent its time in a Server-Timing header, which browser devtools show next to the request.
+
+    sql        executing statements
+    orm        turning rows into models
+    validate   model_validate into the export schemas
+    stats      team statistics
+    seeding    ranking teams by the seeding parameters
+    encode     FastAPI validating and serializing the returned response
+    total      the whole request
+
+The stages come from request_context.span, "encode" is the time between the route handler returning and the response
+starting, which TimedAPIRoute marks.
+"""
+
+
+class TimedAPIRoute(APIRoute):
+    """an APIRoute that records when its handler returned, routers keep their route class when included in the app"""
+
+    def __init__(self, path, endpoint, **kwargs):
+
+        # the endpoint is wrapped before FastAPI sees it, so only the public constructor is relied on; FastAPI reads the
+        # signature and the name through functools.wraps
+        if asyncio.iscoroutinefunction(endpoint):
+            call = endpoint
+
+            @wraps(call)
+            async def timed_call(*args, **kwargs):
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    current_request_context = request_context.current()
+                    if current_request_context is not None:
+                        current_request_context.endpoint_end = time.perf_counter()
+
+            endpoint = timed_call
+
+        super().__init__(path, endpoint, **kwargs)
+
+
+def header_value(current_request_context: request_context.RequestContext, total: float, response_start: float) -> str:
+
+    durations: dict[str, float] = {'sql': current_request_context.query_duration}
+    durations.update(current_request_context.timings)
+    if current_request_context.endpoint_end is not None:
+        durations['encode'] = response_start - \
+            current_request_context.endpoint_end
+    durations['total'] = total
+
+    return ', '.join('{};dur={:.2f}'.format(name, duration * 1000) for name, duration in durations.items())
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding the Server-Timing header, add it inside of request_context.RequestContextMiddleware with track_timing"""
+
+    def __init__(self, app, allow_origin: str = '*'):
+        self.app = app
+        self.allow_origin = allow_origin
+
+    async def __call__(self, scope, receive, send):
+
+        current_request_context = request_context.current()
+        if scope['type'] != 'http' or current_request_context is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                response_start = time.perf_counter()
+                message = dict(message)
+                message['headers'] = list(message.get('headers', [])) + [
+                    (b'server-timing', header_value(current_request_context,
+                                                    response_start - start, response_start).encode('latin-1')),
+                    # without it, browsers hide the timings of cross origin requests
+                    (b'timing-allow-origin', self.allow_origin.encode('latin-1')),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,12 +1,14 @@
-from sqlmodel import SQLModel, select
+from sqlmodel import SQLModel, select, col, insert, delete
+from sqlalchemy import ColumnElement, Row, or_
 from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm.attributes import flag_modified
 from sqlmodel.sql.expression import SelectOfScalar
 from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Any, Protocol, Unpack, TypeVar, TypedDict, Generic, NotRequired, Literal, Self, ClassVar, Type, Optional
 from pydantic import BaseModel
-from collections.abc import Sequence
+from collections.abc import Sequence, Collection, Mapping
 
-from uirpsoftball import custom_types, models
+from uirpsoftball import custom_types, models, cache, request_context
 from uirpsoftball.schemas.pagination import Pagination
 from uirpsoftball.schemas.order_by import OrderBy
 
@@ -22,6 +24,8 @@ TUpdateModel_co = TypeVar('TUpdateModel_co', bound=BaseModel, covariant=True)
 
 TOrderBy_co = TypeVar('TOrderBy_co', bound=str, covariant=True)
 
+TSelect = TypeVar('TSelect', bound=Any)
+
 
 class CRUDParamsBase(TypedDict):
     session: AsyncSession
@@ -53,6 +57,10 @@ class ReadManyParams(Generic[models.TModel, TOrderBy_co], CRUDParamsBase, ReadMa
     pass
 
 
+class ReadByIdsParams(Generic[custom_types.TId], CRUDParamsBase):
+    ids: Collection[custom_types.TId]
+
+
 class UpdateParams(Generic[custom_types.TId, TUpdateModel_contra], CRUDParamsBase, WithId[custom_types.TId]):
     update_model: TUpdateModel_contra
 
@@ -61,8 +69,28 @@ class DeleteParams(Generic[custom_types.TId], CRUDParamsBase, WithId[custom_type
     pass
 
 
+class CreateManyParams(Generic[TCreateModel_contra], CRUDParamsBase):
+    create_models: Sequence[TCreateModel_contra]
+
+
+class UpdateManyParams(Generic[custom_types.TId, TUpdateModel_contra], CRUDParamsBase):
+    update_models: Mapping[custom_types.TId, TUpdateModel_contra]
+
+
+class DeleteManyParams(Generic[custom_types.TId], CRUDParamsBase):
+    ids: Collection[custom_types.TId]
+
+
 CheckAuthorizationExistingOperation = Literal['read', 'update', 'delete']
 
+FilterOperator = Literal['eq', 'in', 'ge', 'lt', 'not_null']
+
+
+class Filter(TypedDict):
+    # matched when any of the columns matches
+    columns: list[str]
+    operator: FilterOperator
+
 
 class CheckAuthorizationExistingParams(Generic[models.TModel_contra, custom_types.TId], CRUDParamsBase, WithId[custom_types.TId], WithModelInst[models.TModel_contra]):
     operation: CheckAuthorizationExistingOperation
@@ -110,11 +138,18 @@ class HasBuildSelectById(Protocol[models.TModel, custom_types.TId_contra]):
         ...
 
 
+class HasIdColumn(Protocol):
+    @classmethod
+    def _id_column(cls) -> InstrumentedAttribute:
+        ...
+
+
 class SimpleIdModelService(
     Generic[models.TSimpleModel, custom_types.TSimpleId],
     HasModel[models.TSimpleModel],
     HasModelId[models.TSimpleModel, custom_types.TSimpleId],
     HasBuildSelectById[models.TSimpleModel, custom_types.TSimpleId],
+    HasIdColumn,
 ):
 
     _MODEL: Type[models.TSimpleModel]
@@ -127,6 +162,10 @@ class SimpleIdModelService(
     def _build_select_by_id(cls, id: custom_types.TSimpleId) -> SelectOfScalar[models.TSimpleModel]:
         return select(cls._MODEL).where(cls._MODEL.id == id)
 
+    @classmethod
+    def _id_column(cls) -> InstrumentedAttribute:
+        return cls._MODEL.id  # type: ignore
+
 
 class ServiceError(Exception):
     error_message: str
@@ -174,23 +213,61 @@ class Service(
     HasModelInstFromCreateModel[models.TModel, TCreateModel],
     HasModelId[models.TModel, custom_types.TId],
     HasBuildSelectById[models.TModel, custom_types.TId],
+    HasIdColumn,
 
 ):
 
+    # the filters of the list endpoint by field of its filter schema, only on indexed columns (see check_filters_indexed)
+    _FILTERS: ClassVar[dict[str, Filter]] = {}
+
     @classmethod
     async def fetch_one(cls, session: AsyncSession, query: SelectOfScalar[models.TModel]) -> models.TModel | None:
-        return (await session.exec(query)).one_or_none()
+        with request_context.span('orm'):
+            return (await session.exec(query)).one_or_none()
+
+    @staticmethod
+    def paginate(query: TSelect, pagination: Pagination | None) -> TSelect:
+        """applies `pagination`, None reads every row: for internal reads that must not be cut short, like reseeding"""
+
+        if pagination is None:
+            return query
+        return query.offset(pagination.offset).limit(pagination.limit)
 
     @classmethod
-    async def fetch_many(cls, session: AsyncSession, pagination: Pagination, order_bys: list[OrderBy[TOrderBy_co]] = [], query: SelectOfScalar[models.TModel] | None = None) -> Sequence[models.TModel]:
+    async def fetch_many(cls, session: AsyncSession, pagination: Pagination | None, order_bys: list[OrderBy[TOrderBy_co]] = [], query: SelectOfScalar[models.TModel] | None = None) -> Sequence[models.TModel]:
 
         if query is None:
             query = select(cls._MODEL)
 
         query = cls.build_order_by(query, order_bys)
-        query = query.offset(pagination.offset).limit(pagination.limit)
+        query = cls.paginate(query, pagination)
 
-        return (await session.exec(query)).all()
+        with request_context.span('orm'):
+            return (await session.exec(query)).all()
+
+    @classmethod
+    async def fetch_many_columns(cls, session: AsyncSession, columns: Sequence[Any], pagination: Pagination | None, where: Sequence[ColumnElement[bool]] = [], order_by: Sequence[Any] = []) -> Sequence[Row]:
+        """`fetch_many` reading only `columns`, as plain rows: no instance is built or added to the session"""
+
+        query = select(*columns).where(*where).order_by(*order_by)
+        query = cls.paginate(query, pagination)
+
+        with request_context.span('orm'):
+            return (await session.exec(query)).all()
+
+    @classmethod
+    async def fetch_many_scalars(cls, session: AsyncSession, column: Any, pagination: Pagination | None, where: Sequence[ColumnElement[bool]] = [], order_by: Sequence[Any] = []) -> Sequence[Any]:
+        """`fetch_many_columns` of a single column, as a list of its values"""
+
+        query = select(column).where(*where).order_by(*order_by)
+        query = cls.paginate(query, pagination)
+
+        with request_context.span('orm'):
+            return (await session.exec(query)).all()
+
+    @classmethod
+    async def fetch_many_ids(cls, session: AsyncSession, pagination: Pagination | None, where: Sequence[ColumnElement[bool]] = [], order_by: Sequence[Any] = []) -> Sequence[custom_types.TId]:
+        return await cls.fetch_many_scalars(session, cls._id_column(), pagination, where=where, order_by=order_by)
 
     @classmethod
     async def fetch_by_id(cls, session: AsyncSession, id: custom_types.TId) -> models.TModel | None:
@@ -204,6 +281,68 @@ class Service(
             raise NotFoundError(cls._MODEL, id)
         return inst
 
+    @classmethod
+    async def fetch_by_ids(cls, session: AsyncSession, ids: Collection[custom_types.TId], populate_existing: bool = False) -> dict[custom_types.TId, models.TModel]:
+        """one SELECT ... WHERE id IN, returns the instances found by id
+        `populate_existing` overwrites the instances already in the session with the rows read"""
+
+        if len(ids) == 0:
+            return {}
+
+        query = select(cls._MODEL).where(col(cls._id_column()).in_(ids))
+        if populate_existing:
+            query = query.execution_options(populate_existing=True)
+
+        with request_context.span('orm'):
+            return {cls.model_id(inst): inst for inst in (await session.exec(query)).all()}
+
+    @classmethod
+    async def fetch_by_ids_with_exception(cls, session: AsyncSession, ids: Collection[custom_types.TId]) -> dict[custom_types.TId, models.TModel]:
+        """raises NotFoundError for the first id not found"""
+
+        model_insts = await cls.fetch_by_ids(session, ids)
+        for id in ids:
+            if id not in model_insts:
+                raise NotFoundError(cls._MODEL, id)
+        return model_insts
+
+    @classmethod
+    def build_filters(cls, filters: BaseModel) -> list[ColumnElement[bool]]:
+        """the WHERE clauses of the fields of `filters` that are set"""
+
+        clauses: list[ColumnElement[bool]] = []
+        for field, value in filters.model_dump(exclude_none=True).items():
+            filter = cls._FILTERS[field]
+            clauses.append(or_(*(cls._build_filter_clause(col(getattr(cls._MODEL, column)), filter['operator'], value)
+                                 for column in filter['columns'])))
+        return clauses
+
+    @staticmethod
+    def _build_filter_clause(column: Any, operator: FilterOperator, value: Any) -> ColumnElement[bool]:
+        if operator == 'eq':
+            return column == value
+        if operator == 'in':
+            return column.in_(value)
+        if operator == 'ge':
+            return column >= value
+        if operator == 'lt':
+            return column < value
+        return column.is_not(None) if value else column.is_(None)
+
+    @classmethod
+    def check_filters_indexed(cls) -> None:
+        """raises ValueError for a filter on a column no index starts with, a filter must never scan the table"""
+
+        table = cls._MODEL.__table__  # type: ignore[attr-defined]
+        indexed_columns = {next(iter(index.columns)).name for index in table.indexes}
+        indexed_columns.add(next(iter(table.primary_key.columns)).name)
+
+        for field, filter in cls._FILTERS.items():
+            for column in filter['columns']:
+                if column not in indexed_columns:
+                    raise ValueError('Filter {} of {} is on {}, which has no index'.format(
+                        field, cls.__name__, column))
+
     @classmethod
     def build_order_by(cls, query: SelectOfScalar[models.TModel], order_by: list[OrderBy[TOrderBy_co]]):
         for order in order_by:
@@ -256,6 +395,20 @@ class Service(
 
         return model_inst
 
+    @classmethod
+    async def read_by_ids(cls, params: ReadByIdsParams[custom_types.TId]) -> dict[custom_types.TId, models.TModel]:
+        """`read` for many ids with one SELECT ... WHERE id IN, returns the instances found by id"""
+
+        model_insts = await cls.fetch_by_ids(params['session'], params['ids'])
+        for id, model_inst in model_insts.items():
+            await cls._check_authorization_existing({
+                'session': params['session'],
+                'model_inst': model_inst,
+                'operation': 'read',
+                'id': id,
+            })
+        return model_insts
+
     @classmethod
     async def read_many(cls, params: ReadManyParams[models.TModel, TOrderBy_co]) -> Sequence[models.TModel]:
         """Used in conjunction with API endpoints, raises exceptions while trying to get a list of instances of the model"""
@@ -281,6 +434,7 @@ class Service(
 
         params['session'].add(model_inst)
         await params['session'].commit()
+        cache.bump_data_version()
         await params['session'].refresh(model_inst)
         return model_inst
 
@@ -306,6 +460,7 @@ class Service(
         await cls._update_model_inst(model_inst, params['update_model'])
 
         await params['session'].commit()
+        cache.bump_data_version()
         await params['session'].refresh(model_inst)
         return model_inst
 
@@ -330,3 +485,98 @@ class Service(
         await cls._check_validation_delete(params)
         await params['session'].delete(model_inst)
         await params['session'].commit()
+        cache.bump_data_version()
+
+    @classmethod
+    async def create_many(cls, params: CreateManyParams[TCreateModel]) -> list[models.TModel]:
+        """`create` for many instances: the checks of every instance run first, then all are inserted with one executemany
+        INSERT and one commit, and read back with one SELECT, in the order of `create_models`"""
+
+        session = params['session']
+        for create_model in params['create_models']:
+            await cls._check_authorization_new({'session': session, 'create_model': create_model})
+            await cls._check_validation_post({'session': session, 'create_model': create_model})
+
+        model_insts = [cls.model_inst_from_create_model(create_model)
+                       for create_model in params['create_models']]
+        if len(model_insts) == 0:
+            return []
+
+        # ids not given are left out for the database to assign, adding the instances to the session instead would insert
+        # them one statement each to read back every id in order
+        id_key = cls._id_column().key
+        values = [{key: value for key, value in model_inst.model_dump().items() if key != id_key or value is not None}
+                  for model_inst in model_insts]
+
+        # RETURNING in the order of `values`, whatever order the database or the batches by key set produce the rows in
+        result = await session.exec(insert(cls._MODEL).returning(cls._id_column(), sort_by_parameter_order=True), params=values)
+        ids = list(result.scalars().all())
+        await session.commit()
+        cache.bump_data_version()
+
+        refreshed = await cls.fetch_by_ids(session, ids)
+        return [refreshed[id] for id in ids]
+
+    @classmethod
+    async def update_many(cls, params: UpdateManyParams[custom_types.TId, TUpdateModel]) -> list[models.TModel]:
+        """`update` for many instances: one SELECT for all of them, the checks of every instance, then one commit, which
+        writes the instances with one executemany UPDATE when they all update the same fields, and one SELECT to read them
+        back, in the order of `update_models`
+        nothing is written if any instance is missing or fails a check"""
+
+        session = params['session']
+        model_insts = await cls.fetch_by_ids_with_exception(session, params['update_models'].keys())
+
+        for id, update_model in params['update_models'].items():
+            await cls._check_authorization_existing({
+                'session': session,
+                'model_inst': model_insts[id],
+                'operation': 'update',
+                'id': id,
+            })
+            await cls._check_validation_patch({
+                'session': session,
+                'id': id,
+                'update_model': update_model,
+                'model_inst': model_insts[id],
+            })
+
+        for id, update_model in params['update_models'].items():
+            await cls._update_model_inst(model_insts[id], update_model)
+            # written even where the value does not change, so the instances updating the same fields share a statement
+            for field in update_model.model_fields_set:
+                flag_modified(model_insts[id], field)
+
+        if len(model_insts) == 0:
+            return []
+
+        await session.commit()
+        cache.bump_data_version()
+
+        refreshed = await cls.fetch_by_ids(session, params['update_models'].keys(), populate_existing=True)
+        return [refreshed[id] for id in params['update_models']]
+
+    @classmethod
+    async def delete_many(cls, params: DeleteManyParams[custom_types.TId]) -> None:
+        """`delete` for many instances: one SELECT for all of them, the checks of every instance, then one DELETE and one
+        commit
+        nothing is deleted if any instance is missing or fails a check"""
+
+        session = params['session']
+        model_insts = await cls.fetch_by_ids_with_exception(session, params['ids'])
+
+        for id in params['ids']:
+            await cls._check_authorization_existing({
+                'session': session,
+                'operation': 'delete',
+                'id': id,
+                'model_inst': model_insts[id],
+            })
+            await cls._check_validation_delete({'session': session, 'id': id})
+
+        if len(model_insts) == 0:
+            return
+
+        await session.exec(delete(cls._MODEL).where(col(cls._id_column()).in_(model_insts.keys())))
+        await session.commit()
+        cache.bump_data_version()
@@ -0,0 +1,238 @@
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+from collections.abc import Sequence, Collection
+from typing import ClassVar, Literal
+import datetime as datetime_module
+import hashlib
+
+from uirpsoftball import custom_types, config, cache, ical
+from uirpsoftball.models import tables
+from uirpsoftball.services import game as game_service, team as team_service, location as location_service, division as division_service
+from uirpsoftball.schemas import pagination as pagination_schema
+
+"""
+Developer's Note:
+iCalendar feeds of the games of a team, a division or a location, which calendar apps poll every few minutes.
+
+A feed is kept per URL with the data version it was last checked at, and served without touching the database while that
+version is current. After a write anywhere, the next request reads the feed's games again (a few indexed statements) and
+compares a fingerprint of everything the feed shows: the feed is only rendered again, and gets a new ETag and
+Last-Modified, if one of its own games (or the teams and locations they show) changed.
+
+The ETag is the fingerprint, so it is the same in every worker, and weak because DTSTAMP is the time a worker rendered
+the feed. Last-Modified is per worker, clients sending both are answered from If-None-Match.
+"""
+
+FeedKind = Literal['team', 'division', 'location']
+FeedKey = tuple[FeedKind, str]
+
+
+class Feed:
+    version: cache.DataVersion
+    fingerprint: str
+    body: bytes
+    etag: str
+    last_modified: datetime_module.datetime
+
+    def __init__(self, version: cache.DataVersion, fingerprint: str, body: bytes, last_modified: datetime_module.datetime):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.body = body
+        self.etag = 'W/"{}"'.format(fingerprint)
+        self.last_modified = last_modified
+
+
+class FeedSource:
+    """everything a feed shows, as read from the database"""
+
+    name: str
+    games: Sequence[tables.Game]
+    teams_by_id: dict[custom_types.Team.id, tables.Team]
+    locations_by_id: dict[custom_types.Location.id, tables.Location]
+    team_id: custom_types.Team.id | None
+
+    def __init__(self, name: str, games: Sequence[tables.Game], teams: Sequence[tables.Team], locations: Sequence[tables.Location], team_id: custom_types.Team.id | None = None):
+        self.name = name
+        self.games = games
+        self.teams_by_id = {team.id: team for team in teams}
+        self.locations_by_id = {location.id: location for location in locations}
+        self.team_id = team_id
+
+
+class Calendar:
+
+    _FEEDS: ClassVar[dict[FeedKey, Feed]] = {}
+    _GAME_DURATION: ClassVar[datetime_module.timedelta] = datetime_module.timedelta(
+        hours=1)
+    _REFRESH_INTERVAL: ClassVar[datetime_module.timedelta] = datetime_module.timedelta(
+        minutes=15)
+
+    @classmethod
+    async def _fetch_referenced(cls, session: AsyncSession, name: str, games: Sequence[tables.Game], team_id: custom_types.Team.id | None = None) -> FeedSource:
+
+        team_ids = {id for game in games for id in (
+            game.home_team_id, game.away_team_id, game.officiating_team_id) if id is not None}
+        location_ids = {
+            game.location_id for game in games if game.location_id is not None}
+
+        teams = [] if len(team_ids) == 0 else await team_service.Team.fetch_many(
+            session,
+            pagination=pagination_schema.Pagination(limit=1000, offset=0),
+            query=select(tables.Team).where(col(tables.Team.id).in_(team_ids))
+        )
+        locations = [] if len(location_ids) == 0 else await location_service.Location.fetch_many(
+            session,
+            pagination=pagination_schema.Pagination(limit=1000, offset=0),
+            query=select(tables.Location).where(
+                col(tables.Location.id).in_(location_ids))
+        )
+        return FeedSource(name, games, teams, locations, team_id)
+
+    @classmethod
+    async def _fetch_games(cls, session: AsyncSession, *conditions) -> Sequence[tables.Game]:
+        return await game_service.Game.fetch_many(
+            session,
+            pagination=pagination_schema.Pagination(limit=1000, offset=0),
+            query=select(tables.Game).where(*conditions).order_by(
+                col(tables.Game.datetime).asc(), col(tables.Game.id).asc())
+        )
+
+    @classmethod
+    async def fetch_team_source(cls, session: AsyncSession, team_slug: custom_types.Team.slug) -> FeedSource | None:
+        """the games a team plays or officiates"""
+
+        team = await team_service.Team.fetch_one(session, select(tables.Team).where(tables.Team.slug == team_slug))
+        if team is None:
+            return None
+
+        games = await cls._fetch_games(
+            session,
+            (col(tables.Game.home_team_id) == team.id) |
+            (col(tables.Game.away_team_id) == team.id) |
+            (col(tables.Game.officiating_team_id) == team.id)
+        )
+        return await cls._fetch_referenced(session, team.name, games, team.id)
+
+    @classmethod
+    async def fetch_division_source(cls, session: AsyncSession, division_id: custom_types.Division.id) -> FeedSource | None:
+        """the games played by the teams of a division"""
+
+        division = await division_service.Division.fetch_by_id(session, division_id)
+        if division is None:
+            return None
+
+        division_team_ids = select(tables.Team.id).where(
+            tables.Team.division_id == division_id)
+        games = await cls._fetch_games(
+            session,
+            col(tables.Game.home_team_id).in_(division_team_ids) |
+            col(tables.Game.away_team_id).in_(division_team_ids)
+        )
+        return await cls._fetch_referenced(session, division.name, games)
+
+    @classmethod
+    async def fetch_location_source(cls, session: AsyncSession, location_id: custom_types.Location.id) -> FeedSource | None:
+        """the games played at a location"""
+
+        location = await location_service.Location.fetch_by_id(session, location_id)
+        if location is None:
+            return None
+
+        games = await cls._fetch_games(session, tables.Game.location_id == location_id)
+        return await cls._fetch_referenced(session, location.name, games)
+
+    @classmethod
+    def _fingerprint(cls, source: FeedSource) -> str:
+
+        def team_name(team_id: custom_types.Team.id | None) -> str | None:
+            return None if team_id is None else source.teams_by_id[team_id].name
+
+        rows = [source.name]
+        for game in source.games:
+            location = None if game.location_id is None else source.locations_by_id[
+                game.location_id]
+            rows.append(repr((
+                game.id, game.datetime.isoformat(), team_name(
+                    game.home_team_id), team_name(game.away_team_id),
+                team_name(
+                    game.officiating_team_id), game.home_team_score, game.away_team_score,
+                None if location is None else (
+                    location.name, location.link, location.time_zone),
+            )))
+        return hashlib.sha256('\n'.join(rows).encode('utf-8')).hexdigest()[:32]
+
+    @classmethod
+    def _events(cls, source: FeedSource) -> list[ical.Event]:
+
+        def team_name(team_id: custom_types.Team.id | None) -> str:
+            return 'TBD' if team_id is None else source.teams_by_id[team_id].name
+
+        events: list[ical.Event] = []
+        for game in source.games:
+
+            location = None if game.location_id is None else source.locations_by_id[
+                game.location_id]
+            summary = '{} vs {}'.format(team_name(game.home_team_id),
+                                        team_name(game.away_team_id))
+            if source.team_id is not None and game.officiating_team_id == source.team_id:
+                summary = 'Officiating: ' + summary
+
+            description: list[str] = []
+            if game.home_team_score is not None and game.away_team_score is not None:
+                description.append('Final: {} {}, {} {}'.format(
+                    team_name(game.home_team_id), game.home_team_score, team_name(game.away_team_id), game.away_team_score))
+            if game.officiating_team_id is not None:
+                description.append(
+                    'Officials: ' + team_name(game.officiating_team_id))
+
+            events.append({
+                'uid': 'game-{}@uirpsoftball'.format(game.id),
+                'start': game.datetime,
+                'end': game.datetime + cls._GAME_DURATION,
+                'summary': summary,
+                'time_zone': 'UTC' if location is None else location.time_zone,
+                'location': None if location is None else location.name,
+                'url': None if location is None else location.link,
+                'description': '\n'.join(description) if len(description) > 0 else None,
+            })
+        return events
+
+    @classmethod
+    async def _fetch_source(cls, session: AsyncSession, kind: FeedKind, identifier: str) -> FeedSource | None:
+
+        if kind == 'team':
+            return await cls.fetch_team_source(session, identifier)
+        if not identifier.isdigit():
+            return None
+        if kind == 'division':
+            return await cls.fetch_division_source(session, int(identifier))
+        return await cls.fetch_location_source(session, int(identifier))
+
+    @classmethod
+    async def get_feed(cls, kind: FeedKind, identifier: str) -> Feed | None:
+        """returns the feed of the team (slug), division or location (id), None if it does not exist"""
+
+        key: FeedKey = (kind, identifier)
+        feed = cls._FEEDS.get(key)
+        if feed is not None and feed.version == cache.data_version():
+            return feed
+
+        version = cache.data_version()
+        async with config.READ_ASYNC_SESSIONMAKER() as session:
+            source = await cls._fetch_source(session, kind, identifier)
+
+        if source is None:
+            cls._FEEDS.pop(key, None)
+            return None
+
+        fingerprint = cls._fingerprint(source)
+        if feed is not None and feed.fingerprint == fingerprint:
+            feed.version = version
+            return feed
+
+        last_modified = datetime_module.datetime.now(
+            tz=datetime_module.timezone.utc).replace(microsecond=0)
+        feed = Feed(version, fingerprint, ical.calendar(source.name, cls._events(source),
+                    last_modified, cls._REFRESH_INTERVAL), last_modified)
+        cls._FEEDS[key] = feed
+        return feed
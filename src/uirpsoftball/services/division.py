@@ -1,13 +1,14 @@
-from sqlmodel import select
+from sqlmodel import select, col, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 from collections.abc import Sequence
 
-from uirpsoftball import custom_types
+from uirpsoftball import custom_types, cache
 from uirpsoftball.models.tables import Division as DivisionTable
-from uirpsoftball.services import base, team as team_service, division as division_service
-from uirpsoftball.schemas import division as division_schema, pagination as pagination_schema
+from uirpsoftball.services import base, team as team_service
+from uirpsoftball.schemas import division as division_schema
 import random
 
+
 class Division(
     base.Service[
         DivisionTable,
@@ -22,27 +23,67 @@ class Division(
 ):
     _MODEL = DivisionTable
 
-
     @classmethod
-    async def shuffle(cls, session: AsyncSession):
+    def assign_teams(cls, team_ids: Sequence[custom_types.Team.id], division_ids: Sequence[custom_types.Division.id], rng: random.Random, seeds_by_team_id: dict[custom_types.Team.id, custom_types.Team.seed] | None = None) -> dict[custom_types.Team.id, custom_types.Division.id]:
+        """spreads the teams evenly over the divisions, the first divisions (by id) take one more team when they do not divide evenly
+        with `seeds_by_team_id`, the teams are dealt out in tiers of their previous seed so every division gets one team of
+        each tier, keeping the spread of previous seeds the same across divisions
+        """
+
+        if len(division_ids) == 0:
+            return {}
+
+        division_ids = sorted(division_ids)
+        team_ids = sorted(team_ids)
+        n, extra = divmod(len(team_ids), len(division_ids))
+        capacities = {division_id: n + (1 if i < extra else 0)
+                      for i, division_id in enumerate(division_ids)}
 
-        teams = await team_service.Team.fetch_many(session, pagination=pagination_schema.Pagination(limit=1000,offset=0))
-        divisions = await division_service.Division.fetch_many(session, pagination=pagination_schema.Pagination(limit=1000,offset=0))
+        if seeds_by_team_id is None:
+            slots = [division_id for division_id in division_ids
+                     for _ in range(capacities[division_id])]
+            rng.shuffle(slots)
+            return dict(zip(team_ids, slots))
 
-        n = len(teams) // len(divisions)
-        extra = len(teams) % len(divisions)
+        # previous seed first, ties broken at random
+        tie_breakers = {team_id: rng.random() for team_id in team_ids}
+        ordered_team_ids = sorted(team_ids, key=lambda team_id: (
+            seeds_by_team_id.get(team_id, len(team_ids)), tie_breakers[team_id]))
 
-        division_assingments = []
-        for division in divisions:
-            division_assingments.extend([division_service.Division.model_id(division)] * n)
+        division_id_by_team_id: dict[custom_types.Team.id,
+                                     custom_types.Division.id] = {}
+        for start in range(0, len(ordered_team_ids), len(division_ids)):
+            open_division_ids = [
+                division_id for division_id in division_ids if capacities[division_id] > 0]
+            tier = ordered_team_ids[start:start + len(division_ids)]
+            for team_id, division_id in zip(tier, rng.sample(open_division_ids, len(tier))):
+                division_id_by_team_id[team_id] = division_id
+                capacities[division_id] -= 1
+
+        return division_id_by_team_id
+
+    @classmethod
+    async def shuffle(cls, session: AsyncSession, seed: int | None = None, balance: bool = False) -> dict[custom_types.Team.id, custom_types.Division.id]:
+        """reassigns every team to a random division with one bulk UPDATE, then reseeds all divisions once
+        the same `seed` gives the same assignment, `balance` keeps the previous seeds spread evenly across divisions
+        """
 
-        for i in range(extra):
-            division_assingments.append(division_service.Division.model_id(divisions[i]))
+        TeamTable = team_service.Team._MODEL
+        division_ids = (await session.exec(select(col(cls._MODEL.id)))).all()
+        team_seeds = (await session.exec(select(col(TeamTable.id), col(TeamTable.seed)))).all()
 
-        random.shuffle(division_assingments)
+        division_id_by_team_id = cls.assign_teams(
+            [team_id for team_id, _ in team_seeds],
+            division_ids,
+            random.Random(seed),
+            seeds_by_team_id=dict(team_seeds) if balance else None,
+        )
 
-        for team in teams:
-            team.division_id = division_assingments.pop()
+        if len(division_id_by_team_id) > 0:
+            await session.exec(update(TeamTable), params=[
+                {'id': team_id, 'division_id': division_id} for team_id, division_id in division_id_by_team_id.items()])
+        await session.commit()
+        cache.bump_data_version()
 
-        session.add_all(teams)
-        await session.commit()
\ No newline at end of file
+        await team_service.Team.update_seeds_many(session, division_ids)
+        return division_id_by_team_id
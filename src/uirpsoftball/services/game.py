@@ -1,12 +1,12 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select, col, func
+from sqlmodel import select, col, func, insert, delete
 from collections.abc import Sequence
 from typing import Literal
 import datetime as datetime_module
 
-from uirpsoftball import custom_types, config
+from uirpsoftball import custom_types, config, cache, scheduler
 from uirpsoftball.services import base, location as location_service
-from uirpsoftball.models.tables import Game as GameTable
+from uirpsoftball.models.tables import Game as GameTable, Team as TeamTable, Location as LocationTable, TournamentGame as TournamentGameTable
 from uirpsoftball.schemas import game as game_schema, pagination as pagination_schema
 
 
@@ -23,6 +23,14 @@ class Game(
     ]
 ):
     _MODEL = GameTable
+    _FILTERS = {
+        'team_id': {'columns': ['home_team_id', 'away_team_id'], 'operator': 'eq'},
+        'round_ids': {'columns': ['round_id'], 'operator': 'in'},
+        'location_id': {'columns': ['location_id'], 'operator': 'eq'},
+        'datetime_from': {'columns': ['datetime'], 'operator': 'ge'},
+        'datetime_to': {'columns': ['datetime'], 'operator': 'lt'},
+        'scored': {'columns': ['home_team_score'], 'operator': 'not_null'},
+    }
 
     @classmethod
     async def fetch_many_by_team(cls, session: AsyncSession, team_id: custom_types.Team.id) -> Sequence[GameTable]:
@@ -60,50 +68,33 @@ class Game(
 
     @classmethod
     async def fetch_team_unknown_games(cls, session: AsyncSession, team_id: custom_types.Team.id) -> Sequence[GameTable]:
+        """returns a placeholder game for every round the team is not scheduled in that still has a TBD team, at the first
+        datetime of its TBD games; the rounds are found with one grouped query"""
 
-        # find rounds where team is currently not scheduled
-        # for each of the unscheduled rounds, if round contains a TBD team, send it back
-
-        # Find all round_ids where the given team_id is not scheduled as home or away
-
-        # find all rounds
-
-        all_rounds = set(await cls.fetch_all_rounds(session))
-
-        rounds_with_team = set(await session.exec(select(col(cls._MODEL.round_id)).where(
+        rounds_with_team = select(col(cls._MODEL.round_id)).where(
             (cls._MODEL.home_team_id == team_id) | (
                 cls._MODEL.away_team_id == team_id)
-        ).distinct()))
-
-        rounds_without_team = list(all_rounds - rounds_with_team)
-        rounds_without_team.sort()
-
-        games = []
-
-        new_id = -1
-        for round_id in rounds_without_team:
-
-            game_datetime = (await session.exec(select(
-                cls._MODEL.datetime
-            ).where(
-                cls._MODEL.round_id == round_id,
-                (cls._MODEL.home_team_id == None) | (
-                    cls._MODEL.away_team_id == None)
-            ).order_by(
-                col(cls._MODEL.datetime).asc()
-            ).limit(1))).one_or_none()
-
-            if game_datetime is not None:
-                games.append(
-                    GameTable(
-                        id=new_id,
-                        round_id=round_id,
-                        datetime=game_datetime
-                    )
-                )
-                new_id -= 1
-
-        return games
+        )
+
+        round_datetimes = (await session.exec(select(
+            col(cls._MODEL.round_id), func.min(cls._MODEL.datetime)
+        ).where(
+            col(cls._MODEL.round_id).not_in(rounds_with_team),
+            (cls._MODEL.home_team_id == None) | (
+                cls._MODEL.away_team_id == None)
+        ).group_by(
+            col(cls._MODEL.round_id)
+        ).order_by(
+            col(cls._MODEL.round_id).asc()
+        ))).all()
+
+        return [
+            GameTable(
+                id=-(i + 1),
+                round_id=round_id,
+                datetime=game_datetime
+            ) for i, (round_id, game_datetime) in enumerate(round_datetimes)
+        ]
 
     @classmethod
     async def fetch_many_by_round(cls, session: AsyncSession, round_id: custom_types.RoundId) -> Sequence[GameTable]:
@@ -115,6 +106,25 @@ class Game(
             query=select(cls._MODEL).where(cls._MODEL.round_id == round_id)
         )
 
+    @classmethod
+    async def fetch_many_in_window(cls, session: AsyncSession, datetime_from: datetime_module.datetime | None = None, datetime_to: datetime_module.datetime | None = None, round_ids: Sequence[custom_types.RoundId] | None = None) -> Sequence[GameTable]:
+        """returns the games starting at or after `datetime_from` and before `datetime_to`, in `round_ids` if given, in order
+        a range scan of the datetime index, or a lookup of the round_id index"""
+
+        query = select(cls._MODEL)
+        if datetime_from is not None:
+            query = query.where(cls._MODEL.datetime >= datetime_from)
+        if datetime_to is not None:
+            query = query.where(cls._MODEL.datetime < datetime_to)
+        if round_ids is not None:
+            query = query.where(col(cls._MODEL.round_id).in_(round_ids))
+
+        return await cls.fetch_many(
+            session,
+            pagination=pagination_schema.Pagination(limit=1000, offset=0),
+            query=query.order_by(col(cls._MODEL.datetime).asc())
+        )
+
     @classmethod
     async def fetch_all_rounds(cls, session: AsyncSession) -> Sequence[custom_types.RoundId]:
         return (await session.exec(select(col(cls._MODEL.round_id)).distinct().order_by(col(cls._MODEL.round_id).asc()))).all()
@@ -167,40 +177,44 @@ class Game(
 
         return round_ids
 
-    # def assign_teams_to_games(self, session: AsyncSession, n_rounds: int = config.REGULAR_SEASON_ROUNDS):
-    #     """randomly assign games for each division"""
-
-    #     from kabbes_matchup_scheduler.scheduler import Scheduler
-    #     divisions = division.Divisions.get_real(db)
-
-    #     rounds = []
-    #     for i in range(n_rounds):
-    #         rounds.append([])
-
-    #     for division_inst in divisions:
-    #         division_teams = team.Teams.get_by_division(db, division_inst._id)
-    #         division_teams_ids = list(division_teams.d.keys())
-
-    #         scheduler = Scheduler(overwrite_config={
-    #             'n_teams': len(division_teams),
-    #             'n_rounds': n_rounds,
-    #             'teams_per_matchup': 2,
-    #             'matchups_per_round': len(division_teams)//2
-    #         })
-    #         scheduler.run()
-
-    #         for round_index in range(n_rounds):
-    #             for matchup_index in range(len(scheduler.schedule[round_index])):
-    #                 rounds[round_index].append(
-    #                     [division_teams_ids[team_id] for team_id in scheduler.schedule[round_index][matchup_index]])
-
-    #     game_id = 1
-    #     for round_index in range(n_rounds):
-    #         random.shuffle(rounds[round_index])
-
-    #         for matchup_index in range(len(rounds[round_index])):
-    #             self.d[game_id].home_team_id = rounds[round_index][matchup_index][0]
-    #             self.d[game_id].away_team_id = rounds[round_index][matchup_index][1]
-    #             game_id += 1
+    @classmethod
+    async def generate_schedule(cls, session: AsyncSession, first_round_start: datetime_module.datetime, rounds: int, round_interval: datetime_module.timedelta = datetime_module.timedelta(weeks=1), slot_interval: datetime_module.timedelta = datetime_module.timedelta(hours=1), first_round_id: custom_types.RoundId = 1, seed: int | None = None, replace: bool = False) -> scheduler.Schedule:
+        """schedules a round robin season for every division with scheduler.schedule and inserts its games with one executemany
+        the games of rounds that already have games (except tournament games) are deleted first with `replace`, otherwise an error
+        """
+
+        round_ids = list(range(first_round_id, first_round_id + rounds))
+        regular_season_games = select(cls._MODEL.id).where(col(cls._MODEL.round_id).in_(round_ids)).where(
+            col(cls._MODEL.id).not_in(select(TournamentGameTable.game_id)))
+
+        if (await session.exec(select(func.count()).select_from(regular_season_games.subquery()))).one() > 0:
+            if not replace:
+                raise base.NotAvailableError(
+                    'Rounds {} to {} already have games'.format(round_ids[0], round_ids[-1]))
+            await session.exec(delete(cls._MODEL).where(col(cls._MODEL.id).in_(regular_season_games)))
+
+        team_ids_by_division: dict[custom_types.Division.id,
+                                   list[custom_types.Team.id]] = {}
+        for team_id, division_id in (await session.exec(select(TeamTable.id, TeamTable.division_id).where(col(TeamTable.division_id).is_not(None)).order_by(col(TeamTable.id)))).all():
+            team_ids_by_division.setdefault(division_id, []).append(team_id)
+        location_ids = (await session.exec(select(LocationTable.id).order_by(col(LocationTable.id)))).all()
+
+        if len(location_ids) == 0:
+            raise base.NotAvailableError(
+                'At least one location is needed to schedule games')
+
+        schedule = scheduler.schedule(
+            team_ids_by_division,
+            [first_round_start + i * round_interval for i in range(rounds)],
+            location_ids,
+            slot_interval,
+            first_round_id=first_round_id,
+            seed=seed,
+        )
 
-    #     self.export_to_db(db)
+        if len(schedule['games']) > 0:
+            await session.exec(insert(cls._MODEL), params=[
+                dict(game, is_accepting_scores=False) for game in schedule['games']])
+        await session.commit()
+        cache.bump_data_version()
+        return schedule
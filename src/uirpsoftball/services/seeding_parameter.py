@@ -1,12 +1,12 @@
-from typing import ClassVar, Callable
+from typing import ClassVar, Callable, Self
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from uirpsoftball import custom_types
+from uirpsoftball import custom_types, request_context
 from uirpsoftball.services import base
-from uirpsoftball.models.tables import SeedingParameter as SeedingParameterTable, Team as TeamTable
+from uirpsoftball.models.tables import SeedingParameter as SeedingParameterTable, Game as GameTable
 from uirpsoftball.schemas import seeding_parameter as seeding_parameter_schema, team as team_schema
 
-from collections.abc import Sequence
+from collections.abc import Sequence, Iterable, Collection
 
 
 class SeedingParameter(
@@ -24,27 +24,57 @@ class SeedingParameter(
     _MODEL = SeedingParameterTable
 
     @classmethod
-    def rank_by_seeding_parameter(cls, session: AsyncSession, seeding_parameter: SeedingParameterTable, teams_by_id: dict[custom_types.Team.id, TeamTable], team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport]):
-
-        highest_to_lowest_movers = []
-        if seeding_parameter.parameter == 'win_percentage':
-            highest_to_lowest_movers = cls.win_percentage(
-                teams_by_id, team_statistics_by_team_id)
-        elif seeding_parameter.parameter == 'head_to_head':
-            highest_to_lowest_movers = cls.head_to_head(
-                teams_by_id, team_statistics_by_team_id)
-        elif seeding_parameter.parameter == 'run_differential':
-            highest_to_lowest_movers = cls.run_differential(
-                teams_by_id, team_statistics_by_team_id)
-
-        seeds_to_add = 0
-        for i in range(len(highest_to_lowest_movers)):
-            for team_id in highest_to_lowest_movers[i]:
-                teams_by_id[team_id].seed += seeds_to_add
-            seeds_to_add += len(highest_to_lowest_movers[i])
+    def rank_by_seeding_parameter(cls, parameter: custom_types.SeedingParameter.parameter, team_ids: Collection[custom_types.Team.id], team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport], head_to_head_matrix: 'HeadToHeadMatrix') -> list[set[custom_types.Team.id]]:
+        """split a group of tied teams into groups ordered from highest to lowest seed"""
+
+        if parameter == 'win_percentage':
+            return cls.win_percentage(team_ids, team_statistics_by_team_id)
+        elif parameter == 'head_to_head':
+            return cls.head_to_head(team_ids, team_statistics_by_team_id, head_to_head_matrix)
+        elif parameter == 'run_differential':
+            return cls.run_differential(team_ids, team_statistics_by_team_id)
+
+        return [set(team_ids)]
 
     @classmethod
-    def win_percentage(cls, teams_by_id: dict[custom_types.Team.id, TeamTable], team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport]) -> list[set[custom_types.Team.id]]:
+    def rank(cls, parameters: Sequence[custom_types.SeedingParameter.parameter], team_ids: Collection[custom_types.Team.id], team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport], head_to_head_matrix: 'HeadToHeadMatrix') -> list[set[custom_types.Team.id]]:
+        """apply the seeding parameters in order, each one only ranks the teams still tied after the previous ones
+        returns groups of tied teams ordered from highest to lowest seed
+        """
+
+        groups: list[set[custom_types.Team.id]] = [set(team_ids)]
+
+        with request_context.span('seeding'):
+            for parameter in parameters:
+                ranked_groups: list[set[custom_types.Team.id]] = []
+                for group in groups:
+                    if len(group) > 1:
+                        # only rank teams that need differentiation
+                        ranked_groups.extend(cls.rank_by_seeding_parameter(
+                            parameter, group, team_statistics_by_team_id, head_to_head_matrix))
+                    else:
+                        ranked_groups.append(group)
+                groups = ranked_groups
+
+        return groups
+
+    @staticmethod
+    def seeds_from_groups(groups: Sequence[set[custom_types.Team.id]]) -> dict[custom_types.Team.id, custom_types.Team.seed]:
+        """tied teams share a seed, the next group's seed skips past all of the tied teams"""
+
+        seeds_by_team_id: dict[custom_types.Team.id,
+                               custom_types.Team.seed] = {}
+
+        seed = 1
+        for group in groups:
+            for team_id in group:
+                seeds_by_team_id[team_id] = seed
+            seed += len(group)
+
+        return seeds_by_team_id
+
+    @classmethod
+    def win_percentage(cls, team_ids: Collection[custom_types.Team.id], team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport]) -> list[set[custom_types.Team.id]]:
         """rank the seeding group based on their win percentage
         win percentage = wins / (wins + losses)
         """
@@ -52,7 +82,7 @@ class SeedingParameter(
         team_ids_by_win_percentage: dict[custom_types.Team.win_percentage, set[custom_types.Team.id]
                                          ] = {}
 
-        for team_id in teams_by_id:
+        for team_id in team_ids:
             team_statistics = team_statistics_by_team_id[team_id]
             win_percentage = 0.0
             if len(team_statistics.game_ids_won) + len(team_statistics.game_ids_lost) > 0:
@@ -71,14 +101,14 @@ class SeedingParameter(
         return [team_ids_by_win_percentage[win_percentage] for win_percentage in sorted_win_percentages]
 
     @classmethod
-    def run_differential(cls, teams_by_id: dict[custom_types.Team.id, TeamTable], team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport]) -> list[set[custom_types.Team.id]]:
+    def run_differential(cls, team_ids: Collection[custom_types.Team.id], team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport]) -> list[set[custom_types.Team.id]]:
         """rank the seeding group based on their run differential
         run differential = runs scored - runs allowed
         """
 
         team_ids_by_run_differential: dict[int, set[custom_types.Team.id]] = {}
 
-        for team_id in teams_by_id:
+        for team_id in team_ids:
             team_statistics = team_statistics_by_team_id[team_id]
             run_differential = team_statistics.run_differential
 
@@ -92,61 +122,34 @@ class SeedingParameter(
         return [team_ids_by_run_differential[run_differential] for run_differential in sorted_run_differentials]
 
     @classmethod
-    def head_to_head(cls, teams_by_id: dict[custom_types.Team.id, TeamTable], team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport]) -> list[set[custom_types.Team.id]]:
+    def head_to_head(cls, team_ids: Collection[custom_types.Team.id], team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport], head_to_head_matrix: 'HeadToHeadMatrix') -> list[set[custom_types.Team.id]]:
         """rank the seeding group based on their head to head performance
         for each win they have against the group, +1, for each loss, -1
         """
 
-        game_ids_one_team: set[custom_types.Game.id] = set()
-        game_ids_two_teams: set[custom_types.Game.id] = set()
-        head_to_head_game_ids_by_team: dict[custom_types.Team.id, set[custom_types.Game.id]] = {
-        }
+        head_to_head_games_by_team_id: dict[custom_types.Team.id, int] = {}
+        group_rankings_by_team_id: dict[custom_types.Team.id, int] = {}
 
-        for team_id in team_statistics_by_team_id:
+        for team_id in team_ids:
+            head_to_head_games_by_team_id[team_id] = 0
+            group_rankings_by_team_id[team_id] = 0
 
-            team_statistics = team_statistics_by_team_id[team_id]
+            for opponent_id in team_ids:
+                if opponent_id == team_id:
+                    continue
 
-            head_to_head_game_ids_by_team[team_id] = set()
-            for game_id in team_statistics.game_ids_won:
-                if game_id not in game_ids_one_team:
-                    game_ids_one_team.add(game_id)
-                else:
-                    game_ids_two_teams.add(game_id)
-
-            for game_id in team_statistics.game_ids_lost:
-                if game_id not in game_ids_one_team:
-                    game_ids_one_team.add(game_id)
-                else:
-                    game_ids_two_teams.add(game_id)
-
-        for team_id in team_statistics_by_team_id:
-            team_statistics = team_statistics_by_team_id[team_id]
-            head_to_head_game_ids_by_team[team_id] = set(
-                team_statistics.game_ids_won | team_statistics.game_ids_lost).intersection(game_ids_two_teams)
+                wins = head_to_head_matrix.wins(team_id, opponent_id)
+                losses = head_to_head_matrix.wins(opponent_id, team_id)
+                head_to_head_games_by_team_id[team_id] += wins + losses
+                group_rankings_by_team_id[team_id] += wins - losses
 
         # if there are no games between the teams, then the ranking is invalid
-        if len(game_ids_two_teams) == 0:
-            return [set(teams_by_id.keys())]
+        if sum(head_to_head_games_by_team_id.values()) == 0:
+            return [set(team_ids)]
 
         # if not each team has played each other the same amount of times, then the ranking is invalid
-        # 3 games *2 = 6, 3 teams, 2 games per team
-        total_games_times_2 = len(game_ids_two_teams)*2
-        games_per_team = total_games_times_2 / len(team_statistics_by_team_id)
-
-        for team_id in team_statistics_by_team_id:
-            if len(head_to_head_game_ids_by_team[team_id]) != games_per_team:
-                return [set(teams_by_id.keys())]
-
-        # keep track of the W/L record between the
-        group_rankings_by_team_id: dict[custom_types.Team.id, int] = {
-            team_id: 0 for team_id in team_statistics_by_team_id}
-
-        for game_id in game_ids_two_teams:
-            for team_id in teams_by_id:
-                if game_id in team_statistics_by_team_id[team_id].game_ids_won:
-                    group_rankings_by_team_id[team_id] += 1
-                elif game_id in team_statistics_by_team_id[team_id].game_ids_lost:
-                    group_rankings_by_team_id[team_id] -= 1
+        if len(set(head_to_head_games_by_team_id.values())) != 1:
+            return [set(team_ids)]
 
         # now, sort by the head to head record and apply the rankings
 
@@ -160,3 +163,64 @@ class SeedingParameter(
             team_ids_by_group_rankings.keys(), reverse=True)
 
         return [team_ids_by_group_rankings[group_ranking] for group_ranking in sorted_group_rankings]
+
+
+class HeadToHeadMatrix:
+    """pairwise results between the teams of one division, built once from the scored games and updated in place
+    games between teams outside of the division are ignored; tied games count as played but not won
+    """
+
+    team_ids: set[custom_types.Team.id]
+    _wins: dict[custom_types.Team.id, dict[custom_types.Team.id, int]]
+    _played: dict[custom_types.Team.id, dict[custom_types.Team.id, int]]
+
+    def __init__(self, team_ids: Iterable[custom_types.Team.id]):
+        self.team_ids = set(team_ids)
+        self._wins = {team_id: {} for team_id in self.team_ids}
+        self._played = {team_id: {} for team_id in self.team_ids}
+
+    @classmethod
+    def from_games(cls, team_ids: Iterable[custom_types.Team.id], games: Iterable[GameTable]) -> Self:
+        head_to_head_matrix = cls(team_ids)
+        for game in games:
+            head_to_head_matrix.record_game(game)
+        return head_to_head_matrix
+
+    def wins(self, team_id: custom_types.Team.id, opponent_id: custom_types.Team.id) -> int:
+        return self._wins[team_id].get(opponent_id, 0)
+
+    def losses(self, team_id: custom_types.Team.id, opponent_id: custom_types.Team.id) -> int:
+        return self._wins[opponent_id].get(team_id, 0)
+
+    def games_played(self, team_id: custom_types.Team.id, opponent_id: custom_types.Team.id) -> int:
+        return self._played[team_id].get(opponent_id, 0)
+
+    def record(self, home_team_id: custom_types.Team.id | None, away_team_id: custom_types.Team.id | None, home_team_score: custom_types.Game.home_team_score | None, away_team_score: custom_types.Game.away_team_score | None, count: int = 1) -> None:
+        """add the result of one game to the matrix, count=-1 removes a previously recorded result"""
+
+        if home_team_id not in self.team_ids or away_team_id not in self.team_ids:
+            return
+        if home_team_score is None or away_team_score is None:
+            return
+
+        self._played[home_team_id][away_team_id] = self.games_played(
+            home_team_id, away_team_id) + count
+        self._played[away_team_id][home_team_id] = self.games_played(
+            away_team_id, home_team_id) + count
+
+        if home_team_score > away_team_score:
+            self._wins[home_team_id][away_team_id] = self.wins(
+                home_team_id, away_team_id) + count
+        elif away_team_score > home_team_score:
+            self._wins[away_team_id][home_team_id] = self.wins(
+                away_team_id, home_team_id) + count
+
+    def record_game(self, game: GameTable, count: int = 1) -> None:
+        self.record(game.home_team_id, game.away_team_id,
+                    game.home_team_score, game.away_team_score, count)
+
+    def update_game(self, game_before: GameTable, game_after: GameTable) -> None:
+        """swap the previous result of a game for its new one"""
+
+        self.record_game(game_before, -1)
+        self.record_game(game_after)
@@ -0,0 +1,624 @@
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+from concurrent.futures import ProcessPoolExecutor
+from typing import ClassVar, TypedDict
+from collections.abc import Sequence
+import multiprocessing
+import functools
+import asyncio
+import random
+import time
+
+from uirpsoftball import custom_types, config, cache
+from uirpsoftball.services import game as game_service, team as team_service, seeding_parameter as seeding_parameter_service
+from uirpsoftball.schemas import team as team_schema
+
+"""
+Developer's Note:
+Seed odds are estimated by simulating the remaining (unscored) games many times and seeding every simulated season with the
+configured seeding parameters, exactly like Team.update_seeds does for the real one.
+
+The winner of a simulated game is drawn from both teams' current records (log5 with one phantom win and loss per team), the
+margin is drawn from the margins of the games played so far. Each division is simulated on its own, the simulations are
+split across a process pool.
+"""
+
+ScoredGame = tuple[custom_types.Game.id, custom_types.Team.id, custom_types.Team.id,
+                   custom_types.Game.home_team_score, custom_types.Game.away_team_score]
+# game id, home team id, away team id, probability that the home team wins
+RemainingGame = tuple[custom_types.Game.id,
+                      custom_types.Team.id, custom_types.Team.id, float]
+
+SeedCountsByTeamId = dict[custom_types.Team.id,
+                          dict[custom_types.Team.seed, int]]
+SeedProbabilitiesByTeamId = dict[custom_types.Team.id,
+                                 dict[custom_types.Team.seed, float]]
+
+
+class DivisionSeason(TypedDict):
+    team_ids: list[custom_types.Team.id]
+    scored_games: list[ScoredGame]
+    remaining_games: list[RemainingGame]
+
+
+class Season(TypedDict):
+    divisions: list[DivisionSeason]
+    parameters: list[custom_types.SeedingParameter.parameter]
+    margins: list[int]
+
+
+class SeedOdds(TypedDict):
+    simulations: int
+    seed_probabilities: SeedProbabilitiesByTeamId
+
+
+class SeedRange(TypedDict):
+    best_seed: custom_types.Team.seed
+    worst_seed: custom_types.Team.seed
+    deciding_game_ids: list[custom_types.Game.id]
+    exact: bool
+
+
+SeedRangesByTeamId = dict[custom_types.Team.id, SeedRange]
+
+
+def _simulate_seasons(season: Season, simulations: int, random_seed: int) -> SeedCountsByTeamId:
+    """runs in the process pool, counts how often each team finishes with each seed
+
+    the teams of a division are numbered 0..n-1 and every statistic is a plain list indexed by that number, a simulated
+    season copies three short lists and ranks them with _rank, the same rules as SeedingParameter.rank
+    """
+
+    rng = random.Random(random_seed)
+    draw = rng.random
+    draw_margin = rng.choice
+    seed_counts_by_team_id: SeedCountsByTeamId = {}
+    margins = season['margins']
+
+    for division_season in season['divisions']:
+
+        team_ids = division_season['team_ids']
+        index_by_team_id = {team_id: i for i, team_id in enumerate(team_ids)}
+        team_count = len(team_ids)
+
+        wins = [0] * team_count
+        losses = [0] * team_count
+        run_differentials = [0] * team_count
+        # head_to_head_wins[i][j]: wins of team i against team j
+        head_to_head_wins = [[0] * team_count for _ in range(team_count)]
+
+        for _, home_team_id, away_team_id, home_team_score, away_team_score in division_season['scored_games']:
+            home = index_by_team_id.get(home_team_id)
+            away = index_by_team_id.get(away_team_id)
+            for team, team_score, opponent_score in ((home, home_team_score, away_team_score), (away, away_team_score, home_team_score)):
+                if team is not None:
+                    run_differentials[team] += team_score - opponent_score
+                    if team_score > opponent_score:
+                        wins[team] += 1
+                    elif team_score < opponent_score:
+                        losses[team] += 1
+            if home is not None and away is not None:
+                if home_team_score > away_team_score:
+                    head_to_head_wins[home][away] += 1
+                elif away_team_score > home_team_score:
+                    head_to_head_wins[away][home] += 1
+
+        # home index, away index, probability that the home team wins; None for a team of another division
+        remaining_games = [(index_by_team_id.get(home_team_id), index_by_team_id.get(away_team_id), home_win_probability)
+                           for _, home_team_id, away_team_id, home_win_probability in division_season['remaining_games']]
+
+        seed_counts = [[0] * (team_count + 1) for _ in range(team_count)]
+        teams = list(range(team_count))
+
+        for _ in range(simulations):
+
+            simulated_wins = wins[:]
+            simulated_losses = losses[:]
+            simulated_run_differentials = run_differentials[:]
+            head_to_head_results: list[tuple[int, int]] = []
+
+            for home, away, home_win_probability in remaining_games:
+                margin = draw_margin(margins)
+                if draw() < home_win_probability:
+                    winner, loser = home, away
+                else:
+                    winner, loser = away, home
+
+                if winner is not None:
+                    simulated_wins[winner] += 1
+                    simulated_run_differentials[winner] += margin
+                if loser is not None:
+                    simulated_losses[loser] += 1
+                    simulated_run_differentials[loser] -= margin
+                if winner is not None and loser is not None:
+                    head_to_head_wins[winner][loser] += 1
+                    head_to_head_results.append((winner, loser))
+
+            seed = 1
+            for group in _rank(season['parameters'], teams, simulated_wins, simulated_losses, simulated_run_differentials, head_to_head_wins):
+                for team in group:
+                    seed_counts[team][seed] += 1
+                seed += len(group)
+
+            # take the simulated results back out so the matrix can be reused
+            for winner, loser in head_to_head_results:
+                head_to_head_wins[winner][loser] -= 1
+
+        for team, team_id in enumerate(team_ids):
+            seed_counts_by_team_id[team_id] = {
+                seed: count for seed, count in enumerate(seed_counts[team]) if count > 0}
+
+    return seed_counts_by_team_id
+
+
+def _rank(parameters: Sequence[custom_types.SeedingParameter.parameter], teams: list[int], wins: list[int], losses: list[int], run_differentials: list[int], head_to_head_wins: list[list[int]]) -> list[list[int]]:
+    """SeedingParameter.rank on the plain lists of _simulate_seasons, groups of tied team indices from highest to lowest seed"""
+
+    groups = [teams]
+    for parameter in parameters:
+        ranked_groups: list[list[int]] = []
+        for group in groups:
+            if len(group) == 1:
+                ranked_groups.append(group)
+                continue
+
+            if parameter == 'win_percentage':
+                values = {team: round(wins[team] / (wins[team] + losses[team]), 6) if wins[team] + losses[team] > 0 else 0.0
+                          for team in group}
+            elif parameter == 'run_differential':
+                values = {team: run_differentials[team] for team in group}
+            elif parameter == 'head_to_head':
+                # the ranking only counts when every team played the others of the group equally often
+                games = set()
+                values = {}
+                for team in group:
+                    team_wins = sum(head_to_head_wins[team][opponent]
+                                    for opponent in group if opponent != team)
+                    team_losses = sum(head_to_head_wins[opponent][team]
+                                      for opponent in group if opponent != team)
+                    games.add(team_wins + team_losses)
+                    values[team] = team_wins - team_losses
+                if len(games) != 1 or games == {0}:
+                    ranked_groups.append(group)
+                    continue
+            else:
+                ranked_groups.append(group)
+                continue
+
+            teams_by_value: dict[float, list[int]] = {}
+            for team in group:
+                teams_by_value.setdefault(values[team], []).append(team)
+            for value in sorted(teams_by_value, reverse=True):
+                ranked_groups.append(teams_by_value[value])
+
+        groups = ranked_groups
+
+    return groups
+
+
+def _record_result(team_statistics_by_team_id: dict[custom_types.Team.id, team_schema.TeamStatisticsExport], scored_game: ScoredGame) -> None:
+    """same bookkeeping as Team.calculate_statistics, for the teams present in team_statistics_by_team_id"""
+
+    game_id, home_team_id, away_team_id, home_team_score, away_team_score = scored_game
+
+    for team_id, team_score, opponent_score in ((home_team_id, home_team_score, away_team_score), (away_team_id, away_team_score, home_team_score)):
+        if team_id in team_statistics_by_team_id:
+            team_statistics = team_statistics_by_team_id[team_id]
+            team_statistics.run_differential += team_score - opponent_score
+            if team_score > opponent_score:
+                team_statistics.game_ids_won.add(game_id)
+            elif team_score < opponent_score:
+                team_statistics.game_ids_lost.add(game_id)
+
+
+class _SeedRangeSearch:
+    """
+    Finds the best and worst seed a team can still finish with by enumerating the win/loss outcomes of the remaining games.
+
+    When win percentage is the first seeding parameter the team's own games are fixed first, all wins for the best seed and
+    all losses for the worst. Winning a game instead of losing it raises the team's win percentage and lowers its
+    opponent's, so every team level with or ahead of it after the win was strictly ahead of it after the loss: its seed
+    cannot get worse. The win-count bounds of the other teams are then used to skip games that cannot move the team and to
+    prune branches that cannot beat the best scenario found so far. With any other first parameter nothing is fixed or
+    pruned, a win can cost a team its head to head tiebreak, and every outcome is enumerated up to the node and time limits.
+    Margins of future games are free, so run differential cannot separate teams that still have games to play.
+
+    Remaining games are only ever won or lost, like in _simulate_seasons. A tie counts as neither a win nor a loss, so a tied
+    game can leave teams level that no decided result would, and a team can then finish outside of its range.
+    """
+
+    def __init__(self, division_season: DivisionSeason, parameters: Sequence[custom_types.SeedingParameter.parameter], team_id: custom_types.Team.id, node_limit: int, time_limit: float):
+
+        self.team_id = team_id
+        self.team_ids = division_season['team_ids']
+        self.parameters = parameters
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.nodes = 0
+        self.deadline = 0.0
+        self.stopped = False
+        self.bounded = len(parameters) > 0 and parameters[0] == 'win_percentage'
+
+        self.head_to_head_matrix = seeding_parameter_service.HeadToHeadMatrix(
+            self.team_ids)
+        self.team_statistics_by_team_id = {
+            team_id: team_schema.TeamStatisticsExport.model_construct(
+                run_differential=0, game_ids_won=set(), game_ids_lost=set())
+            for team_id in self.team_ids
+        }
+        for scored_game in division_season['scored_games']:
+            self.head_to_head_matrix.record(*scored_game[1:])
+            _record_result(self.team_statistics_by_team_id, scored_game)
+
+        self.remaining_games = [(game_id, home_team_id, away_team_id) for game_id, home_team_id,
+                                away_team_id, _ in division_season['remaining_games']]
+        self.games_remaining_by_team_id = {
+            team_id: 0 for team_id in self.team_ids}
+        for game_id, home_team_id, away_team_id in self.remaining_games:
+            for game_team_id in (home_team_id, away_team_id):
+                if game_team_id in self.games_remaining_by_team_id:
+                    self.games_remaining_by_team_id[game_team_id] += 1
+
+        self.open_run_differential_team_ids = {
+            team_id for team_id, games_remaining in self.games_remaining_by_team_id.items() if games_remaining > 0}
+
+    def win_percentage_bounds(self, team_id: custom_types.Team.id) -> tuple[float, float]:
+        """lowest and highest win percentage the team can still finish with, rounded like SeedingParameter.win_percentage"""
+
+        team_statistics = self.team_statistics_by_team_id[team_id]
+        wins = len(team_statistics.game_ids_won)
+        games = wins + len(team_statistics.game_ids_lost) + \
+            self.games_remaining_by_team_id[team_id]
+        if games == 0:
+            return (0.0, 0.0)
+        return (round(wins / games, 6), round((wins + self.games_remaining_by_team_id[team_id]) / games, 6))
+
+    def set_result(self, game: tuple[custom_types.Game.id, custom_types.Team.id, custom_types.Team.id], home_team_wins: bool, count: int = 1) -> None:
+        """decide a remaining game, count=-1 takes the decision back"""
+
+        game_id, home_team_id, away_team_id = game
+        scored_game: ScoredGame = (game_id, home_team_id, away_team_id,
+                                   1 if home_team_wins else 0, 0 if home_team_wins else 1)
+
+        self.head_to_head_matrix.record(*scored_game[1:], count=count)
+        winner_id, loser_id = (home_team_id, away_team_id) if home_team_wins else (
+            away_team_id, home_team_id)
+
+        if winner_id in self.team_statistics_by_team_id:
+            if count > 0:
+                self.team_statistics_by_team_id[winner_id].game_ids_won.add(
+                    game_id)
+            else:
+                self.team_statistics_by_team_id[winner_id].game_ids_won.discard(
+                    game_id)
+            self.games_remaining_by_team_id[winner_id] -= count
+
+        if loser_id in self.team_statistics_by_team_id:
+            if count > 0:
+                self.team_statistics_by_team_id[loser_id].game_ids_lost.add(
+                    game_id)
+            else:
+                self.team_statistics_by_team_id[loser_id].game_ids_lost.discard(
+                    game_id)
+            self.games_remaining_by_team_id[loser_id] -= count
+
+    def seed_range(self) -> tuple[custom_types.Team.seed, custom_types.Team.seed]:
+        """seeds the team can finish with once every remaining game is decided"""
+
+        teams_ahead = 0
+        group = set(self.team_ids)
+
+        for parameter in self.parameters:
+            if len(group) == 1:
+                break
+            if parameter == 'run_differential' and not group.isdisjoint(self.open_run_differential_team_ids):
+                return (teams_ahead + 1, teams_ahead + len(group))
+
+            for ranked_group in seeding_parameter_service.SeedingParameter.rank_by_seeding_parameter(parameter, group, self.team_statistics_by_team_id, self.head_to_head_matrix):
+                if self.team_id in ranked_group:
+                    group = ranked_group
+                    break
+                teams_ahead += len(ranked_group)
+
+        # teams still tied after every seeding parameter share a seed
+        return (teams_ahead + 1, teams_ahead + 1)
+
+    def search(self, best: bool) -> tuple[custom_types.Team.seed, bool]:
+        """returns the best (or worst) seed, and whether every scenario was covered within the node and time limits"""
+
+        own_games = [game for game in self.remaining_games if self.bounded and self.team_id in game[1:]]
+        other_games = [
+            game for game in self.remaining_games if game not in own_games]
+
+        for game in own_games:
+            self.set_result(game, (game[1] == self.team_id) == best)
+
+        team_win_percentage = self.win_percentage_bounds(self.team_id)[0]
+        incumbent: custom_types.Team.seed | None = None
+        self.nodes = 0
+        self.deadline = time.monotonic() + self.time_limit
+        self.stopped = False
+
+        def settled(team_id: custom_types.Team.id) -> bool:
+            if team_id not in self.team_statistics_by_team_id:
+                return True
+            lowest, highest = self.win_percentage_bounds(team_id)
+            return lowest > team_win_percentage or highest < team_win_percentage
+
+        def danger(team_id: custom_types.Team.id) -> tuple[float, float]:
+            if team_id not in self.team_statistics_by_team_id:
+                return (-1.0, -1.0)
+            return self.win_percentage_bounds(team_id)
+
+        def bound() -> custom_types.Team.seed:
+            if best:
+                return 1 + sum(1 for team_id in self.team_ids if team_id != self.team_id and self.win_percentage_bounds(team_id)[0] > team_win_percentage)
+            return 1 + sum(1 for team_id in self.team_ids if team_id != self.team_id and self.win_percentage_bounds(team_id)[1] >= team_win_percentage)
+
+        def visit(i: int) -> None:
+            nonlocal incumbent
+
+            if self.stopped:
+                return
+            self.nodes += 1
+            if self.nodes > self.node_limit or (self.nodes % 256 == 0 and time.monotonic() > self.deadline):
+                self.stopped = True
+                return
+
+            if self.bounded and incumbent is not None and (bound() >= incumbent if best else bound() <= incumbent):
+                return
+
+            if i == len(other_games):
+                lowest, highest = self.seed_range()
+                seed = lowest if best else highest
+                if incumbent is None or (seed < incumbent if best else seed > incumbent):
+                    incumbent = seed
+                return
+
+            game = other_games[i]
+            if self.bounded and settled(game[1]) and settled(game[2]):
+                # neither team can end up next to the team, the result does not matter
+                outcomes = [True]
+            else:
+                # try the result that keeps the more dangerous team away from the team first
+                home_is_ahead = danger(game[1]) >= danger(game[2])
+                outcomes = [not home_is_ahead,
+                            home_is_ahead] if best else [home_is_ahead, not home_is_ahead]
+
+            for home_team_wins in outcomes:
+                self.set_result(game, home_team_wins)
+                visit(i + 1)
+                self.set_result(game, home_team_wins, count=-1)
+
+        visit(0)
+
+        for game in own_games:
+            self.set_result(game, (game[1] == self.team_id) == best, count=-1)
+
+        if incumbent is None:
+            # stopped before deciding every game once
+            return (1 if best else len(self.team_ids), False)
+        return (incumbent, not self.stopped)
+
+    def deciding_game_ids(self) -> list[custom_types.Game.id]:
+        """remaining games involving the team or a team that can still finish level with it on win percentage"""
+
+        if not self.bounded:
+            return [game[0] for game in self.remaining_games]
+
+        lowest, highest = self.win_percentage_bounds(self.team_id)
+        contender_ids = {team_id for team_id in self.team_ids if team_id == self.team_id or not (
+            self.win_percentage_bounds(team_id)[0] > highest or self.win_percentage_bounds(team_id)[1] < lowest)}
+
+        return [game[0] for game in self.remaining_games if game[1] in contender_ids or game[2] in contender_ids]
+
+
+def _find_seed_ranges(division_season: DivisionSeason, parameters: Sequence[custom_types.SeedingParameter.parameter], node_limit: int, time_limit: float) -> SeedRangesByTeamId:
+    """runs in the process pool, best and worst possible seed of every team in a division, in about `time_limit` seconds at most"""
+
+    seed_ranges: SeedRangesByTeamId = {}
+    for team_id in division_season['team_ids']:
+        seed_range_search = _SeedRangeSearch(
+            division_season, parameters, team_id, node_limit, time_limit / (2 * len(division_season['team_ids'])))
+        best_seed, best_exact = seed_range_search.search(best=True)
+        worst_seed, worst_exact = seed_range_search.search(best=False)
+
+        seed_ranges[team_id] = {
+            'best_seed': best_seed,
+            'worst_seed': worst_seed,
+            'deciding_game_ids': [] if best_seed == worst_seed else seed_range_search.deciding_game_ids(),
+            'exact': best_exact and worst_exact,
+        }
+
+    return seed_ranges
+
+
+class Standings:
+
+    _ODDS_CACHE: ClassVar[cache.VersionedCache[None,
+                                               SeedOdds]] = cache.VersionedCache()
+    _ODDS_LOCK: ClassVar[asyncio.Lock | None] = None
+    # the last season simulated and its odds, writes that leave the season unchanged (seeds, names, ...) reuse them
+    _ODDS_SEASON: ClassVar[tuple[Season, SeedOdds] | None] = None
+    _SEED_RANGES_CACHE: ClassVar[cache.VersionedCache[None,
+                                                      SeedRangesByTeamId]] = cache.VersionedCache()
+    _SEED_RANGES_SEASON: ClassVar[tuple[Season, SeedRangesByTeamId] | None] = None
+    _SEED_RANGE_NODE_LIMIT: ClassVar[int] = 100000
+    # seconds a division's search may take, the divisions are searched in parallel in the process pool
+    _SEED_RANGE_TIME_LIMIT: ClassVar[float] = 0.5
+    _PROCESS_POOL: ClassVar[ProcessPoolExecutor | None] = None
+
+    @classmethod
+    def process_pool(cls) -> ProcessPoolExecutor:
+        if cls._PROCESS_POOL is None:
+            cls._PROCESS_POOL = ProcessPoolExecutor(
+                max_workers=max(config.ODDS_PROCESSES, 1),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return cls._PROCESS_POOL
+
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls._PROCESS_POOL is not None:
+            cls._PROCESS_POOL.shutdown(cancel_futures=True)
+            cls._PROCESS_POOL = None
+
+    @classmethod
+    async def fetch_season(cls, session: AsyncSession) -> Season:
+        """collects everything the simulations need into plain, picklable data"""
+
+        # ordered, the same data always gives an equal season
+        teams = (await session.exec(select(team_service.Team._MODEL).order_by(col(team_service.Team._MODEL.id).asc()))).all()
+        games = (await session.exec(select(game_service.Game._MODEL).where(
+            col(game_service.Game._MODEL.home_team_id).is_not(None) &
+            col(game_service.Game._MODEL.away_team_id).is_not(None)
+        ).order_by(col(game_service.Game._MODEL.id).asc()))).all()
+        seeding_parameters = (await session.exec(select(seeding_parameter_service.SeedingParameter._MODEL).order_by(
+            col(seeding_parameter_service.SeedingParameter._MODEL.rank).asc()
+        ))).all()
+
+        team_ids_by_division_id: dict[custom_types.Division.id,
+                                      list[custom_types.Team.id]] = {}
+        for team in teams:
+            if team.division_id is not None:
+                team_ids_by_division_id.setdefault(
+                    team.division_id, []).append(team.id)
+
+        scored_games: list[ScoredGame] = []
+        unscored_games: list[tuple[custom_types.Game.id,
+                                   custom_types.Team.id, custom_types.Team.id]] = []
+        for game in games:
+            if game.home_team_id is None or game.away_team_id is None:
+                continue
+            if game.home_team_score is None or game.away_team_score is None:
+                unscored_games.append(
+                    (game.id, game.home_team_id, game.away_team_id))
+            else:
+                scored_games.append((game.id, game.home_team_id, game.away_team_id,
+                                    game.home_team_score, game.away_team_score))
+
+        wins: dict[custom_types.Team.id, int] = {}
+        losses: dict[custom_types.Team.id, int] = {}
+        for game_id, home_team_id, away_team_id, home_team_score, away_team_score in scored_games:
+            if home_team_score > away_team_score:
+                wins[home_team_id] = wins.get(home_team_id, 0) + 1
+                losses[away_team_id] = losses.get(away_team_id, 0) + 1
+            elif away_team_score > home_team_score:
+                wins[away_team_id] = wins.get(away_team_id, 0) + 1
+                losses[home_team_id] = losses.get(home_team_id, 0) + 1
+
+        def strength(team_id: custom_types.Team.id) -> float:
+            return (wins.get(team_id, 0) + 1) / (wins.get(team_id, 0) + losses.get(team_id, 0) + 2)
+
+        divisions: list[DivisionSeason] = []
+        for team_ids in team_ids_by_division_id.values():
+            team_ids_set = set(team_ids)
+
+            remaining_games: list[RemainingGame] = []
+            for game_id, home_team_id, away_team_id in unscored_games:
+                if home_team_id in team_ids_set or away_team_id in team_ids_set:
+                    home_strength = strength(home_team_id)
+                    away_strength = strength(away_team_id)
+                    remaining_games.append((game_id, home_team_id, away_team_id, home_strength * (1 - away_strength) / (
+                        home_strength * (1 - away_strength) + away_strength * (1 - home_strength))))
+
+            divisions.append({
+                'team_ids': team_ids,
+                'scored_games': [scored_game for scored_game in scored_games if scored_game[1] in team_ids_set or scored_game[2] in team_ids_set],
+                'remaining_games': remaining_games,
+            })
+
+        margins = [abs(scored_game[3] - scored_game[4])
+                   for scored_game in scored_games if scored_game[3] != scored_game[4]]
+
+        return {
+            'divisions': divisions,
+            'parameters': [seeding_parameter.parameter for seeding_parameter in seeding_parameters],
+            'margins': margins if len(margins) > 0 else list(range(1, 11)),
+        }
+
+    @classmethod
+    async def simulate_seed_odds(cls, season: Season, simulations: int, random_seed: int | None = None) -> SeedOdds:
+        """split the simulations across the process pool and combine the seed counts
+        the same season, simulations, random_seed and ODDS_PROCESSES always give the same odds, a random seed is drawn if
+        none is given"""
+
+        processes = max(config.ODDS_PROCESSES, 1)
+        simulations_per_process = [simulations // processes +
+                                   (1 if i < simulations % processes else 0) for i in range(processes)]
+
+        loop = asyncio.get_running_loop()
+        if random_seed is None:
+            random_seed = random.randrange(2**32)
+        results: Sequence[SeedCountsByTeamId] = await asyncio.gather(*[
+            loop.run_in_executor(cls.process_pool(), functools.partial(
+                _simulate_seasons, season, process_simulations, random_seed + i))
+            for i, process_simulations in enumerate(simulations_per_process) if process_simulations > 0
+        ])
+
+        seed_counts_by_team_id: SeedCountsByTeamId = {}
+        for result in results:
+            for team_id, seed_counts in result.items():
+                combined_seed_counts = seed_counts_by_team_id.setdefault(
+                    team_id, {})
+                for seed, count in seed_counts.items():
+                    combined_seed_counts[seed] = combined_seed_counts.get(
+                        seed, 0) + count
+
+        return {
+            'simulations': simulations,
+            'seed_probabilities': {
+                team_id: {seed: count / simulations for seed,
+                          count in sorted(seed_counts.items())}
+                for team_id, seed_counts in seed_counts_by_team_id.items()
+            }
+        }
+
+    @classmethod
+    async def seed_odds(cls, session: AsyncSession) -> SeedOdds:
+        """returns the seed odds, only simulating again once a score, a team's division or a seeding parameter has changed"""
+
+        if cls._ODDS_LOCK is None:
+            cls._ODDS_LOCK = asyncio.Lock()
+
+        async with cls._ODDS_LOCK:
+            seed_odds = cls._ODDS_CACHE.get(None)
+            if seed_odds is None:
+                version = cache.data_version()
+                season = await cls.fetch_season(session)
+                if cls._ODDS_SEASON is not None and cls._ODDS_SEASON[0] == season:
+                    seed_odds = cls._ODDS_SEASON[1]
+                else:
+                    seed_odds = await cls.simulate_seed_odds(season, config.ODDS_SIMULATIONS)
+                    cls._ODDS_SEASON = (season, seed_odds)
+                cls._ODDS_CACHE.set(None, seed_odds, version)
+
+        return seed_odds
+
+    @classmethod
+    async def seed_ranges(cls, session: AsyncSession) -> SeedRangesByTeamId:
+        """returns the best and worst seed every team can still finish with if no remaining game ends in a tie
+        every division is searched in the process pool, within _SEED_RANGE_TIME_LIMIT seconds, the ranges of the teams of a
+        division whose search ran out of time are valid but not `exact`"""
+
+        seed_ranges = cls._SEED_RANGES_CACHE.get(None)
+        if seed_ranges is None:
+            version = cache.data_version()
+            season = await cls.fetch_season(session)
+
+            if cls._SEED_RANGES_SEASON is not None and cls._SEED_RANGES_SEASON[0] == season:
+                seed_ranges = cls._SEED_RANGES_SEASON[1]
+            else:
+                loop = asyncio.get_running_loop()
+                results: Sequence[SeedRangesByTeamId] = await asyncio.gather(*[
+                    loop.run_in_executor(cls.process_pool(), functools.partial(
+                        _find_seed_ranges, division_season, season['parameters'], cls._SEED_RANGE_NODE_LIMIT, cls._SEED_RANGE_TIME_LIMIT))
+                    for division_season in season['divisions']
+                ])
+                seed_ranges = {}
+                for result in results:
+                    seed_ranges.update(result)
+                cls._SEED_RANGES_SEASON = (season, seed_ranges)
+            cls._SEED_RANGES_CACHE.set(None, seed_ranges, version)
+
+        return seed_ranges
@@ -1,11 +1,12 @@
-from sqlmodel import select, col
+from sqlmodel import select, col, update
 from sqlmodel.ext.asyncio.session import AsyncSession
-from uirpsoftball import custom_types, config
+from typing import ClassVar
+from uirpsoftball import custom_types, config, cache, request_context
 from uirpsoftball.services import base, game as game_service, seeding_parameter as seeding_parameter_service
-from uirpsoftball.models.tables import Team as TeamTable, SeedingParameter as SeedingParameterTable
+from uirpsoftball.models.tables import Team as TeamTable, SeedingParameter as SeedingParameterTable, Game as GameTable
 from uirpsoftball.schemas import team as team_schema, pagination as pagination_schema
 
-from collections.abc import Sequence
+from collections.abc import Sequence, Collection
 
 
 class Team(
@@ -21,15 +22,21 @@ class Team(
     ]
 ):
     _MODEL = TeamTable
+    _FILTERS = {
+        'division_id': {'columns': ['division_id'], 'operator': 'eq'},
+    }
+
+    _HEAD_TO_HEAD_MATRICES: ClassVar[cache.VersionedCache[custom_types.Division.id,
+                                                          seeding_parameter_service.HeadToHeadMatrix]] = cache.VersionedCache()
 
     @classmethod
     async def id_from_slug(cls, session: AsyncSession, slug: custom_types.Team.slug) -> custom_types.Team.id | None:
 
-        team = await cls.fetch_one(session, select(cls._MODEL).where(cls._MODEL.slug == slug))
-        if team is None:
+        team_ids = await cls.fetch_many_ids(session, pagination_schema.Pagination(limit=1, offset=0), where=[col(cls._MODEL.slug) == slug])
+        if len(team_ids) == 0:
             return None
         else:
-            return cls.model_id(team)
+            return team_ids[0]
 
     @staticmethod
     def is_real(team_id: custom_types.Team.id) -> bool:
@@ -46,15 +53,25 @@ class Team(
         )
 
     @classmethod
-    async def rank_by_division(cls, session: AsyncSession, division_id: custom_types.Division.id, pagination: pagination_schema.Pagination) -> Sequence[custom_types.Team.id]:
+    async def rank_by_divisions(cls, session: AsyncSession, division_ids: Collection[custom_types.Division.id]) -> dict[custom_types.Division.id, list[custom_types.Team.id]]:
+        """returns the team ids of every division ordered by seed, read with one query ordered by (division_id, seed, id)
+        every team is read, a page would cut the divisions that sort last short"""
+
+        team_ids_ranked_by_division: dict[custom_types.Division.id, list[custom_types.Team.id]] = {
+            division_id: [] for division_id in division_ids}
 
-        teams = await cls.fetch_many_by_division(session, division_id, pagination)
-        ranked_teams = sorted(
-            teams,
-            key=lambda team: team.seed
+        rows = await cls.fetch_many_columns(
+            session,
+            [col(cls._MODEL.division_id), col(cls._MODEL.id)],
+            None,
+            where=[col(cls._MODEL.division_id).in_(division_ids)],
+            order_by=[col(cls._MODEL.division_id).asc(), col(
+                cls._MODEL.seed).asc(), col(cls._MODEL.id).asc()],
         )
+        for division_id, team_id in rows:
+            team_ids_ranked_by_division[division_id].append(team_id)
 
-        return [ranked_team.id for ranked_team in ranked_teams]
+        return team_ids_ranked_by_division
 
     @classmethod
     async def calculate_statistics(cls, session: AsyncSession, team_ids: Sequence[custom_types.Team.id]) -> dict[custom_types.Team.id, team_schema.TeamStatisticsExport]:
@@ -69,89 +86,149 @@ class Team(
                 game_ids_lost=set()
             )
 
+        # every game of the teams, a page would drop results from the statistics
         games = await game_service.Game.fetch_many(
             session,
-            pagination=pagination_schema.Pagination(limit=1000, offset=0),
+            pagination=None,
             query=select(game_service.Game._MODEL).where(
                 col(game_service.Game._MODEL.home_team_id).in_(team_ids) |
                 col(game_service.Game._MODEL.away_team_id).in_(team_ids)
             ).where(col(game_service.Game._MODEL.away_team_score).is_not(None) & col(game_service.Game._MODEL.home_team_score).is_not(None))
         )
 
-        for game in games:
-            if game.home_team_id is not None and game.away_team_id is not None and game.home_team_score is not None and game.away_team_score is not None:
+        with request_context.span('stats'):
+            for game in games:
+                if game.home_team_id is not None and game.away_team_id is not None and game.home_team_score is not None and game.away_team_score is not None:
 
-                if game.home_team_id in statistics_by_team_id:
-                    statistics_by_team_id[game.home_team_id].run_differential += game.home_team_score - \
-                        game.away_team_score
+                    if game.home_team_id in statistics_by_team_id:
+                        statistics_by_team_id[game.home_team_id].run_differential += game.home_team_score - \
+                            game.away_team_score
 
-                    if game.home_team_score > game.away_team_score:
-                        statistics_by_team_id[game.home_team_id].game_ids_won.add(
-                            game.id)
-                    if game.home_team_score < game.away_team_score:
-                        statistics_by_team_id[game.home_team_id].game_ids_lost.add(
-                            game.id)
+                        if game.home_team_score > game.away_team_score:
+                            statistics_by_team_id[game.home_team_id].game_ids_won.add(
+                                game.id)
+                        if game.home_team_score < game.away_team_score:
+                            statistics_by_team_id[game.home_team_id].game_ids_lost.add(
+                                game.id)
 
-                if game.away_team_id in statistics_by_team_id:
-                    statistics_by_team_id[game.away_team_id].run_differential += game.away_team_score - \
-                        game.home_team_score
+                    if game.away_team_id in statistics_by_team_id:
+                        statistics_by_team_id[game.away_team_id].run_differential += game.away_team_score - \
+                            game.home_team_score
 
-                    if game.away_team_score > game.home_team_score:
-                        statistics_by_team_id[game.away_team_id].game_ids_won.add(
-                            game.id)
-                    if game.away_team_score < game.home_team_score:
-                        statistics_by_team_id[game.away_team_id].game_ids_lost.add(
-                            game.id)
+                        if game.away_team_score > game.home_team_score:
+                            statistics_by_team_id[game.away_team_id].game_ids_won.add(
+                                game.id)
+                        if game.away_team_score < game.home_team_score:
+                            statistics_by_team_id[game.away_team_id].game_ids_lost.add(
+                                game.id)
 
         return statistics_by_team_id
 
     @classmethod
-    async def update_seeds(cls, session: AsyncSession, division_id: custom_types.Division.id):
-        teams = await cls.fetch_many_by_division(session, division_id, pagination_schema.Pagination(limit=1000, offset=0))
-        team_statistics_by_team_id = await cls.calculate_statistics(session, [team.id for team in teams])
-        seeding_parameters = await seeding_parameter_service.SeedingParameter.fetch_many(
-            session,
-            pagination=pagination_schema.Pagination(limit=1000, offset=0),
-            query=select(seeding_parameter_service.SeedingParameter._MODEL).order_by(
-                col(SeedingParameterTable.rank).asc()
-            )
-        )
+    async def fetch_head_to_head_matrices(cls, session: AsyncSession, team_ids_by_division: dict[custom_types.Division.id, Sequence[custom_types.Team.id]]) -> dict[custom_types.Division.id, seeding_parameter_service.HeadToHeadMatrix]:
+        """returns the head to head matrix of every division, building the missing ones once per data version from one
+        query of the scored games between their teams"""
+
+        head_to_head_matrices: dict[custom_types.Division.id,
+                                    seeding_parameter_service.HeadToHeadMatrix] = {}
+        for division_id in team_ids_by_division:
+            head_to_head_matrix = cls._HEAD_TO_HEAD_MATRICES.get(division_id)
+            if head_to_head_matrix is not None:
+                head_to_head_matrices[division_id] = head_to_head_matrix
+
+        missing_division_ids = [
+            division_id for division_id in team_ids_by_division if division_id not in head_to_head_matrices]
+        if len(missing_division_ids) > 0:
+            version = cache.data_version()
+
+            team_ids = [team_id for division_id in missing_division_ids
+                        for team_id in team_ids_by_division[division_id]]
+            games = (await session.exec(select(game_service.Game._MODEL).where(
+                col(game_service.Game._MODEL.home_team_id).in_(team_ids) &
+                col(game_service.Game._MODEL.away_team_id).in_(team_ids)
+            ).where(col(game_service.Game._MODEL.away_team_score).is_not(None) & col(game_service.Game._MODEL.home_team_score).is_not(None)))).all()
 
-        teams_by_id: dict[custom_types.Team.id, TeamTable] = {
-            team.id: team for team in teams}
+            with request_context.span('stats'):
+                for division_id in missing_division_ids:
+                    # games between teams of different divisions are ignored by every matrix
+                    head_to_head_matrices[division_id] = seeding_parameter_service.HeadToHeadMatrix.from_games(
+                        team_ids_by_division[division_id], games)
+                    cls._HEAD_TO_HEAD_MATRICES.set(
+                        division_id, head_to_head_matrices[division_id], version)
 
-        # Reset all seeds to 1 before re-ranking
-        for team in teams:
-            team.seed = 1
+        return head_to_head_matrices
 
-        for seeding_parameter in seeding_parameters:
+    @classmethod
+    def head_to_head_matrices(cls) -> tuple[cache.DataVersion, dict[custom_types.Division.id, seeding_parameter_service.HeadToHeadMatrix]]:
+        """returns the data version and the head to head matrices built for it, read them before writing games to apply
+        the changes with update_head_to_head_matrices"""
 
-            team_ids_by_seeds: dict[custom_types.Team.seed,
-                                    set[custom_types.Team.id]] = {}
+        return cls._HEAD_TO_HEAD_MATRICES.entries()
 
-            # Group teams by their seed
-            for team in teams:
-                seed = team.seed
-                if seed not in team_ids_by_seeds:
-                    team_ids_by_seeds[seed] = set()
-                team_ids_by_seeds[seed].add(team.id)
+    @classmethod
+    def update_head_to_head_matrices(cls, version_before: cache.DataVersion, head_to_head_matrices: dict[custom_types.Division.id, seeding_parameter_service.HeadToHeadMatrix], games_before: Sequence[GameTable], games_after: Sequence[GameTable]) -> None:
+        """apply changed game results to the matrices read with head_to_head_matrices before the write, which keeps them for
+        the data version the write bumped to; they are rebuilt instead when another write, from any process, came in between"""
+
+        version = cache.data_version()
+        if version == version_before + 1:
+            for head_to_head_matrix in head_to_head_matrices.values():
+                for game_before, game_after in zip(games_before, games_after):
+                    head_to_head_matrix.update_game(game_before, game_after)
+        cls._HEAD_TO_HEAD_MATRICES.carry_over(
+            head_to_head_matrices, version_before, version)
 
-            sorted_seeds = sorted(team_ids_by_seeds)
+    @classmethod
+    async def calculate_seeds_many(cls, session: AsyncSession, division_ids: Collection[custom_types.Division.id]) -> dict[custom_types.Team.id, custom_types.Team.seed]:
+        """returns the seeds of the teams of every division, the teams, statistics, head to head matrices and parameters of
+        all divisions are read with one query each"""
+
+        team_ids_by_division = await cls.rank_by_divisions(session, division_ids)
+        team_statistics_by_team_id = await cls.calculate_statistics(
+            session, [team_id for team_ids in team_ids_by_division.values() for team_id in team_ids])
+        head_to_head_matrices = await cls.fetch_head_to_head_matrices(session, team_ids_by_division)
+        parameters = await seeding_parameter_service.SeedingParameter.fetch_many_scalars(
+            session,
+            col(SeedingParameterTable.parameter),
+            None,
+            order_by=[col(SeedingParameterTable.rank).asc()],
+        )
+
+        seeds_by_team_id: dict[custom_types.Team.id,
+                               custom_types.Team.seed] = {}
+        for division_id, team_ids in team_ids_by_division.items():
+            team_id_groups = seeding_parameter_service.SeedingParameter.rank(
+                parameters=parameters,
+                team_ids=team_ids,
+                team_statistics_by_team_id=team_statistics_by_team_id,
+                head_to_head_matrix=head_to_head_matrices[division_id]
+            )
+            seeds_by_team_id.update(
+                seeding_parameter_service.SeedingParameter.seeds_from_groups(team_id_groups))
 
-            for sorted_seed in sorted_seeds:
-                if len(team_ids_by_seeds[sorted_seed]) > 1:
-                    # only rank teams that need differentiation
+        return seeds_by_team_id
 
-                    seeding_parameter_service.SeedingParameter.rank_by_seeding_parameter(
-                        session=session,
-                        seeding_parameter=seeding_parameter,
-                        teams_by_id={
-                            team_id: teams_by_id[team_id] for team_id in team_ids_by_seeds[sorted_seed]
-                        },
-                        team_statistics_by_team_id={
-                            team_id: team_statistics_by_team_id[team_id] for team_id in team_ids_by_seeds[sorted_seed]
-                        }
-                    )
+    @classmethod
+    async def calculate_seeds(cls, session: AsyncSession, division_id: custom_types.Division.id) -> dict[custom_types.Team.id, custom_types.Team.seed]:
+        return await cls.calculate_seeds_many(session, [division_id])
+
+    @classmethod
+    async def update_seeds_many(cls, session: AsyncSession, division_ids: Collection[custom_types.Division.id]):
+        """reseeds the divisions, writing every seed with one executemany and one commit"""
 
-        session.add_all(teams)
+        seeds_by_team_id = await cls.calculate_seeds_many(session, division_ids)
+        version_before, head_to_head_matrices = cls.head_to_head_matrices()
+
+        if len(seeds_by_team_id) > 0:
+            await session.exec(update(cls._MODEL), params=[
+                {'id': team_id, 'seed': seed} for team_id, seed in seeds_by_team_id.items()])
         await session.commit()
+        version = cache.bump_data_version()
+
+        # the seeds are not part of the head to head results, the matrices stay valid
+        cls._HEAD_TO_HEAD_MATRICES.carry_over(
+            head_to_head_matrices, version_before, version)
+
+    @classmethod
+    async def update_seeds(cls, session: AsyncSession, division_id: custom_types.Division.id):
+        await cls.update_seeds_many(session, [division_id])
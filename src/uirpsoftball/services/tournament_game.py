@@ -1,6 +1,8 @@
-from sqlmodel import select
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+from collections.abc import Collection
 
-from uirpsoftball import custom_types, config
+from uirpsoftball import custom_types
 from uirpsoftball.models.tables import TournamentGame as TournamentGameTable
 from uirpsoftball.services import base
 from uirpsoftball.schemas import tournament_game as tournament_game_schema, pagination as pagination_schema
@@ -28,30 +30,38 @@ class TournamentGame(
         return select(cls._MODEL).where(cls._MODEL.game_id == id)
 
     @classmethod
-    async def get_tournament_game_details(cls):
+    def _id_column(cls):
+        return cls._MODEL.game_id
 
-        async with config.ASYNC_SESSIONMAKER() as session:
+    @classmethod
+    async def get_tournament_game_details(cls, session: AsyncSession, game_ids: Collection[custom_types.Game.id] | None = None):
+        """tournament games by tournament, bracket and round, only those of `game_ids` if given"""
+
+        query = select(cls._MODEL)
+        if game_ids is not None:
+            query = query.where(col(cls._MODEL.game_id).in_(game_ids))
 
-            tournament_games = await cls.fetch_many(
-                session=session,
-                pagination=pagination_schema.Pagination(limit=1000, offset=0),
-            )
+        tournament_games = await cls.fetch_many(
+            session=session,
+            pagination=pagination_schema.Pagination(limit=1000, offset=0),
+            query=query,
+        )
 
-            d: TournamentGameDetails = {}
-            for tournament_game in tournament_games:
+        d: TournamentGameDetails = {}
+        for tournament_game in tournament_games:
 
-                if tournament_game.tournament_id not in d:
-                    d[tournament_game.tournament_id] = {}
+            if tournament_game.tournament_id not in d:
+                d[tournament_game.tournament_id] = {}
 
-                if tournament_game.bracket_id not in d[tournament_game.tournament_id]:
-                    d[tournament_game.tournament_id][tournament_game.bracket_id] = {
-                    }
+            if tournament_game.bracket_id not in d[tournament_game.tournament_id]:
+                d[tournament_game.tournament_id][tournament_game.bracket_id] = {
+                }
 
-                if tournament_game.round not in d[tournament_game.tournament_id][tournament_game.bracket_id]:
-                    d[tournament_game.tournament_id][tournament_game.bracket_id][tournament_game.round] = [
-                    ]
+            if tournament_game.round not in d[tournament_game.tournament_id][tournament_game.bracket_id]:
+                d[tournament_game.tournament_id][tournament_game.bracket_id][tournament_game.round] = [
+                ]
 
-                d[tournament_game.tournament_id][tournament_game.bracket_id][tournament_game.round].append(
-                    tournament_game_schema.TournamentGameExport.model_validate(tournament_game))
+            d[tournament_game.tournament_id][tournament_game.bracket_id][tournament_game.round].append(
+                tournament_game_schema.TournamentGameExport.model_validate(tournament_game))
 
-            return d
+        return d
@@ -17,3 +17,8 @@ class Visit(
     ]
 ):
     _MODEL = VisitTable
+    _FILTERS = {
+        'path': {'columns': ['path'], 'operator': 'eq'},
+        'datetime_from': {'columns': ['datetime'], 'operator': 'ge'},
+        'datetime_to': {'columns': ['datetime'], 'operator': 'lt'},
+    }
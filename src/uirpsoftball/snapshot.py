@@ -0,0 +1,268 @@
+from typing import TypedDict
+from pathlib import Path
+from collections.abc import Iterator
+import datetime as datetime_module
+import contextlib
+import tempfile
+import hashlib
+import sqlite3
+import struct
+import json
+import gzip
+import os
+
+"""
+Developer's Note:
+Consistent snapshots of the SQLite database while the server is running, and restores of them.
+
+A snapshot copies the database with SQLite's online backup API, a few hundred pages per step. Readers are never blocked
+and a write during the copy makes SQLite start over, so the copy is always one consistent state of the database. The
+copy is then compared page by page with the previous snapshot: only the pages that changed are written, gzip
+compressed, so a snapshot after a few score updates is a few kilobytes. The first snapshot, and any taken with full,
+holds every page.
+
+Page 1 starts with the database header, whose file change counter and version-valid-for number can move on a write
+without any row changing. They are left out of the hash of page 1, so a database whose pages are otherwise the same is
+"unchanged" and no snapshot is written. A new snapshot always holds page 1, so it restores to the exact header.
+
+Every snapshot is three files in the snapshot directory:
+- <name>.json, the manifest: the snapshot it builds on, the page size and count, and the SHA-256 of the pages file and
+  of the whole database it restores to
+- <name>.pages.gz, the changed pages, each a 4 byte page number followed by the page
+- <name>.hashes, a short hash of every page, only used to diff the next snapshot, restoring does not need it
+To move a database to another machine, copy the manifests and pages files it does not have yet and restore there.
+
+A restore rebuilds the database from the chain of snapshots in a temporary file, checks both checksums of every
+snapshot, then swaps it in with the backup API, which replaces the target in a single transaction: the server's
+connections see either the old or the new database, never a mix.
+"""
+
+BACKUP_PAGES_PER_STEP = 256
+PAGE_HASH_SIZE = 8
+_PAGE_NUMBER = struct.Struct('>I')
+# the file change counter and the version-valid-for number of the database header, offsets in page 1
+_HEADER_COUNTERS = ((24, 28), (92, 96))
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class SnapshotInfo(TypedDict):
+    name: str
+    created: str
+    base: str | None
+    page_size: int
+    page_count: int
+    changed_pages: int
+    database_sha256: str
+    pages_sha256: str
+    pages_size: int
+
+
+def manifest_path(directory: Path, name: str) -> Path:
+    return directory / (name + '.json')
+
+
+def pages_path(directory: Path, name: str) -> Path:
+    return directory / (name + '.pages.gz')
+
+
+def hashes_path(directory: Path, name: str) -> Path:
+    return directory / (name + '.hashes')
+
+
+def list_snapshots(directory: Path) -> list[SnapshotInfo]:
+    """returns the snapshots in `directory`, oldest first"""
+
+    if not directory.exists():
+        return []
+    return [json.loads(path.read_text()) for path in sorted(directory.glob('*.json'))]
+
+
+def load_info(directory: Path, name: str) -> SnapshotInfo:
+    path = manifest_path(directory, name)
+    if not path.exists():
+        raise SnapshotError('Snapshot {} not found in {}'.format(name, directory))
+    return json.loads(path.read_text())
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open('rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_pages(path: Path, page_size: int) -> Iterator[bytes]:
+    with path.open('rb') as file:
+        for page in iter(lambda: file.read(page_size), b''):
+            yield page
+
+
+def read_page_size(path: Path) -> int:
+    """from the database header, 1 stands for 65536"""
+
+    with path.open('rb') as file:
+        header = file.read(100)
+    if len(header) < 100 or not header.startswith(b'SQLite format 3\x00'):
+        raise SnapshotError('{} is not a SQLite database'.format(path))
+    page_size = struct.unpack('>H', header[16:18])[0]
+    return 65536 if page_size == 1 else page_size
+
+
+def page_hash(page_number: int, page: bytes) -> bytes:
+    """short hash of a page to diff snapshots, the counters of the database header are left out of page 1"""
+
+    if page_number == 1:
+        masked = bytearray(page)
+        for start, end in _HEADER_COUNTERS:
+            masked[start:end] = bytes(end - start)
+        page = bytes(masked)
+    return hashlib.blake2b(page, digest_size=PAGE_HASH_SIZE).digest()
+
+
+@contextlib.contextmanager
+def temporary_path(directory: Path, suffix: str) -> Iterator[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=directory, suffix=suffix)
+    os.close(fd)
+    path = Path(name)
+    try:
+        yield path
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def backup(source: Path, destination: Path) -> None:
+    """copies a consistent state of `source` into `destination` with the online backup API"""
+
+    source_connection = sqlite3.connect(
+        source.resolve().as_uri() + '?mode=ro', uri=True)
+    destination_connection = sqlite3.connect(destination)
+    try:
+        source_connection.backup(
+            destination_connection, pages=BACKUP_PAGES_PER_STEP)
+    finally:
+        destination_connection.close()
+        source_connection.close()
+
+
+def take(database: Path, directory: Path, full: bool = False) -> tuple[SnapshotInfo, bool]:
+    """snapshots `database` into `directory`, incremental on the latest snapshot unless `full`
+    returns the snapshot and whether it is new, nothing is written if no page changed apart from the header counters"""
+
+    if not database.exists():
+        raise SnapshotError('Database {} does not exist'.format(database))
+
+    snapshots = list_snapshots(directory)
+    base = snapshots[-1] if len(snapshots) > 0 and not full else None
+
+    with temporary_path(directory, '.db') as copy:
+        backup(database, copy)
+        page_size = read_page_size(copy)
+
+        base_hashes = b''
+        if base is not None and base['page_size'] == page_size and hashes_path(directory, base['name']).exists():
+            base_hashes = hashes_path(directory, base['name']).read_bytes()
+        else:
+            base = None
+
+        created = datetime_module.datetime.now(tz=datetime_module.timezone.utc)
+        name = created.strftime('%Y%m%dT%H%M%S%fZ')
+        database_digest = hashlib.sha256()
+        hashes = bytearray()
+        changed = False
+        changed_pages = 0
+        page_count = 0
+
+        with temporary_path(directory, '.pages.gz') as pages:
+            with gzip.open(pages, 'wb', compresslevel=6) as pages_file:
+                for page_count, page in enumerate(iter_pages(copy, page_size), start=1):
+                    database_digest.update(page)
+                    page_digest = page_hash(page_count, page)
+                    hashes += page_digest
+                    start = (page_count - 1) * PAGE_HASH_SIZE
+                    page_changed = base_hashes[start:start + PAGE_HASH_SIZE] != page_digest
+                    changed = changed or page_changed
+                    # page 1 whatever its hash, its header counters are part of the database checksum
+                    if page_changed or page_count == 1:
+                        pages_file.write(_PAGE_NUMBER.pack(page_count))
+                        pages_file.write(page)
+                        changed_pages += 1
+
+            if base is not None and not changed and page_count == base['page_count']:
+                return base, False
+
+            info: SnapshotInfo = {
+                'name': name,
+                'created': created.isoformat(),
+                'base': None if base is None else base['name'],
+                'page_size': page_size,
+                'page_count': page_count,
+                'changed_pages': changed_pages,
+                'database_sha256': database_digest.hexdigest(),
+                'pages_sha256': file_sha256(pages),
+                'pages_size': pages.stat().st_size,
+            }
+            os.replace(pages, pages_path(directory, name))
+
+    hashes_path(directory, name).write_bytes(bytes(hashes))
+    # written last, a snapshot without a manifest does not exist
+    manifest_path(directory, name).write_text(json.dumps(info, indent=2))
+    return info, True
+
+
+def chain(directory: Path, name: str) -> list[SnapshotInfo]:
+    """the snapshots `name` is built from, the full snapshot first"""
+
+    snapshots = [load_info(directory, name)]
+    while snapshots[-1]['base'] is not None:
+        snapshots.append(load_info(directory, snapshots[-1]['base']))
+    return list(reversed(snapshots))
+
+
+def rebuild(directory: Path, name: str, destination: Path) -> SnapshotInfo:
+    """writes the database of snapshot `name` to `destination`, checking every checksum on the way"""
+
+    snapshots = chain(directory, name)
+    with destination.open('wb') as database_file:
+        for info in snapshots:
+            pages = pages_path(directory, info['name'])
+            if not pages.exists():
+                raise SnapshotError(
+                    'Pages of snapshot {} are missing'.format(info['name']))
+            if file_sha256(pages) != info['pages_sha256']:
+                raise SnapshotError(
+                    'Pages of snapshot {} are corrupt'.format(info['name']))
+
+            page_size = info['page_size']
+            with gzip.open(pages, 'rb') as pages_file:
+                for header in iter(lambda: pages_file.read(_PAGE_NUMBER.size), b''):
+                    page_number = _PAGE_NUMBER.unpack(header)[0]
+                    database_file.seek((page_number - 1) * page_size)
+                    database_file.write(pages_file.read(page_size))
+            database_file.truncate(info['page_count'] * page_size)
+
+    target = snapshots[-1]
+    if file_sha256(destination) != target['database_sha256']:
+        raise SnapshotError(
+            'Snapshot {} does not restore to the database it was taken from'.format(name))
+    return target
+
+
+def restore(directory: Path, name: str, database: Path) -> SnapshotInfo:
+    """replaces the contents of `database` (created if missing) with snapshot `name` in one transaction"""
+
+    with temporary_path(directory, '.db') as rebuilt:
+        info = rebuild(directory, name, rebuilt)
+
+        source_connection = sqlite3.connect(rebuilt)
+        destination_connection = sqlite3.connect(database)
+        try:
+            source_connection.backup(destination_connection)
+        finally:
+            destination_connection.close()
+            source_connection.close()
+    return info
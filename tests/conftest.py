@@ -0,0 +1,40 @@
+from pathlib import Path
+from collections.abc import Callable
+import asyncio
+import pytest
+
+from benchmarks import league, run
+
+"""
+Developer's Note:
+The app reads its config once per process, so every test module shares one temporary config, with QUERY_BUDGET.MODE set
+to fail and few odds simulations, and one event loop. A module generates the league it needs with the `generate` fixture,
+which replaces the whole database and bumps the data version so nothing cached for the previous league is served.
+"""
+
+
+@pytest.fixture(scope='session')
+def runner(tmp_path_factory: pytest.TempPathFactory):
+
+    run.configure(Path(tmp_path_factory.mktemp('league')),
+                  query_budget_mode='fail', odds_simulations=200)
+    from uirpsoftball import config
+    from uirpsoftball.services import standings as standings_service
+
+    with asyncio.Runner() as runner:
+        yield runner
+        standings_service.Standings.shutdown()
+        runner.run(config.DB_READ_ASYNC_ENGINE.dispose())
+        runner.run(config.DB_ASYNC_ENGINE.dispose())
+
+
+@pytest.fixture(scope='session')
+def generate(runner: asyncio.Runner) -> Callable[..., None]:
+
+    from uirpsoftball import config, cache
+
+    def generate(size: league.LeagueSize = league.DEFAULT_LEAGUE_SIZE, seed: int = 0) -> None:
+        runner.run(league.generate(config.DB_ASYNC_ENGINE, size, seed))
+        cache.bump_data_version()
+
+    return generate
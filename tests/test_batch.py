@@ -0,0 +1,98 @@
+from collections.abc import Callable
+import asyncio
+import json
+import pytest
+
+from benchmarks import league
+
+PATHS = ['/pages/', '/pages/game/1/', '/pages/standings/', '/teams/1/', '/pages/team/team-2/']
+
+
+@pytest.fixture(scope='module', autouse=True)
+def default_league(generate: Callable[..., None]):
+    generate()
+
+
+async def post_batch(paths: list[str]) -> tuple[int, dict]:
+
+    from uirpsoftball import asgi_client
+    from uirpsoftball.app import app
+
+    response = await asgi_client.request(app, {
+        'method': 'POST',
+        'path': '/batch/',
+        'headers': {'content-type': 'application/json'},
+        'body': json.dumps({'requests': [{'path': path} for path in paths]}).encode(),
+    })
+    return response['status_code'], json.loads(response['body'])
+
+
+async def get(path: str) -> tuple[int, dict]:
+
+    from uirpsoftball import asgi_client
+    from uirpsoftball.app import app
+
+    response = await asgi_client.get(app, path)
+    return response['status_code'], json.loads(response['body'])
+
+
+def test_batch_responses_match_single_requests(runner: asyncio.Runner):
+
+    from uirpsoftball import cache
+
+    status_code, batch = runner.run(post_batch(PATHS))
+
+    assert status_code == 200
+    assert batch['consistent'] and batch['data_version'] == cache.data_version()
+    assert [(response['status_code'], response['body']) for response in batch['responses']] == [
+        runner.run(get(path)) for path in PATHS]
+
+
+def test_batch_gives_up_after_every_attempt_saw_a_write(runner: asyncio.Runner, monkeypatch: pytest.MonkeyPatch):
+
+    from uirpsoftball import cache
+    from uirpsoftball.routers import batch as batch_router
+
+    dispatch = batch_router.BatchRouter.dispatch
+    versions_seen: list[int] = []
+
+    async def dispatch_during_writes(app, sub_request):
+        versions_seen.append(cache.data_version())
+        response = await dispatch(app, sub_request)
+        cache.bump_data_version()
+        return response
+
+    monkeypatch.setattr(batch_router.BatchRouter, 'dispatch', dispatch_during_writes)
+    status_code, batch = runner.run(post_batch(PATHS[:2]))
+
+    assert status_code == 200
+    assert not batch['consistent']
+    assert len(versions_seen) == batch_router._ATTEMPTS * 2
+    # the version the last attempt started at, both of its sub-requests were dispatched before the first write
+    assert batch['data_version'] == versions_seen[-2]
+    assert [response['status_code'] for response in batch['responses']] == [200, 200]
+
+
+def test_batch_size_is_capped(runner: asyncio.Runner):
+
+    from uirpsoftball.routers import batch as batch_router
+
+    # a full batch of pages runs at once, more sub-requests than the read pool has connections
+    status_code, batch = runner.run(post_batch(['/pages/'] * batch_router.MAX_SUB_REQUESTS))
+    assert status_code == 200
+    assert [response['status_code'] for response in batch['responses']] == [200] * batch_router.MAX_SUB_REQUESTS
+
+    status_code, _ = runner.run(post_batch(['/pages/'] * (batch_router.MAX_SUB_REQUESTS + 1)))
+    assert status_code == 422
+
+
+def test_sub_requests_are_held_to_their_own_query_budget(runner: asyncio.Runner, monkeypatch: pytest.MonkeyPatch):
+
+    from uirpsoftball import query_budget
+
+    monkeypatch.setitem(query_budget._BUDGETS, ('GET', '/pages/game/{game_id}/'), {'statements': 1})
+    status_code, batch = runner.run(post_batch(['/pages/', '/pages/game/1/']))
+
+    assert status_code == 200
+    assert [response['status_code'] for response in batch['responses']] == [200, 500]
+    assert 'budget is 1' in batch['responses'][1]['body']['detail'][0]
@@ -0,0 +1,141 @@
+from collections.abc import Callable
+import asyncio
+import json
+import pytest
+
+"""
+Developer's Note:
+The bulk endpoints of the admin routers, on locations: nothing else references a new location, and the default league has
+4 of them (ids 1 to 4). Each endpoint runs under its statement budget, QUERY_BUDGET.MODE is fail (see conftest.py).
+"""
+
+
+@pytest.fixture(autouse=True)
+def default_league(generate: Callable[..., None]):
+    generate()
+
+
+def location(name: str) -> dict:
+    return {'name': name, 'link': 'https://example.com/' + name, 'short_name': name[:3], 'time_zone': 'America/Chicago'}
+
+
+def send(runner: asyncio.Runner, method: str, data) -> tuple[int, object]:
+
+    from uirpsoftball import asgi_client
+    from uirpsoftball.app import app
+
+    response = runner.run(asgi_client.send_json(app, method, '/admin/locations/bulk/', data))
+    body = response['body'].decode()
+    return response['status_code'], json.loads(body) if len(body) > 0 else None
+
+
+def stored_locations(runner: asyncio.Runner) -> dict[int, str]:
+
+    from sqlmodel import select, col
+    from uirpsoftball import config
+    from uirpsoftball.models import tables
+
+    async def read():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            return dict((await session.exec(select(col(tables.Location.id), col(tables.Location.name)))).all())
+
+    return runner.run(read())
+
+
+def test_create_many_returns_the_locations_in_order(runner: asyncio.Runner):
+
+    names = ['Field ' + str(i) for i in range(10, 40)]
+    status_code, created = send(runner, 'POST', [location(name) for name in names])
+
+    assert status_code == 200
+    assert [created_location['name'] for created_location in created] == names
+    stored = stored_locations(runner)
+    assert all(stored[created_location['id']] == created_location['name'] for created_location in created)
+
+
+def test_create_many_maps_given_and_assigned_ids(runner: asyncio.Runner):
+    """the rows with an id and the rows without are inserted in separate batches, the ids must still follow the input"""
+
+    from uirpsoftball import config
+    from uirpsoftball.schemas import location as location_schema
+    from uirpsoftball.services import location as location_service
+
+    class LocationCreateWithId(location_schema.LocationAdminCreate):
+        id: int | None = None
+
+    ids = [None, 500, None, 7, None, 300, None]
+    names = ['Field ' + str(i) for i in range(len(ids))]
+
+    async def create():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            return await location_service.Location.create_many({
+                'session': session,
+                'create_models': [LocationCreateWithId(id=id, **location(name)) for id, name in zip(ids, names)],
+            })
+
+    created = runner.run(create())
+
+    assert [created_location.name for created_location in created] == names
+    assert [created_location.id for created_location in created][1::2] == [500, 7, 300]
+    assert len(set(created_location.id for created_location in created)) == len(ids)
+    stored = stored_locations(runner)
+    assert all(stored[created_location.id] == created_location.name for created_location in created)
+
+
+def test_update_many(runner: asyncio.Runner):
+
+    status_code, updated = send(runner, 'PATCH', {'3': {'name': 'Third'}, '1': {'name': 'First'}})
+
+    assert status_code == 200
+    assert [(updated_location['id'], updated_location['name']) for updated_location in updated] == [(3, 'Third'), (1, 'First')]
+    assert stored_locations(runner) == {1: 'First', 2: 'Field 2', 3: 'Third', 4: 'Field 4'}
+
+
+def test_update_many_with_different_fields(runner: asyncio.Runner):
+    """one UPDATE per set of fields, outside of a request and its budget"""
+
+    from uirpsoftball import config
+    from uirpsoftball.schemas import location as location_schema
+    from uirpsoftball.services import location as location_service
+
+    async def update():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            return await location_service.Location.update_many({
+                'session': session,
+                'update_models': {
+                    2: location_schema.LocationAdminUpdate(short_name='S2'),
+                    4: location_schema.LocationAdminUpdate(name='Fourth'),
+                },
+            })
+
+    updated = runner.run(update())
+
+    assert [(updated_location.id, updated_location.name, updated_location.short_name) for updated_location in updated] == \
+        [(2, 'Field 2', 'S2'), (4, 'Fourth', 'F4')]
+    assert stored_locations(runner) == {1: 'Field 1', 2: 'Field 2', 3: 'Field 3', 4: 'Fourth'}
+
+
+def test_update_many_writes_nothing_when_an_id_is_missing(runner: asyncio.Runner):
+
+    status_code, _ = send(runner, 'PATCH', {'1': {'name': 'First'}, '99': {'name': 'Missing'}})
+
+    assert status_code == 404
+    assert stored_locations(runner)[1] == 'Field 1'
+
+
+def test_delete_many(runner: asyncio.Runner):
+
+    _, created = send(runner, 'POST', [location('Field A'), location('Field B'), location('Field C')])
+    status_code, _ = send(runner, 'DELETE', [created[0]['id'], created[2]['id']])
+
+    assert status_code == 200
+    assert set(stored_locations(runner)) == {1, 2, 3, 4, created[1]['id']}
+
+
+def test_delete_many_deletes_nothing_when_an_id_is_missing(runner: asyncio.Runner):
+
+    _, created = send(runner, 'POST', [location('Field A')])
+    status_code, _ = send(runner, 'DELETE', [created[0]['id'], 99])
+
+    assert status_code == 404
+    assert set(stored_locations(runner)) == {1, 2, 3, 4, created[0]['id']}
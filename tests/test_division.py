@@ -0,0 +1,90 @@
+from collections.abc import Callable
+import asyncio
+import pytest
+
+from benchmarks import league
+
+# the thousands of teams shuffle is meant for, more than a page of 1000 rows
+LARGE_LEAGUE_SIZE: league.LeagueSize = {
+    'DIVISIONS': 20,
+    'TEAMS_PER_DIVISION': 100,
+    'ROUNDS': 2,
+    'SCORED_FRACTION': 1,
+    'VISITS': 0,
+    'LOCATIONS': 4,
+}
+TEAMS = LARGE_LEAGUE_SIZE['DIVISIONS'] * LARGE_LEAGUE_SIZE['TEAMS_PER_DIVISION']
+
+
+@pytest.fixture(scope='module', autouse=True)
+def large_league(generate: Callable[..., None]):
+    generate(LARGE_LEAGUE_SIZE)
+
+
+async def shuffle(seed: int, balance: bool = False) -> dict[int, int]:
+
+    from uirpsoftball import config
+    from uirpsoftball.services import division as division_service
+
+    async with config.ASYNC_SESSIONMAKER() as session:
+        return await division_service.Division.shuffle(session, seed=seed, balance=balance)
+
+
+async def stored_teams() -> dict[int, tuple[int, int]]:
+    """division id and seed by team id"""
+
+    from sqlmodel import select, col
+    from uirpsoftball import config
+    from uirpsoftball.models import tables
+
+    async with config.ASYNC_SESSIONMAKER() as session:
+        return {team_id: (division_id, seed) for team_id, division_id, seed in (await session.exec(
+            select(col(tables.Team.id), col(tables.Team.division_id), col(tables.Team.seed)))).all()}
+
+
+async def calculate_seeds_by_division() -> dict[int, int]:
+
+    from uirpsoftball import config
+    from uirpsoftball.services import team as team_service
+
+    seeds_by_team_id: dict[int, int] = {}
+    async with config.ASYNC_SESSIONMAKER() as session:
+        for division_id in range(1, LARGE_LEAGUE_SIZE['DIVISIONS'] + 1):
+            seeds_by_team_id.update(await team_service.Team.calculate_seeds(session, division_id))
+    return seeds_by_team_id
+
+
+def test_shuffle_reassigns_and_reseeds_every_team(runner: asyncio.Runner):
+
+    division_id_by_team_id = runner.run(shuffle(seed=3))
+    teams = runner.run(stored_teams())
+
+    assert len(division_id_by_team_id) == TEAMS
+    assert {team_id: division_id for team_id, (division_id, _) in teams.items()} == division_id_by_team_id
+    for division_id in range(1, LARGE_LEAGUE_SIZE['DIVISIONS'] + 1):
+        assert list(division_id_by_team_id.values()).count(division_id) == LARGE_LEAGUE_SIZE['TEAMS_PER_DIVISION']
+
+    # the single reseed after the bulk UPDATE reached the divisions that sort last
+    assert {team_id: seed for team_id, (_, seed) in teams.items()} == runner.run(calculate_seeds_by_division())
+
+
+def test_shuffle_is_reproducible(runner: asyncio.Runner):
+
+    assert runner.run(shuffle(seed=5)) == runner.run(shuffle(seed=5))
+    assert runner.run(shuffle(seed=5)) != runner.run(shuffle(seed=6))
+
+
+def test_balanced_shuffle_keeps_the_spread_of_previous_seeds(runner: asyncio.Runner):
+
+    division_count = LARGE_LEAGUE_SIZE['DIVISIONS']
+    previous_seeds = {team_id: seed for team_id, (_, seed) in runner.run(stored_teams()).items()}
+    division_id_by_team_id = runner.run(shuffle(seed=7, balance=True))
+
+    # every division takes one team of each tier of `division_count` teams in order of previous seed, so the k-th best
+    # previous seed of every division lies within the k-th tier
+    all_seeds = sorted(previous_seeds.values())
+    for division_id in range(1, division_count + 1):
+        division_seeds = sorted(previous_seeds[team_id] for team_id, team_division_id in division_id_by_team_id.items()
+                                if team_division_id == division_id)
+        for k, seed in enumerate(division_seeds):
+            assert all_seeds[k * division_count] <= seed <= all_seeds[(k + 1) * division_count - 1]
@@ -0,0 +1,66 @@
+from collections.abc import Callable, Iterator
+from pathlib import Path
+import asyncio
+import pytest
+
+from benchmarks import league
+
+
+@pytest.fixture(scope='module', autouse=True)
+def default_league(generate: Callable[..., None]):
+    generate(league.DEFAULT_LEAGUE_SIZE)
+
+
+@pytest.fixture
+def empty_engine(runner: asyncio.Runner, tmp_path: Path) -> Iterator:
+    """an engine on a new database with every table and no rows"""
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel
+    from uirpsoftball import models  # noqa: F401, registers the tables
+
+    engine = create_async_engine('sqlite+aiosqlite:///' + str(tmp_path / 'empty.db'))
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    runner.run(create_tables())
+    yield engine
+    runner.run(engine.dispose())
+
+
+@pytest.mark.parametrize('format, name', [('json', 'league.json'), ('csv', 'league')])
+def test_export_then_import_into_an_empty_database_gives_identical_rows(runner: asyncio.Runner, empty_engine, tmp_path: Path, format: str, name: str):
+
+    from uirpsoftball import config, league_io
+    from uirpsoftball.models import tables
+
+    exported = runner.run(league_io.export_league(config.DB_READ_ASYNC_ENGINE, tmp_path / name, format))
+    imported = runner.run(league_io.import_league(empty_engine, tmp_path / name, format))
+
+    assert imported == exported
+    assert exported[league_io.table_of(tables.Game).name] > 0
+    assert runner.run(league_io.read_rows(empty_engine)) == runner.run(league_io.read_rows(config.DB_READ_ASYNC_ENGINE))
+
+
+def test_dangling_foreign_key_rolls_the_whole_import_back(runner: asyncio.Runner, empty_engine, tmp_path: Path):
+
+    from uirpsoftball import config, league_io
+    from uirpsoftball.models import tables
+
+    rows = runner.run(league_io.read_rows(config.DB_READ_ASYNC_ENGINE))
+    game_table_name = league_io.table_of(tables.Game).name
+    # the last game references a team that does not exist, every other table is already inserted when it is checked
+    rows[game_table_name][-1]['home_team_id'] = 1000000
+    league_io.write_rows(rows, tmp_path / 'league.json', 'json')
+
+    with pytest.raises(league_io.LeagueImportError):
+        runner.run(league_io.import_league(empty_engine, tmp_path / 'league.json'))
+    assert all(len(table_rows) == 0 for table_rows in runner.run(league_io.read_rows(empty_engine)).values())
+
+    # replacing the league deletes every row first, that is rolled back too
+    before = runner.run(league_io.read_rows(config.DB_READ_ASYNC_ENGINE))
+    with pytest.raises(league_io.LeagueImportError):
+        runner.run(league_io.import_league(config.DB_ASYNC_ENGINE, tmp_path / 'league.json', replace=True))
+    assert runner.run(league_io.read_rows(config.DB_READ_ASYNC_ENGINE)) == before
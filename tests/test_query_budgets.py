@@ -0,0 +1,45 @@
+from collections.abc import Callable
+import asyncio
+import pytest
+
+"""
+Developer's Note:
+Requests every page of the synthetic league with QUERY_BUDGET.MODE set to fail, a page over its statement budget or running
+an N+1 pattern answers 500 and fails its test (see conftest.py). The response cache is off so every request reaches the
+database.
+"""
+
+PAGE_PATHS = {
+    '/pages/': '/pages/',
+    '/pages/team/{team_slug}/': '/pages/team/team-1/',
+    '/pages/schedule/': '/pages/schedule/',
+    '/pages/game/{game_id}/': '/pages/game/1/',
+    '/pages/standings/': '/pages/standings/',
+    '/pages/standings/odds/': '/pages/standings/odds/',
+    '/pages/standings/scenarios/': '/pages/standings/scenarios/',
+    '/pages/admin/': '/pages/admin/',
+}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def default_league(generate: Callable[..., None]):
+    generate()
+
+
+def test_every_page_is_covered():
+
+    from uirpsoftball.app import app
+
+    page_routes = {route.path for route in app.router.routes if getattr(
+        route, 'path', '').startswith('/pages/')}
+    assert page_routes == set(PAGE_PATHS)
+
+
+@pytest.mark.parametrize('path', list(PAGE_PATHS.values()))
+def test_page_within_budget(runner: asyncio.Runner, path: str):
+
+    from uirpsoftball import asgi_client
+    from uirpsoftball.app import app
+
+    response = runner.run(asgi_client.get(app, path))
+    assert response['status_code'] == 200, response['body'].decode()
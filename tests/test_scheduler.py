@@ -0,0 +1,105 @@
+import datetime as datetime_module
+import itertools
+import pytest
+
+from uirpsoftball import scheduler
+
+ROUND_INTERVAL = datetime_module.timedelta(weeks=1)
+SLOT_INTERVAL = datetime_module.timedelta(hours=1)
+
+
+def season(division_sizes: list[int], rounds: int, locations: int, seed: int) -> scheduler.Schedule:
+
+    team_ids_by_division: dict[int, list[int]] = {}
+    team_id = 1
+    for division_id, division_size in enumerate(division_sizes, start=1):
+        team_ids_by_division[division_id] = list(range(team_id, team_id + division_size))
+        team_id += division_size
+
+    first_round_start = datetime_module.datetime(2025, 5, 6, 18, tzinfo=datetime_module.timezone.utc)
+    return scheduler.schedule(team_ids_by_division, [first_round_start + i * ROUND_INTERVAL for i in range(rounds)],
+                              list(range(1, locations + 1)), SLOT_INTERVAL, seed=seed)
+
+
+@pytest.mark.parametrize('teams', range(2, 12))
+def test_round_robin_meets_every_pair_once_per_cycle(teams: int):
+
+    team_ids = list(range(1, teams + 1))
+    # an odd number of teams plays one round more per cycle, every team sits out one of them
+    cycle = teams - 1 if teams % 2 == 0 else teams
+    rounds = scheduler.round_robin(team_ids, 3 * cycle)
+
+    for start in range(0, len(rounds), cycle):
+        meetings: dict[frozenset[int], int] = {}
+        byes = {team_id: 0 for team_id in team_ids}
+
+        for matchups, round_byes in rounds[start:start + cycle]:
+            round_team_ids = [team_id for matchup in matchups for team_id in matchup] + round_byes
+            assert sorted(round_team_ids) == team_ids
+            assert len(round_byes) == teams % 2
+
+            for matchup in matchups:
+                pair = frozenset(matchup)
+                meetings[pair] = meetings.get(pair, 0) + 1
+            for team_id in round_byes:
+                byes[team_id] += 1
+
+        assert meetings == {frozenset(pair): 1 for pair in itertools.combinations(team_ids, 2)}
+        assert set(byes.values()) == {teams % 2}
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('division_sizes, rounds, locations', [
+    ([8, 8], 7, 4),
+    ([7, 6], 14, 3),
+    ([5, 9, 10], 12, 2),
+    ([12, 12, 12, 12, 12], 12, 6),
+])
+def test_schedule_is_balanced_and_never_double_books(division_sizes: list[int], rounds: int, locations: int, seed: int):
+
+    schedule = season(division_sizes, rounds, locations, seed)
+    games = schedule['games']
+    fairness = schedule['fairness']
+
+    team_ids_by_datetime: dict[datetime_module.datetime, list[int]] = {}
+    location_ids_by_datetime: dict[datetime_module.datetime, list[int]] = {}
+    games_by_team_round: dict[tuple[int, int], int] = {}
+    for game in games:
+        team_ids_by_datetime.setdefault(game['datetime'], []).extend(
+            team_id for team_id in (game['home_team_id'], game['away_team_id'], game['officiating_team_id']) if team_id is not None)
+        location_ids_by_datetime.setdefault(game['datetime'], []).append(game['location_id'])
+        for team_id in (game['home_team_id'], game['away_team_id']):
+            games_by_team_round[(team_id, game['round_id'])] = games_by_team_round.get((team_id, game['round_id']), 0) + 1
+
+    # no team plays or officiates twice in a slot, no location hosts two games at once
+    for team_ids in team_ids_by_datetime.values():
+        assert len(team_ids) == len(set(team_ids))
+    for location_ids in location_ids_by_datetime.values():
+        assert len(location_ids) == len(set(location_ids))
+    assert set(games_by_team_round.values()) == {1}
+    assert fairness['double_bookings'] == 0
+
+    for team_id, team in fairness['teams'].items():
+        assert abs(team['home'] - team['away']) <= 1, team_id
+        assert team['games'] + team['byes'] == rounds
+    assert fairness['max_home_away_difference'] <= 1
+    assert fairness['repeated_matchups'] == 0
+    assert fairness['unofficiated_games'] == 0
+
+
+@pytest.mark.parametrize('division_sizes, rounds', [([7], 7), ([5, 9], 18), ([3, 4], 6)])
+def test_odd_divisions_get_byes(division_sizes: list[int], rounds: int):
+
+    schedule = season(division_sizes, rounds, 2, seed=0)
+
+    team_id = 1
+    for division_size in division_sizes:
+        cycle = division_size - 1 if division_size % 2 == 0 else division_size
+        for division_team_id in range(team_id, team_id + division_size):
+            team = schedule['fairness']['teams'][division_team_id]
+            # one bye per full cycle of an odd division, none in an even one
+            if division_size % 2 == 1:
+                assert rounds // cycle <= team['byes'] <= -(-rounds // cycle)
+            else:
+                assert team['byes'] == 0
+        team_id += division_size
@@ -0,0 +1,89 @@
+from pathlib import Path
+import sqlite3
+import gzip
+import pytest
+
+from uirpsoftball import snapshot
+
+
+def rows(database: Path) -> list[str]:
+    connection = sqlite3.connect(database)
+    try:
+        return list(connection.iterdump())
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Path:
+
+    path = tmp_path / 'league.db'
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE games (id INTEGER PRIMARY KEY, home_team_score INTEGER, away_team_score INTEGER)')
+    connection.executemany('INSERT INTO games VALUES (?, ?, ?)', [(i, i % 7, i % 5) for i in range(1, 5001)])
+    connection.commit()
+    connection.close()
+    return path
+
+
+def update_score(database: Path, game_id: int, home_team_score: int) -> None:
+    connection = sqlite3.connect(database)
+    connection.execute('UPDATE games SET home_team_score = ? WHERE id = ?', (home_team_score, game_id))
+    connection.commit()
+    connection.close()
+
+
+def test_take_and_restore_round_trip(database: Path, tmp_path: Path):
+
+    directory = tmp_path / 'snapshots'
+    full, _ = snapshot.take(database, directory)
+    update_score(database, 4000, 20)
+    incremental, new = snapshot.take(database, directory)
+
+    assert new and incremental['base'] == full['name']
+    assert incremental['changed_pages'] < incremental['page_count']
+
+    restored = tmp_path / 'restored.db'
+    snapshot.restore(directory, incremental['name'], restored)
+    assert rows(restored) == rows(database)
+
+    snapshot.restore(directory, full['name'], restored)
+    assert (4000, 3, 0) in sqlite3.connect(restored).execute('SELECT * FROM games WHERE id = 4000').fetchall()
+
+
+def test_unchanged_database_is_not_snapshot_again(database: Path, tmp_path: Path):
+
+    directory = tmp_path / 'snapshots'
+    first, _ = snapshot.take(database, directory)
+    info, new = snapshot.take(database, directory)
+
+    assert not new and info['name'] == first['name']
+    assert len(snapshot.list_snapshots(directory)) == 1
+
+
+def test_header_counters_do_not_count_as_a_change(database: Path):
+
+    page_size = snapshot.read_page_size(database)
+    page = database.read_bytes()[:page_size]
+    bumped = bytearray(page)
+    bumped[24:28] = (int.from_bytes(page[24:28], 'big') + 1).to_bytes(4, 'big')
+    bumped[92:96] = bumped[24:28]
+
+    assert snapshot.page_hash(1, bytes(bumped)) == snapshot.page_hash(1, page)
+    assert snapshot.page_hash(2, bytes(bumped)) != snapshot.page_hash(2, page)
+
+
+def test_corrupted_pages_are_detected(database: Path, tmp_path: Path):
+
+    directory = tmp_path / 'snapshots'
+    info, _ = snapshot.take(database, directory)
+
+    pages = snapshot.pages_path(directory, info['name'])
+    data = bytearray(gzip.decompress(pages.read_bytes()))
+    data[len(data) // 2] ^= 0xFF
+    pages.write_bytes(gzip.compress(bytes(data)))
+
+    restored = tmp_path / 'restored.db'
+    with pytest.raises(snapshot.SnapshotError, match='corrupt'):
+        snapshot.restore(directory, info['name'], restored)
+    assert not restored.exists() or rows(restored) == []
@@ -0,0 +1,137 @@
+import itertools
+import asyncio
+import random
+import pytest
+
+# a team of another division, its games count for the division's teams only
+OUTSIDE_TEAM_ID = 99
+TEAM_IDS = [1, 2, 3, 4, 5]
+
+PARAMETER_ORDERS = [
+    ['win_percentage', 'head_to_head'],
+    ['head_to_head', 'win_percentage'],
+]
+
+
+def division_season(seed: int) -> dict:
+    """five teams with a few scored games, some of them tied, and six remaining games, one of them against another division"""
+
+    rng = random.Random(seed)
+    pairs = list(itertools.combinations(TEAM_IDS, 2))
+    rng.shuffle(pairs)
+
+    scored_games = []
+    for game_id, (home_team_id, away_team_id) in enumerate(pairs[:6], start=1):
+        home_team_score = rng.randint(0, 4)
+        away_team_score = rng.randint(0, 4)
+        scored_games.append((game_id, home_team_id, away_team_id, home_team_score, away_team_score))
+
+    remaining_games = [(game_id, home_team_id, away_team_id, 0.5)
+                       for game_id, (home_team_id, away_team_id) in enumerate(pairs[6:], start=100)]
+    remaining_games.append((200, rng.choice(TEAM_IDS), OUTSIDE_TEAM_ID, 0.5))
+
+    return {
+        'team_ids': TEAM_IDS,
+        'scored_games': scored_games,
+        'remaining_games': remaining_games,
+    }
+
+
+def enumerate_seeds(division_season: dict, parameters: list[str], margins: list[int]) -> dict[int, set[int]]:
+    """every seed each team finishes with, over every win/loss result and margin of the remaining games"""
+
+    from uirpsoftball.services import standings as standings_service, seeding_parameter as seeding_parameter_service
+    from uirpsoftball.schemas import team as team_schema
+
+    seeds_by_team_id: dict[int, set[int]] = {team_id: set() for team_id in TEAM_IDS}
+    remaining_games = division_season['remaining_games']
+
+    for home_team_wins in itertools.product((True, False), repeat=len(remaining_games)):
+        for game_margins in itertools.product(margins, repeat=len(remaining_games)):
+
+            games = list(division_season['scored_games'])
+            for (game_id, home_team_id, away_team_id, _), home_wins, margin in zip(remaining_games, home_team_wins, game_margins):
+                games.append((game_id, home_team_id, away_team_id,
+                              margin if home_wins else 0, 0 if home_wins else margin))
+
+            head_to_head_matrix = seeding_parameter_service.HeadToHeadMatrix(TEAM_IDS)
+            team_statistics_by_team_id = {
+                team_id: team_schema.TeamStatisticsExport.model_construct(
+                    run_differential=0, game_ids_won=set(), game_ids_lost=set())
+                for team_id in TEAM_IDS
+            }
+            for game in games:
+                head_to_head_matrix.record(*game[1:])
+                standings_service._record_result(team_statistics_by_team_id, game)
+
+            groups = seeding_parameter_service.SeedingParameter.rank(
+                parameters, TEAM_IDS, team_statistics_by_team_id, head_to_head_matrix)
+            for team_id, seed in seeding_parameter_service.SeedingParameter.seeds_from_groups(groups).items():
+                seeds_by_team_id[team_id].add(seed)
+
+    return seeds_by_team_id
+
+
+@pytest.mark.parametrize('parameters', PARAMETER_ORDERS)
+@pytest.mark.parametrize('seed', range(10))
+def test_seed_ranges_match_exhaustive_enumeration(runner: asyncio.Runner, parameters: list[str], seed: int):
+
+    from uirpsoftball.services import standings as standings_service
+
+    season = division_season(seed)
+    seed_ranges = standings_service._find_seed_ranges(season, parameters, node_limit=100000, time_limit=10)
+    seeds_by_team_id = enumerate_seeds(season, parameters, margins=[1])
+
+    for team_id in TEAM_IDS:
+        assert seed_ranges[team_id]['exact']
+        assert (seed_ranges[team_id]['best_seed'], seed_ranges[team_id]['worst_seed']) == (
+            min(seeds_by_team_id[team_id]), max(seeds_by_team_id[team_id])), team_id
+
+
+@pytest.mark.parametrize('parameters', [order + ['run_differential'] for order in PARAMETER_ORDERS])
+@pytest.mark.parametrize('seed', range(5))
+def test_seed_ranges_cover_every_margin(runner: asyncio.Runner, parameters: list[str], seed: int):
+    """margins of future games are free, the range may be wider than any enumerated margins reach but never narrower"""
+
+    from uirpsoftball.services import standings as standings_service
+
+    season = division_season(seed)
+    seed_ranges = standings_service._find_seed_ranges(season, parameters, node_limit=100000, time_limit=10)
+    seeds_by_team_id = enumerate_seeds(season, parameters, margins=[1, 10])
+
+    for team_id in TEAM_IDS:
+        assert seed_ranges[team_id]['best_seed'] <= min(seeds_by_team_id[team_id]), team_id
+        assert seed_ranges[team_id]['worst_seed'] >= max(seeds_by_team_id[team_id]), team_id
+
+
+def test_simulated_seasons_are_reproducible(runner: asyncio.Runner):
+
+    from uirpsoftball.services import standings as standings_service
+
+    season = {
+        'divisions': [division_season(0)],
+        'parameters': ['win_percentage', 'head_to_head', 'run_differential'],
+        'margins': [1, 2, 5],
+    }
+
+    first = standings_service._simulate_seasons(season, 500, random_seed=7)
+    assert first == standings_service._simulate_seasons(season, 500, random_seed=7)
+    assert first != standings_service._simulate_seasons(season, 500, random_seed=8)
+    assert all(sum(seed_counts.values()) == 500 for seed_counts in first.values())
+
+
+def test_seed_odds_are_reproducible_with_a_random_seed(runner: asyncio.Runner):
+
+    from uirpsoftball.services import standings as standings_service
+
+    season = {
+        'divisions': [division_season(0)],
+        'parameters': ['win_percentage', 'head_to_head', 'run_differential'],
+        'margins': [1, 2, 5],
+    }
+
+    first = runner.run(standings_service.Standings.simulate_seed_odds(season, 500, random_seed=7))
+    assert first == runner.run(standings_service.Standings.simulate_seed_odds(season, 500, random_seed=7))
+    assert first['simulations'] == 500
+    for seed_probabilities in first['seed_probabilities'].values():
+        assert sum(seed_probabilities.values()) == pytest.approx(1)
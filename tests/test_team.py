@@ -0,0 +1,68 @@
+from collections.abc import Callable
+import asyncio
+import pytest
+
+from benchmarks import league
+
+# more teams than the 1000 rows of a page, the divisions that sort last used to be cut short
+LARGE_LEAGUE_SIZE: league.LeagueSize = {
+    'DIVISIONS': 12,
+    'TEAMS_PER_DIVISION': 100,
+    'ROUNDS': 4,
+    'SCORED_FRACTION': 0.5,
+    'VISITS': 0,
+    'LOCATIONS': 4,
+}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def large_league(generate: Callable[..., None]):
+    generate(LARGE_LEAGUE_SIZE)
+
+
+async def stored_seeds() -> dict[int, int]:
+
+    from sqlmodel import select, col
+    from uirpsoftball import config
+    from uirpsoftball.models import tables
+
+    async with config.ASYNC_SESSIONMAKER() as session:
+        return dict((await session.exec(select(col(tables.Team.id), col(tables.Team.seed)))).all())
+
+
+def test_rank_by_divisions_reads_every_team(runner: asyncio.Runner):
+
+    from uirpsoftball import config
+    from uirpsoftball.services import team as team_service
+
+    async def rank():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            return await team_service.Team.rank_by_divisions(session, range(1, LARGE_LEAGUE_SIZE['DIVISIONS'] + 1))
+
+    team_ids_ranked_by_division = runner.run(rank())
+    assert [len(team_ids) for team_ids in team_ids_ranked_by_division.values()] == \
+        [LARGE_LEAGUE_SIZE['TEAMS_PER_DIVISION']] * LARGE_LEAGUE_SIZE['DIVISIONS']
+
+
+def test_update_seeds_many_reseeds_every_team(runner: asyncio.Runner):
+
+    from uirpsoftball import config
+    from uirpsoftball.services import team as team_service
+
+    division_ids = list(range(1, LARGE_LEAGUE_SIZE['DIVISIONS'] + 1))
+
+    async def reseed_and_calculate_each_division():
+        async with config.ASYNC_SESSIONMAKER() as session:
+            await team_service.Team.update_seeds_many(session, division_ids)
+
+        # one division at a time stays far below a page
+        seeds_by_team_id: dict[int, int] = {}
+        async with config.ASYNC_SESSIONMAKER() as session:
+            for division_id in division_ids:
+                seeds_by_team_id.update(await team_service.Team.calculate_seeds(session, division_id))
+        return seeds_by_team_id
+
+    seeds_by_team_id = runner.run(reseed_and_calculate_each_division())
+    assert len(seeds_by_team_id) == LARGE_LEAGUE_SIZE['DIVISIONS'] * \
+        LARGE_LEAGUE_SIZE['TEAMS_PER_DIVISION']
+    assert runner.run(stored_seeds()) == seeds_by_team_id